@@ -0,0 +1,7 @@
+"""
+Storage formats shared by the scrapers and the web app.
+
+listener_store holds the append-only JSONL listener history and sqlite_store the
+SQLite schema behind STORAGE_BACKEND=sqlite. The scraping scripts put the repository
+root on sys.path to import them; the Docker image copies this package next to app/.
+"""
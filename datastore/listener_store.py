@@ -0,0 +1,295 @@
+"""
+Listener store module for the append-only monthly listeners history.
+
+Shared by the scrapers (through scraping/listener_store.py, which adds the default
+results directory) and the web app (the Docker image copies datastore/ next to app/),
+so both sides always read and write the same format.
+
+The history lives in spotify-monthly-listeners-master.jsonl, one JSON object per line.
+Scrapers append the day's rows instead of rewriting the whole file, and compaction
+periodically rewrites it to drop duplicate (artist_id, date) rows and any partial line
+left behind by an interrupted write. The legacy JSON array
+(spotify-monthly-listeners-master.json) is still readable until it has been migrated
+with migrate_from_json().
+"""
+
+import json
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+
+# File locking is only available on POSIX; elsewhere writers run unlocked
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+MASTER_FILENAME = 'spotify-monthly-listeners-master.jsonl'
+LEGACY_MASTER_FILENAME = 'spotify-monthly-listeners-master.json'
+# Daily follower/popularity figures collected by the web app, next to the master file
+STATS_FILENAME = 'spotify-artist-stats.jsonl'
+
+# Compact when this share of lines is duplicate or unreadable...
+COMPACT_GARBAGE_RATIO = 0.05
+# ...or when the last compaction is older than this
+COMPACT_INTERVAL_SECONDS = 7 * 24 * 3600
+
+
+def legacy_path_for(path):
+    """
+    Return the legacy JSON array path that sits next to a JSONL master file.
+    """
+    return os.path.join(os.path.dirname(path), LEGACY_MASTER_FILENAME)
+
+
+@contextmanager
+def _locked(path):
+    """
+    Hold an exclusive lock on path + '.lock' so appends and compaction don't interleave.
+    """
+    if fcntl is None:
+        yield
+        return
+    with open(path + '.lock', 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def iter_records(path, stats=None, legacy=True):
+    """
+    Yield the records stored at path.
+
+    Reads JSONL line by line, skipping blank and unreadable lines (a crash mid-append can
+    leave a partial last line). A path ending in .json is read as a legacy JSON array, and
+    a missing JSONL file falls back to the legacy file next to it.
+
+    Args:
+        path: Master file path
+        stats: Optional dict filled with 'lines' and 'bad_lines' counts
+        legacy: Whether to fall back to the legacy master file (False for other JSONL files)
+    """
+    if stats is not None:
+        stats.update({'lines': 0, 'bad_lines': 0})
+
+    if not path.endswith('.json') and not os.path.exists(path):
+        if not legacy:
+            return
+        legacy_path = legacy_path_for(path)
+        if not os.path.exists(legacy_path):
+            return
+        path = legacy_path
+
+    if path.endswith('.json'):
+        with open(path, 'r', encoding='utf-8') as f:
+            records = json.load(f)
+        if stats is not None:
+            stats['lines'] = len(records)
+        yield from records
+        return
+
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if stats is not None:
+                stats['lines'] += 1
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                if stats is not None:
+                    stats['bad_lines'] += 1
+
+
+def read_records(path, stats=None, legacy=True):
+    """
+    Return all records stored at path as a list. See iter_records().
+    """
+    return list(iter_records(path, stats, legacy))
+
+
+def append_records(records, path, legacy=True):
+    """
+    Append records to the JSONL master file and fsync it.
+    If only the legacy JSON array exists yet, it is migrated first so no history is hidden
+    (unless legacy is False, for JSONL files other than the master file).
+
+    Returns:
+        Number of records written
+    """
+    if not records:
+        return 0
+
+    with _locked(path):
+        _append_unlocked(records, path, legacy)
+    return len(records)
+
+
+def append_new_records(records, path, stats=None, legacy=True):
+    """
+    Append the records whose (artist_id, date) isn't stored yet.
+
+    The check and the append happen under the same lock, so two scrapers finishing at
+    once can't both add a row for the same artist and day. Only the stored keys for the
+    dates being appended are kept in memory while the file is scanned.
+
+    Args:
+        records: Records to append
+        path: JSONL master file path
+        stats: Optional dict filled with the 'lines' and 'bad_lines' counts of the file
+            and 'duplicate_rows', the duplicate rows already stored for those dates
+        legacy: Whether to fall back to the legacy master file (False for other JSONL files)
+
+    Returns:
+        List of the records that were appended, in their original order
+    """
+    stats = {} if stats is None else stats
+    dates = {record.get('date') for record in records}
+    with _locked(path):
+        existing = set()
+        duplicate_rows = 0
+        for entry in iter_records(path, stats, legacy):
+            if entry.get('date') not in dates:
+                continue
+            key = (entry.get('artist_id'), entry.get('date'))
+            if key in existing:
+                duplicate_rows += 1
+            existing.add(key)
+        stats['duplicate_rows'] = duplicate_rows
+
+        new_records = []
+        for record in records:
+            key = (record.get('artist_id'), record.get('date'))
+            if key not in existing:
+                new_records.append(record)
+                existing.add(key)  # Also drops duplicates within the batch
+        if new_records:
+            _append_unlocked(new_records, path, legacy)
+    return new_records
+
+
+def _append_unlocked(records, path, legacy):
+    lines = ''.join(json.dumps(record, ensure_ascii=False) + '\n' for record in records)
+    if legacy and not os.path.exists(path) and os.path.exists(legacy_path_for(path)):
+        migrate_from_json(legacy_path_for(path), path)
+    with open(path, 'a+b') as f:
+        # Start on a fresh line if a previous write was cut off mid-record
+        f.seek(0, os.SEEK_END)
+        if f.tell() > 0:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b'\n':
+                f.write(b'\n')
+        f.write(lines.encode('utf-8'))
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def write_records(records, path):
+    """
+    Atomically replace the JSONL master file with records (temp file + rename).
+    Readers see either the old or the new file, never a partial one.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+
+    fd, temp_path = tempfile.mkstemp(prefix='.listeners-', suffix='.jsonl.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def dedupe_records(records):
+    """
+    Keep the last record for each (artist_id, date), preserving first-seen order.
+    Records without an artist_id are kept as-is.
+    """
+    latest = {}
+    passthrough = []
+    for index, record in enumerate(records):
+        if not record.get('artist_id'):
+            passthrough.append((index, record))
+            continue
+        key = (record.get('artist_id'), record.get('date'))
+        first_index = latest[key][0] if key in latest else index
+        latest[key] = (first_index, record)
+    ordered = sorted(list(latest.values()) + passthrough, key=lambda item: item[0])
+    return [record for _, record in ordered]
+
+
+def compact(path, legacy=True):
+    """
+    Rewrite the JSONL master file without duplicate or unreadable lines.
+
+    Args:
+        path: JSONL file path
+        legacy: Whether a missing file falls back to the legacy master file (False for other JSONL files)
+
+    Returns:
+        Tuple of (lines_before, records_after)
+    """
+    with _locked(path):
+        stats = {}
+        records = dedupe_records(read_records(path, stats, legacy))
+        write_records(records, path)
+    _mark_compacted(path)
+    return stats.get('lines', 0), len(records)
+
+
+def _marker_path(path):
+    return path + '.compacted'
+
+
+def _mark_compacted(path):
+    with open(_marker_path(path), 'w', encoding='utf-8') as f:
+        f.write(str(int(time.time())))
+
+
+def needs_compaction(path, stats, duplicate_count=0):
+    """
+    Decide whether the file at path is due for compaction.
+
+    Args:
+        path: JSONL master file path
+        stats: Stats dict filled by iter_records()/read_records()
+        duplicate_count: Number of duplicate (artist_id, date) rows seen while reading
+    """
+    if not os.path.exists(path) or path.endswith('.json'):
+        return False
+    lines = stats.get('lines', 0)
+    if lines and (stats.get('bad_lines', 0) + duplicate_count) / lines > COMPACT_GARBAGE_RATIO:
+        return True
+    marker = _marker_path(path)
+    if not os.path.exists(marker):
+        _mark_compacted(path)  # Start the interval clock on first use
+        return False
+    return time.time() - os.path.getmtime(marker) > COMPACT_INTERVAL_SECONDS
+
+
+def migrate_from_json(json_path, jsonl_path, overwrite=False):
+    """
+    One-shot migration from the legacy JSON array to the JSONL master file.
+    The legacy file is left in place as a backup.
+
+    Returns:
+        Number of records migrated, or None if the JSONL file already exists
+    """
+    if os.path.exists(jsonl_path) and not overwrite:
+        return None
+
+    with open(json_path, 'r', encoding='utf-8') as f:
+        records = json.load(f)
+    write_records(records, jsonl_path)
+    _mark_compacted(jsonl_path)
+    return len(records)
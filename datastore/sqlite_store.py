@@ -0,0 +1,269 @@
+"""
+SQLite store module for the listener history and the followed artists,
+suggestions and blacklist lists, selected with STORAGE_BACKEND=sqlite.
+
+Shared by the scrapers (through scraping/sqlite_store.py, which adds the default
+database path) and the web app, so both sides create and read the same schema.
+
+The database runs in WAL mode so the web app workers keep reading while a scraper
+writes, and every write happens in a single transaction. Listener rows are unique per
+(artist_id, date), with indexes on date and artist name. Daily follower and popularity
+figures (collected from the Spotify API by the web app) live in artist_stats, also keyed
+by (artist_id, date).
+"""
+
+import json
+import os
+import sqlite3
+from contextlib import contextmanager
+
+DB_FILENAME = 'spotify-data.sqlite3'
+
+# Followed artists, suggestions and blacklist are stored as ordered lists of JSON documents
+COLLECTIONS = ('followed_artists', 'suggestions', 'blacklist')
+
+LISTENER_COLUMNS = ('artist_id', 'date', 'artist_name', 'monthly_listeners', 'url')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS listeners (
+    id INTEGER PRIMARY KEY,
+    artist_id TEXT,
+    date TEXT NOT NULL,
+    artist_name TEXT,
+    monthly_listeners INTEGER,
+    url TEXT,
+    extra TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_listeners_artist_date ON listeners (artist_id, date);
+CREATE INDEX IF NOT EXISTS idx_listeners_date ON listeners (date);
+CREATE INDEX IF NOT EXISTS idx_listeners_artist_name ON listeners (artist_name COLLATE NOCASE);
+
+CREATE TABLE IF NOT EXISTS collections (
+    collection TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    artist_id TEXT,
+    name TEXT,
+    body TEXT NOT NULL,
+    PRIMARY KEY (collection, position)
+);
+CREATE INDEX IF NOT EXISTS idx_collections_artist_id ON collections (collection, artist_id);
+CREATE INDEX IF NOT EXISTS idx_collections_name ON collections (collection, name COLLATE NOCASE);
+
+CREATE TABLE IF NOT EXISTS artist_stats (
+    artist_id TEXT NOT NULL,
+    date TEXT NOT NULL,
+    followers INTEGER,
+    popularity INTEGER,
+    PRIMARY KEY (artist_id, date)
+);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+
+def backend():
+    """
+    Return the configured storage backend name ('json' or 'sqlite').
+    """
+    return os.getenv('STORAGE_BACKEND', 'json').lower()
+
+
+def normalize_date(date_str):
+    """
+    Normalize a stored date to YYYY-MM-DD (older rows use YYYYMMDD).
+    """
+    if isinstance(date_str, str) and len(date_str) == 8 and date_str.isdigit():
+        return f"{date_str[:4]}-{date_str[4:6]}-{date_str[6:]}"
+    return date_str or ""
+
+
+def connect(path):
+    """
+    Open the database, creating the schema if needed.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+@contextmanager
+def transaction(conn):
+    """
+    Run a block in a write transaction, taking the write lock up front.
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def _bump_version(conn, key):
+    conn.execute(
+        "INSERT INTO meta (key, value) VALUES (?, 1) ON CONFLICT(key) DO UPDATE SET value = value + 1",
+        (key,))
+
+
+def get_version(conn, key='listeners'):
+    """
+    Return the write counter for 'listeners' or a collection name; it changes on every write.
+    """
+    row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else 0
+
+
+def _listener_row(record):
+    extra = {k: v for k, v in record.items() if k not in LISTENER_COLUMNS}
+    return (
+        record.get('artist_id'),
+        normalize_date(record.get('date')),
+        record.get('artist_name'),
+        record.get('monthly_listeners'),
+        record.get('url'),
+        json.dumps(extra, ensure_ascii=False) if extra else None
+    )
+
+
+def _listener_record(row):
+    record = {
+        'url': row['url'],
+        'artist_name': row['artist_name'],
+        'monthly_listeners': row['monthly_listeners'],
+        'date': row['date'],
+        'artist_id': row['artist_id']
+    }
+    record = {k: v for k, v in record.items() if v is not None}
+    if row['extra']:
+        record.update(json.loads(row['extra']))
+    return record
+
+
+def append_listeners(conn, records):
+    """
+    Insert listener records in one transaction, skipping (artist_id, date) pairs
+    that are already stored.
+
+    Returns:
+        Number of records inserted
+    """
+    if not records:
+        return 0
+    with transaction(conn):
+        before = conn.total_changes
+        conn.executemany(
+            "INSERT OR IGNORE INTO listeners (artist_id, date, artist_name, monthly_listeners, url, extra) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [_listener_row(record) for record in records])
+        inserted = conn.total_changes - before
+        if inserted:
+            _bump_version(conn, 'listeners')
+    return inserted
+
+
+def replace_listeners(conn, records):
+    """
+    Replace the whole listener history in one transaction (used by migrations and fix-up scripts).
+    """
+    with transaction(conn):
+        conn.execute("DELETE FROM listeners")
+        conn.executemany(
+            "INSERT OR REPLACE INTO listeners (artist_id, date, artist_name, monthly_listeners, url, extra) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [_listener_row(record) for record in records])
+        _bump_version(conn, 'listeners')
+
+
+def iter_listeners(conn):
+    """
+    Yield every listener record in insertion order.
+    """
+    for row in conn.execute("SELECT * FROM listeners ORDER BY id"):
+        yield _listener_record(row)
+
+
+def existing_artist_ids(conn, date):
+    """
+    Return the set of artist IDs that already have a row for date.
+    """
+    rows = conn.execute("SELECT artist_id FROM listeners WHERE date = ?", (normalize_date(date),))
+    return {row[0] for row in rows if row[0]}
+
+
+def _artist_stats_row(record):
+    return (record['artist_id'], normalize_date(record['date']), record.get('followers'), record.get('popularity'))
+
+
+def upsert_artist_stats(conn, records):
+    """
+    Store follower/popularity records in one transaction, replacing any row already
+    stored for the same (artist_id, date).
+
+    Returns:
+        Number of records written
+    """
+    if not records:
+        return 0
+    with transaction(conn):
+        conn.executemany(
+            "INSERT OR REPLACE INTO artist_stats (artist_id, date, followers, popularity) VALUES (?, ?, ?, ?)",
+            [_artist_stats_row(record) for record in records])
+        _bump_version(conn, 'artist_stats')
+    return len(records)
+
+
+def replace_artist_stats(conn, records):
+    """
+    Replace all follower/popularity records in one transaction (used by migrations).
+    """
+    with transaction(conn):
+        conn.execute("DELETE FROM artist_stats")
+        conn.executemany(
+            "INSERT OR REPLACE INTO artist_stats (artist_id, date, followers, popularity) VALUES (?, ?, ?, ?)",
+            [_artist_stats_row(record) for record in records])
+        _bump_version(conn, 'artist_stats')
+
+
+def iter_artist_stats(conn):
+    """
+    Yield every follower/popularity record, oldest first.
+    """
+    for row in conn.execute("SELECT artist_id, date, followers, popularity FROM artist_stats ORDER BY date"):
+        yield {'artist_id': row[0], 'date': row[1], 'followers': row[2], 'popularity': row[3]}
+
+
+def load_collection(conn, collection):
+    """
+    Return the documents stored in a collection, in order.
+    """
+    rows = conn.execute("SELECT body FROM collections WHERE collection = ? ORDER BY position", (collection,))
+    return [json.loads(row[0]) for row in rows]
+
+
+def save_collection(conn, collection, items):
+    """
+    Replace the documents in a collection in one transaction.
+    """
+    if collection not in COLLECTIONS:
+        raise ValueError(f"Unknown collection: {collection}")
+    rows = []
+    for position, item in enumerate(items):
+        if isinstance(item, dict):
+            artist_id = item.get('artist_id') or item.get('spotify_id')
+            name = item.get('artist_name') or item.get('name')
+        else:
+            artist_id, name = None, str(item)
+        rows.append((collection, position, artist_id, name, json.dumps(item, ensure_ascii=False)))
+    with transaction(conn):
+        conn.execute("DELETE FROM collections WHERE collection = ?", (collection,))
+        conn.executemany(
+            "INSERT INTO collections (collection, position, artist_id, name, body) VALUES (?, ?, ?, ?, ?)", rows)
+        _bump_version(conn, collection)
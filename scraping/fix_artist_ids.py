@@ -1,17 +1,15 @@
-import json
 import re
-import os
+import listener_store
 
 # Path to the master file
-MASTER_PATH = os.path.join(os.path.dirname(__file__), 'results', 'spotify-monthly-listeners-master.json')
+MASTER_PATH = listener_store.master_path()
 
 def extract_artist_id(url):
     match = re.search(r"artist/([a-zA-Z0-9]+)", url)
     return match.group(1) if match else None
 
 def fix_artist_ids(input_path):
-    with open(input_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    data = listener_store.read_records(input_path)
     updated = 0
     cleaned = []
     for record in data:
@@ -23,8 +21,7 @@ def fix_artist_ids(input_path):
                 updated += 1
         if record.get('monthly_listeners', 0) != 0:
             cleaned.append(record)
-    with open(input_path, 'w', encoding='utf-8') as f:
-        json.dump(cleaned, f, ensure_ascii=False, indent=2)
+    listener_store.write_records(cleaned, input_path)
     print(f"Updated {updated} records and removed {len(data) - len(cleaned)} zero-listener records. Overwrote {input_path}")
 
 if __name__ == "__main__":
@@ -0,0 +1,109 @@
+"""
+HTTP Artist Page Fetcher
+------------------------
+Browser-free extraction path for Spotify artist pages. Pulls the page HTML over a
+pooled aiohttp session and parses the artist name (og:title meta tag) and the
+"monthly listeners" count straight from the markup.
+
+Pages that can't be fetched or parsed come back as (None, None) so scrape.py can
+hand just those artists to the Selenium path.
+"""
+
+import asyncio
+import html
+import re
+
+import aiohttp
+
+DEFAULT_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+META_TAG_RE = re.compile(r"<meta\b[^>]*>", re.IGNORECASE)
+ATTRIBUTE_RE = re.compile(r"""([\w:-]+)\s*=\s*(?:"([^"]*)"|'([^']*)')""")
+# Only accept the exact count ("1,234,567 monthly listeners"), never the abbreviated
+# "1.2M monthly listeners" from og:description - that would silently lose precision.
+MONTHLY_LISTENERS_RE = re.compile(r"(?<![\d.,])(\d{1,3}(?:,\d{3})+|\d+)(?:\s|&nbsp;|&#160;)+monthly listeners", re.IGNORECASE)
+
+
+def parse_meta_content(page, prop):
+    """
+    Return the content of the <meta property="..."> tag matching prop, or None.
+    """
+    for tag in META_TAG_RE.findall(page):
+        attributes = {}
+        for name, double_quoted, single_quoted in ATTRIBUTE_RE.findall(tag):
+            attributes[name.lower()] = double_quoted or single_quoted
+        if attributes.get('property') == prop or attributes.get('name') == prop:
+            content = attributes.get('content')
+            return html.unescape(content).strip() if content else None
+    return None
+
+
+def parse_artist_page(page):
+    """
+    Parse the artist name and monthly listeners string from artist page HTML.
+    Returns (name, monthly) in the same shape as scrape.scrape_artist(), or (None, None)
+    when either value is missing from the markup.
+    """
+    if not page:
+        return None, None
+
+    name = parse_meta_content(page, 'og:title')
+    match = MONTHLY_LISTENERS_RE.search(page)
+    if not name or not match:
+        return None, None
+
+    return name, match.group(1)
+
+
+async def _fetch_page(session, semaphore, url):
+    """
+    Fetch and parse a single artist page. Network errors count as unparseable.
+    """
+    artist_url = url['url'] if isinstance(url, dict) else url
+    async with semaphore:
+        try:
+            async with session.get(artist_url) as response:
+                if response.status != 200:
+                    return None, None
+                page = await response.text()
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            return None, None
+    return parse_artist_page(page)
+
+
+async def fetch_artist_pages(urls, concurrency=100, timeout=15, user_agent=DEFAULT_USER_AGENT, on_result=None):
+    """
+    Fetch and parse many artist pages concurrently over one pooled session.
+
+    Args:
+        urls: Artist URL strings or artist dicts with a 'url' key
+        concurrency: Maximum number of requests in flight (and pooled connections)
+        timeout: Total timeout per request in seconds
+        user_agent: User-Agent header sent with every request
+        on_result: Optional callback(index, name, monthly) called as each page completes
+
+    Returns:
+        List of (name, monthly) tuples in the same order as urls
+    """
+    connector = aiohttp.TCPConnector(limit=concurrency, ttl_dns_cache=300)
+    client_timeout = aiohttp.ClientTimeout(total=timeout)
+    headers = {"User-Agent": user_agent, "Accept-Language": "en-US,en;q=0.9"}
+    semaphore = asyncio.Semaphore(concurrency)
+    results = [(None, None)] * len(urls)
+
+    async with aiohttp.ClientSession(connector=connector, timeout=client_timeout, headers=headers) as session:
+        async def run(index, url):
+            results[index] = await _fetch_page(session, semaphore, url)
+            if on_result:
+                on_result(index, *results[index])
+
+        await asyncio.gather(*(run(i, url) for i, url in enumerate(urls)))
+
+    return results
+
+
+def fetch_artist_pages_sync(urls, **kwargs):
+    """
+    Blocking wrapper around fetch_artist_pages() for the synchronous scraper scripts.
+    """
+    return asyncio.run(fetch_artist_pages(urls, **kwargs))
@@ -0,0 +1,45 @@
+"""
+Listener Store
+--------------
+Append-only storage for the monthly listeners master history.
+
+The format is shared with the web app and lives in datastore/listener_store.py; this
+module re-exports it and adds the scraping results directory as the default location.
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from datastore.listener_store import (  # noqa: E402
+    COMPACT_GARBAGE_RATIO,
+    COMPACT_INTERVAL_SECONDS,
+    LEGACY_MASTER_FILENAME,
+    MASTER_FILENAME,
+    STATS_FILENAME,
+    append_new_records,
+    append_records,
+    compact,
+    dedupe_records,
+    iter_records,
+    legacy_path_for,
+    migrate_from_json,
+    needs_compaction,
+    read_records,
+    write_records,
+)
+
+
+def default_results_dir():
+    """
+    Return the data/results directory the scraping scripts write to.
+    """
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "results")
+
+
+def master_path(results_dir=None):
+    """
+    Return the path of the JSONL master file in results_dir.
+    """
+    return os.path.join(results_dir or default_results_dir(), MASTER_FILENAME)
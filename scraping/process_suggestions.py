@@ -16,10 +16,27 @@ from datetime import datetime
 from dotenv import load_dotenv
 import spotipy
 from spotipy.oauth2 import SpotifyOAuth
+import sqlite_store
 
 # Load environment variables
 load_dotenv()
 
+def load_collection_from_db(collection):
+    """Load a followed artists/suggestions list from the SQLite store."""
+    conn = sqlite_store.connect()
+    try:
+        return sqlite_store.load_collection(conn, collection)
+    finally:
+        conn.close()
+
+def save_collection_to_db(collection, items):
+    """Replace a followed artists/suggestions list in the SQLite store in one transaction."""
+    conn = sqlite_store.connect()
+    try:
+        sqlite_store.save_collection(conn, collection, items)
+    finally:
+        conn.close()
+
 def setup_logging():
     """Configure logging for this script."""
     logging.basicConfig(
@@ -40,15 +57,18 @@ def load_suggestions():
         "artist_suggestions.json"
     )
     
-    if not os.path.exists(suggestions_file):
+    if sqlite_store.backend() != 'sqlite' and not os.path.exists(suggestions_file):
         logging.info("No suggestions file found")
         return []
     
     try:
-        with open(suggestions_file, 'r', encoding='utf-8') as f:
-            suggestions = json.load(f)
-            # Return suggestions that are admin-approved for following or tracking
-            return [s for s in suggestions if s.get('admin_approved') == True and s.get('status') in ['approved_for_follow', 'approved_for_tracking']]
+        if sqlite_store.backend() == 'sqlite':
+            suggestions = load_collection_from_db('suggestions')
+        else:
+            with open(suggestions_file, 'r', encoding='utf-8') as f:
+                suggestions = json.load(f)
+        # Return suggestions that are admin-approved for following or tracking
+        return [s for s in suggestions if s.get('admin_approved') == True and s.get('status') in ['approved_for_follow', 'approved_for_tracking']]
     except Exception as e:
         logging.error(f"Error loading suggestions: {e}")
         return []
@@ -63,6 +83,9 @@ def load_followed_artists():
         "spotify-followed-artists-master.json"
     )
     
+    if sqlite_store.backend() == 'sqlite':
+        return load_collection_from_db('followed_artists')
+    
     if not os.path.exists(followed_file):
         logging.warning("No followed artists file found")
         return []
@@ -85,8 +108,11 @@ def save_followed_artists(artists):
     )
     
     try:
-        with open(followed_file, 'w', encoding='utf-8') as f:
-            json.dump(artists, f, indent=2, ensure_ascii=False)
+        if sqlite_store.backend() == 'sqlite':
+            save_collection_to_db('followed_artists', artists)
+        else:
+            with open(followed_file, 'w', encoding='utf-8') as f:
+                json.dump(artists, f, indent=2, ensure_ascii=False)
         logging.info(f"Saved {len(artists)} artists to followed list")
     except Exception as e:
         logging.error(f"Error saving followed artists: {e}")
@@ -110,12 +136,15 @@ def update_suggestions_status(suggestions_to_update):
         "artist_suggestions.json"
     )
     
-    if not os.path.exists(suggestions_file):
+    if sqlite_store.backend() != 'sqlite' and not os.path.exists(suggestions_file):
         return
     
     try:
-        with open(suggestions_file, 'r', encoding='utf-8') as f:
-            all_suggestions = json.load(f)
+        if sqlite_store.backend() == 'sqlite':
+            all_suggestions = load_collection_from_db('suggestions')
+        else:
+            with open(suggestions_file, 'r', encoding='utf-8') as f:
+                all_suggestions = json.load(f)
         
         # Mark processed suggestions
         processed_ids = {s.get('spotify_id') for s in suggestions_to_update}
@@ -127,8 +156,11 @@ def update_suggestions_status(suggestions_to_update):
                 suggestion['status'] = 'processed'
                 suggestion['processed_date'] = datetime.now().isoformat()
         
-        with open(suggestions_file, 'w', encoding='utf-8') as f:
-            json.dump(all_suggestions, f, indent=2, ensure_ascii=False)
+        if sqlite_store.backend() == 'sqlite':
+            save_collection_to_db('suggestions', all_suggestions)
+        else:
+            with open(suggestions_file, 'w', encoding='utf-8') as f:
+                json.dump(all_suggestions, f, indent=2, ensure_ascii=False)
         
         logging.info(f"Marked {len(suggestions_to_update)} suggestions as processed")
         
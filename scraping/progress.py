@@ -0,0 +1,162 @@
+"""
+Scraper Progress Events
+-----------------------
+Machine-readable progress channel between the scrapers and the web app's JobService.
+
+Events are JSON objects, one per line:
+
+    {"event": "start", "total": 150}
+    {"event": "artist", "current": 45, "total": 150, "artist": "Artist Name"}
+    {"event": "skip", "artist": "Artist Name"}
+    {"event": "phase", "phase": "Retrying 3 failed URLs"}
+    {"event": "done", "count": 150}
+    {"event": "error", "message": "Failed to scrape 3 artists"}
+
+JobService passes the write end of a pipe in SCRAPER_PROGRESS_FD, so progress never
+mixes with the log output on stdout. Where file descriptors can't be inherited
+(Windows), it sets SCRAPER_PROGRESS_STDOUT=1 instead and the events go to stdout with
+the EVENT_PREFIX marker. Run from a terminal with neither set, the scrapers print the
+human-readable "PROGRESS: ..." lines they always have.
+
+Each event is written with a single os.write() of less than PIPE_BUF bytes, so lines
+from parallel worker processes sharing the pipe never interleave. Events that would be
+longer have their longest text field shortened, so every line stays valid JSON.
+"""
+
+import json
+import os
+
+FD_ENV = 'SCRAPER_PROGRESS_FD'
+STDOUT_ENV = 'SCRAPER_PROGRESS_STDOUT'
+EVENT_PREFIX = '@progress '
+
+MAX_EVENT_BYTES = 512  # Well under PIPE_BUF (4096 on Linux), so writes are atomic
+MAX_NAME_LENGTH = 200
+
+_fd = None
+_fd_checked = False
+
+
+def _progress_fd():
+    """
+    Return the inherited progress pipe, or None when progress goes to stdout.
+    """
+    global _fd, _fd_checked
+    if not _fd_checked:
+        _fd_checked = True
+        try:
+            _fd = int(os.environ[FD_ENV])
+        except (KeyError, ValueError):
+            _fd = None
+    return _fd
+
+
+def _legacy_line(event, fields):
+    """
+    Return the human-readable line for an event (or None if it has none).
+    """
+    if event == 'start':
+        return f"PROGRESS: Starting scrape of {fields['total']} artists"
+    if event == 'artist':
+        return f"PROGRESS: Processing artist {fields['current']}/{fields['total']}: {fields['artist']}"
+    if event == 'done':
+        return f"PROGRESS: Completed scraping {fields['count']} artists"
+    if event == 'phase':
+        return fields['phase']
+    if event == 'error':
+        return f"ERROR: {fields['message']}"
+    return None
+
+
+def _encode(event, fields):
+    """
+    Encode an event as a JSON line (without the newline) shorter than MAX_EVENT_BYTES.
+
+    Trims the longest string field until the line fits rather than cutting the encoded
+    bytes, which would break the JSON or split a multi-byte character.
+    """
+    fields = dict(fields)
+    while True:
+        line = json.dumps({'event': event, **fields}, ensure_ascii=False).encode('utf-8')
+        excess = len(line) - (MAX_EVENT_BYTES - 1)
+        text_keys = [key for key, value in fields.items() if isinstance(value, str) and value]
+        if excess <= 0 or not text_keys:
+            return line
+        key = max(text_keys, key=lambda k: len(fields[k]))
+        # An encoded character takes at most 6 bytes (a \uXXXX escape), so this never trims too much
+        fields[key] = fields[key][:-max(1, excess // 6)]
+
+
+def emit(event, **fields):
+    """
+    Send one progress event.
+    """
+    if isinstance(fields.get('artist'), str):
+        fields['artist'] = fields['artist'][:MAX_NAME_LENGTH]
+
+    global _fd
+    fd = _progress_fd()
+    if fd is not None:
+        line = _encode(event, fields)
+        try:
+            os.write(fd, line + b'\n')
+            return
+        except OSError:
+            _fd = None  # Reader went away - keep going on stdout
+
+    if os.environ.get(STDOUT_ENV):
+        print(EVENT_PREFIX + json.dumps({'event': event, **fields}, ensure_ascii=False), flush=True)
+        return
+
+    line = _legacy_line(event, fields)
+    if line:
+        print(line, flush=True)
+
+
+def start(total):
+    """
+    Report how many artists are about to be scraped.
+    """
+    emit('start', total=total)
+
+
+def artist(current, total, artist_name):
+    """
+    Report that an artist is being processed.
+    """
+    emit('artist', current=current, total=total, artist=artist_name)
+
+
+def skip(artist_name):
+    """
+    Report an artist skipped because it was already scraped today.
+    """
+    emit('skip', artist=artist_name)
+
+
+def phase(description):
+    """
+    Report a change of phase (setup, retries, saving).
+    """
+    emit('phase', phase=description)
+
+
+def done(count):
+    """
+    Report the number of artists scraped successfully.
+    """
+    emit('done', count=count)
+
+
+def error(message):
+    """
+    Report an error worth showing with the job's result (the log keeps the details).
+    """
+    emit('error', message=message)
+
+
+def is_structured():
+    """
+    Check whether events go to JobService rather than to a terminal.
+    """
+    return _progress_fd() is not None or bool(os.environ.get(STDOUT_ENV))
@@ -23,6 +23,17 @@ from dotenv import load_dotenv
 import time
 import re
 import argparse
+import listener_store
+import progress
+import sqlite_store
+import multiprocessing
+
+# Browser-free fetcher is optional - it needs aiohttp
+try:
+    from http_fetcher import fetch_artist_pages_sync
+    HTTP_FETCHER_AVAILABLE = True
+except ImportError:
+    HTTP_FETCHER_AVAILABLE = False
 
 # Initialize colorama for colored console output
 init(autoreset=True, convert=True, strip=False)
@@ -106,10 +117,14 @@ def check_chrome_version():
         print(Fore.YELLOW + f"Could not check Chrome version: {e}")
 
 
-def setup_driver(chromedriver_path=None, headless=False, max_retries=3):
+def setup_driver(chromedriver_path=None, headless=False, max_retries=3,
+                 remote_debugging_port=9222, kill_stale_processes=True):
     """
     Set up and return a Selenium Chrome WebDriver with custom options.
     Includes network resilience settings and session recovery.
+
+    Parallel workers pass their own remote_debugging_port and disable
+    kill_stale_processes so a retry in one worker can't kill its siblings' browsers.
     """
     import platform
     from selenium.webdriver.chrome.service import Service
@@ -121,7 +136,8 @@ def setup_driver(chromedriver_path=None, headless=False, max_retries=3):
         try:
             if attempt > 0:
                 print(f"Retrying driver setup (attempt {attempt + 1}/{max_retries})...")
-                kill_chrome_processes()
+                if kill_stale_processes:
+                    kill_chrome_processes()
                 time.sleep(3)
             
             # Set up Chrome options
@@ -140,7 +156,7 @@ def setup_driver(chromedriver_path=None, headless=False, max_retries=3):
             
             # Session management
             if not headless:
-                chrome_options.add_argument("--remote-debugging-port=9222")
+                chrome_options.add_argument(f"--remote-debugging-port={remote_debugging_port}")
             chrome_options.add_argument("--disable-web-security")
             chrome_options.add_argument("--disable-features=VizDisplayCompositor")
             chrome_options.add_argument("--no-first-run")
@@ -288,11 +304,18 @@ def load_urls(input_path=None):
     if input_path:
         with open(input_path, 'r', encoding='utf-8') as f:
             return json.load(f)
+    elif sqlite_store.backend() == 'sqlite':
+        conn = sqlite_store.connect()
+        try:
+            return sqlite_store.load_collection(conn, 'followed_artists')
+        finally:
+            conn.close()
     elif os.path.exists(master_artist_file):
         with open(master_artist_file, 'r', encoding='utf-8') as f:
             return json.load(f)
     else:
         print(Fore.RED + "No input file or master artist file found.")
+        progress.error("No input file or master artist file found")
         sys.exit(1)
 
 
@@ -300,17 +323,17 @@ def load_existing_listeners(target_date):
     """
     Load existing monthly listener entries for the target date to avoid duplicates.
     """
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    results_dir = os.path.join(script_dir, "..", "data", "results")
-    master_listeners_file = os.path.join(results_dir, 'spotify-monthly-listeners-master.json')
-
     existing_artist_ids = set()
     
-    if os.path.exists(master_listeners_file):
-        with open(master_listeners_file, 'r', encoding='utf-8') as f:
-            listeners_data = json.load(f)
-        
-        for entry in listeners_data:
+    if sqlite_store.backend() == 'sqlite':
+        # Answered from the date index instead of reading the whole history
+        conn = sqlite_store.connect()
+        try:
+            existing_artist_ids = sqlite_store.existing_artist_ids(conn, target_date)
+        finally:
+            conn.close()
+    else:
+        for entry in listener_store.iter_records(listener_store.master_path()):
             if entry.get('date') == target_date:
                 artist_id = entry.get('artist_id')
                 if artist_id:
@@ -391,23 +414,46 @@ def extract_artist_id(url):
     return match.group(1) if match else None
 
 
-def scrape_all(driver, urls, today, bar_format, existing_artist_ids, wait_time=0.2):
+# Shared progress counter for --workers mode, installed in each worker process by _init_worker()
+_progress_counter = None
+_progress_total = None
+
+
+def _init_worker(counter, total):
     """
-    Scrape all artist URLs, returning a list of results and a list of failed URLs.
-    Skips artists that already have data for today to prevent duplicates.
+    Pool initializer: share the overall progress counter with a worker process.
+    """
+    global _progress_counter, _progress_total
+    _progress_counter = counter
+    _progress_total = total
+
+
+def _next_progress_position(index, total):
+    """
+    Return the (current, total) position to report for the artist at `index`.
+    In --workers mode the position comes from the counter shared by all workers,
+    so the admin dashboard sees one overall count instead of N interleaved ones.
+    """
+    if _progress_counter is None:
+        return index + 1, total
+    with _progress_counter.get_lock():
+        _progress_counter.value += 1
+        return _progress_counter.value, _progress_total
+
+
+def filter_already_scraped(urls, existing_artist_ids):
+    """
+    Drop artists that already have data for today, returning the list still to scrape.
     """
-    results = []
-    failed_urls = []
-    skipped_count = 0
-    
-    # Filter out artists that already have data for today
     urls_to_scrape = []
+    skipped_count = 0
     for url in urls:
         artist_id = url.get('artist_id') if isinstance(url, dict) and url.get('artist_id') else extract_artist_id(url['url'] if isinstance(url, dict) else url)
         if artist_id in existing_artist_ids:
             skipped_count += 1
             artist_name = url.get('artist_name', 'Unknown') if isinstance(url, dict) else 'Unknown'
             print(f"Skipping {artist_name} - already scraped today")
+            progress.skip(artist_name)
         else:
             urls_to_scrape.append(url)
     
@@ -416,21 +462,41 @@ def scrape_all(driver, urls, today, bar_format, existing_artist_ids, wait_time=0
     else:
         print(f"Scraping {len(urls_to_scrape)} artists")
     
-    # Output total for progress tracking
-    print(f"PROGRESS: Starting scrape of {len(urls_to_scrape)} artists")
+    return urls_to_scrape
+
+
+def scrape_all(driver, urls, today, bar_format, existing_artist_ids, wait_time=0.2, worker_id=None):
+    """
+    Scrape all artist URLs, returning a list of results and a list of failed URLs.
+    Skips artists that already have data for today to prevent duplicates.
+    When worker_id is set, the URLs are one worker's pre-filtered share of a --workers run.
+    """
+    results = []
+    failed_urls = []
+    
+    if worker_id is None:
+        urls_to_scrape = filter_already_scraped(urls, existing_artist_ids)
+        # Output total for progress tracking
+        progress.start(len(urls_to_scrape))
+    else:
+        urls_to_scrape = urls
+        print(f"[worker {worker_id}] Scraping {len(urls_to_scrape)} artists", flush=True)
     
     if not urls_to_scrape:
         print(Fore.YELLOW + "No new artists to scrape - all artists already have data for today!")
         return results, failed_urls
 
     is_tty = sys.stdout.isatty()
-    with tqdm(total=len(urls_to_scrape), desc="Scraping artists", bar_format=bar_format if is_tty else None,
-              colour="#1DB954" if is_tty else None, disable=not is_tty, dynamic_ncols=is_tty, file=sys.stdout) as pbar:
+    desc = "Scraping artists" if worker_id is None else f"Worker {worker_id}"
+    with tqdm(total=len(urls_to_scrape), desc=desc, bar_format=bar_format if is_tty else None,
+              colour="#1DB954" if is_tty else None, disable=not is_tty, dynamic_ncols=is_tty, file=sys.stdout,
+              position=worker_id or 0) as pbar:
         for i, url in enumerate(urls_to_scrape):
             try:
                 # Output progress for admin dashboard
                 artist_name = url.get('artist_name', 'Unknown') if isinstance(url, dict) else 'Unknown'
-                print(f"PROGRESS: Processing artist {i+1}/{len(urls_to_scrape)}: {artist_name}", flush=True)
+                current, total = _next_progress_position(i, len(urls_to_scrape))
+                progress.artist(current, total, artist_name)
                 
                 name, monthly = scrape_artist(driver, url)
                 artist_url = url['url'] if isinstance(url, dict) else url
@@ -468,6 +534,121 @@ def scrape_all(driver, urls, today, bar_format, existing_artist_ids, wait_time=0
     return results, failed_urls
 
 
+def scrape_worker(task):
+    """
+    Scrape one worker's share of the artist URLs on its own Chrome instance.
+    Runs in a separate process and returns (results, failed_urls) for the parent to merge.
+    Failed URLs are retried on the same driver before returning.
+    """
+    worker_id, urls, today, bar_format, chromedriver_path, headless = task
+    driver = None
+    try:
+        driver = setup_driver(
+            chromedriver_path=chromedriver_path,
+            headless=headless,
+            remote_debugging_port=9222 + worker_id,
+            kill_stale_processes=False
+        )
+        driver.get("https://open.spotify.com")
+        time.sleep(3)  # Wait for session/cookies to initialize
+        
+        results, failed_urls = scrape_all(driver, urls, today, bar_format, set(), worker_id=worker_id)
+        if failed_urls:
+            print(Fore.YELLOW + f"[worker {worker_id}] Retrying {len(failed_urls)} failed URLs...", flush=True)
+            retry_results, failed_urls = retry_failed(driver, failed_urls, today)
+            results.extend(retry_results)
+        
+        print(f"[worker {worker_id}] Finished: {len(results)} scraped, {len(failed_urls)} failed", flush=True)
+        return results, failed_urls
+    except Exception as e:
+        print(Fore.RED + f"[worker {worker_id}] Worker failed: {e}", flush=True)
+        progress.error(f"Worker {worker_id} failed: {e}")
+        return [], urls
+    finally:
+        if driver:
+            try:
+                driver.quit()
+            except Exception as e:
+                print(Fore.YELLOW + f"[worker {worker_id}] Warning: Error closing browser: {e}")
+
+
+def scrape_parallel(urls, today, bar_format, existing_artist_ids, workers, chromedriver_path=None, headless=False):
+    """
+    Scrape artist URLs across several worker processes, each driving its own Chrome instance.
+    The URL list is dealt round-robin so every worker gets a similar share, and the
+    per-worker results are merged into a single (results, failed_urls) pair.
+    """
+    urls_to_scrape = filter_already_scraped(urls, existing_artist_ids)
+    progress.start(len(urls_to_scrape))
+    
+    if not urls_to_scrape:
+        print(Fore.YELLOW + "No new artists to scrape - all artists already have data for today!")
+        return [], []
+    
+    workers = min(workers, len(urls_to_scrape))
+    print(f"Starting {workers} scraping workers...")
+    tasks = [
+        (worker_id, urls_to_scrape[worker_id::workers], today, bar_format, chromedriver_path, headless)
+        for worker_id in range(workers)
+    ]
+    
+    counter = multiprocessing.Value('i', 0)
+    results = []
+    failed_urls = []
+    with multiprocessing.Pool(processes=workers, initializer=_init_worker,
+                              initargs=(counter, len(urls_to_scrape))) as pool:
+        for worker_results, worker_failed in pool.imap_unordered(scrape_worker, tasks):
+            results.extend(worker_results)
+            failed_urls.extend(worker_failed)
+    
+    return results, failed_urls
+
+
+def scrape_all_http(urls, today, existing_artist_ids, concurrency=100):
+    """
+    Scrape artist pages over plain HTTP without a browser.
+    Returns (results, fallback_urls) where fallback_urls are the pages that could not be
+    fetched or parsed and still need the Selenium path.
+    """
+    urls_to_scrape = filter_already_scraped(urls, existing_artist_ids)
+    progress.start(len(urls_to_scrape))
+    
+    if not urls_to_scrape:
+        print(Fore.YELLOW + "No new artists to scrape - all artists already have data for today!")
+        return [], []
+    
+    completed = [0]
+    
+    def on_result(index, name, monthly):
+        completed[0] += 1
+        url = urls_to_scrape[index]
+        artist_name = name or (url.get('artist_name', 'Unknown') if isinstance(url, dict) else 'Unknown')
+        progress.artist(completed[0], len(urls_to_scrape), artist_name)
+    
+    print(f"Fetching {len(urls_to_scrape)} artist pages over HTTP ({concurrency} concurrent requests)...")
+    pages = fetch_artist_pages_sync(urls_to_scrape, concurrency=concurrency, on_result=on_result)
+    
+    results = []
+    fallback_urls = []
+    for url, (name, monthly) in zip(urls_to_scrape, pages):
+        artist_url = url['url'] if isinstance(url, dict) else url
+        artist_id = url.get('artist_id') if isinstance(url, dict) and url.get('artist_id') else extract_artist_id(artist_url)
+        monthly_listeners = parse_listener_count(monthly)
+        if name and monthly_listeners != 0:
+            results.append({
+                'url': artist_url,
+                'artist_name': name,
+                'monthly_listeners': monthly_listeners,
+                'date': today,
+                'artist_id': artist_id
+            })
+        else:
+            fallback_urls.append(url)
+    
+    print(Fore.GREEN + f"HTTP fetcher parsed {len(results)} artists, {len(fallback_urls)} need the browser")
+    return results, fallback_urls
+
+
 def retry_failed(driver, failed_urls, today):
     """
     Retry failed URLs with longer delays between requests.
@@ -515,9 +696,10 @@ def report(results, failed_urls):
     """
     print("\n" + "="*60)
     print(Fore.GREEN + f"Successfully scraped {len(results)} artists")
-    print(f"PROGRESS: Completed scraping {len(results)} artists")
+    progress.done(len(results))
     if failed_urls:
         print(Fore.RED + f"Failed to scrape {len(failed_urls)} artists")
+        progress.error(f"Failed to scrape {len(failed_urls)} artists")
         for url in failed_urls:
             artist_name = url.get('artist_name', 'Unknown') if isinstance(url, dict) else 'Unknown'
             print(f"  - {artist_name}")
@@ -541,54 +723,63 @@ def save_results(results, today, output_path=None):
 
 def append_to_master(results, master_path=None):
     """
-    Append new results to the master JSON file with duplicate prevention.
+    Append new results to the master JSONL store with duplicate prevention.
+    Only the new rows are written; the existing history is read but never rewritten.
+    With STORAGE_BACKEND=sqlite the rows go to the SQLite store instead.
     """
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    results_dir = os.path.join(script_dir, "..", "data", "results")
     if not master_path:
-        master_path = os.path.join(results_dir, 'spotify-monthly-listeners-master.json')
-    
-    if os.path.exists(master_path):
-        with open(master_path, 'r', encoding='utf-8') as f:
-            master = json.load(f)
-    else:
-        master = []
-    
-    # Create a set of existing entries for duplicate detection
-    existing_entries = set()
-    for entry in master:
-        # Create a unique key using artist_id and date
-        key = (entry.get('artist_id'), entry.get('date'))
-        existing_entries.add(key)
+        if sqlite_store.backend() == 'sqlite':
+            return append_to_database(results)
+        master_path = listener_store.master_path()
     
-    # Only add results that don't already exist
-    new_results = []
+    # Only add results that don't already exist; the store checks the (artist_id, date)
+    # keys for these dates and appends under one lock, so concurrent scrapers can't race
+    stats = {}
+    new_results = listener_store.append_new_records(results, master_path, stats)
+    appended = {id(result) for result in new_results}
     duplicates_prevented = 0
     
     for result in results:
-        key = (result.get('artist_id'), result.get('date'))
-        if key not in existing_entries:
-            new_results.append(result)
-            existing_entries.add(key)  # Add to set to prevent duplicates within this batch
-        else:
+        if id(result) not in appended:
             duplicates_prevented += 1
             print(f"Prevented duplicate: {result.get('artist_name')} for {result.get('date')}")
     
     if new_results:
-        master.extend(new_results)
-        
-        with open(master_path, 'w', encoding='utf-8') as f:
-            json.dump(master, f, ensure_ascii=False, indent=2)
-        
         print(Fore.GREEN + f"Appended {len(new_results)} new results to master file")
         if duplicates_prevented > 0:
             print(Fore.YELLOW + f"Prevented {duplicates_prevented} duplicate entries")
     else:
         print(Fore.YELLOW + "No new results to append - all were duplicates")
     
+    if listener_store.needs_compaction(master_path, stats, stats['duplicate_rows']):
+        lines_before, records_after = listener_store.compact(master_path)
+        print(f"Compacted master file: {lines_before} lines -> {records_after} records")
+    
     return len(new_results)
 
 
+def append_to_database(results, db_path=None):
+    """
+    Insert results into the SQLite store in a single transaction.
+    Rows for an (artist_id, date) that is already stored are skipped by the unique index.
+    """
+    conn = sqlite_store.connect(db_path)
+    try:
+        inserted = sqlite_store.append_listeners(conn, results)
+    finally:
+        conn.close()
+    
+    duplicates_prevented = len(results) - inserted
+    if inserted:
+        print(Fore.GREEN + f"Inserted {inserted} new results into {db_path or sqlite_store.default_db_path()}")
+        if duplicates_prevented > 0:
+            print(Fore.YELLOW + f"Prevented {duplicates_prevented} duplicate entries")
+    else:
+        print(Fore.YELLOW + "No new results to append - all were duplicates")
+    
+    return inserted
+
+
 def parse_args():
     parser = argparse.ArgumentParser(description="Scrape Spotify artist monthly listeners.")
     parser.add_argument('--input', help="Input JSON file with artist URLs")
@@ -597,6 +788,11 @@ def parse_args():
     parser.add_argument('--output', help="Output JSON file for results")
     parser.add_argument('--no-prompt', action='store_true', help="Skip login confirmation prompt")
     parser.add_argument('--allow-duplicates', action='store_true', help="Allow scraping artists already scraped today (bypass duplicate protection)")
+    parser.add_argument('--workers', type=int, default=1, help="Number of parallel Chrome workers (default: 1)")
+    parser.add_argument('--fetcher', choices=['http', 'selenium'], default='http',
+                        help="Page fetcher: 'http' parses pages without a browser and falls back to Selenium "
+                             "only for pages it cannot parse; 'selenium' always uses Chrome (default: http)")
+    parser.add_argument('--concurrency', type=int, default=100, help="Concurrent requests for the HTTP fetcher (default: 100)")
     return parser.parse_args()
 
 
@@ -652,49 +848,73 @@ def main():
         else:
             existing_artist_ids = load_existing_listeners(today)
         
-        print("\nSetting up Chrome WebDriver...")
-        try:
-            driver = setup_driver(chromedriver_path=args.chromedriver, headless=args.headless)
-        except Exception as e:
-            print(Fore.RED + f"Failed to create Chrome WebDriver: {e}")
-            print("\nTroubleshooting steps:")
-            print("1. Make sure Chrome is installed and updated")
-            print("2. Download the correct ChromeDriver version from https://chromedriver.chromium.org/")
-            print("3. Try running with --headless flag")
-            print("4. Restart your computer to clear stuck processes")
-            return
+        bar_format = "{l_bar}{bar}| {n_fmt}/{total_fmt} artists | Elapsed: {elapsed} | ETA: {remaining}"
+        results = []
+        failed_urls = []
+        
+        if args.fetcher == 'http' and not HTTP_FETCHER_AVAILABLE:
+            print(Fore.YELLOW + "aiohttp is not installed - falling back to the Selenium fetcher")
+        elif args.fetcher == 'http':
+            results, urls = scrape_all_http(urls, today, existing_artist_ids, concurrency=args.concurrency)
+            # Everything left has already passed the duplicate filter
+            existing_artist_ids = set()
+            if urls:
+                print(Fore.YELLOW + f"\nFalling back to Selenium for {len(urls)} artists")
         
-        # Initial navigation with retry logic
-        max_init_retries = 3
-        for attempt in range(max_init_retries):
+        if urls and args.workers > 1:
+            # Each worker opens its own browser, so there is no single window to sign in to
+            print(f"\nRunning with {args.workers} parallel workers (login prompt skipped)")
+            browser_results, failed_urls = scrape_parallel(
+                urls, today, bar_format, existing_artist_ids, args.workers,
+                chromedriver_path=args.chromedriver, headless=args.headless
+            )
+            results.extend(browser_results)
+        elif urls:
+            print("\nSetting up Chrome WebDriver...")
             try:
-                print("Navigating to Spotify...")
-                driver.get("https://open.spotify.com")
-                time.sleep(3)  # Wait for session/cookies to initialize
-                break
+                driver = setup_driver(chromedriver_path=args.chromedriver, headless=args.headless)
             except Exception as e:
-                if attempt < max_init_retries - 1:
-                    print(Fore.YELLOW + f"Failed to load Spotify (attempt {attempt + 1}/{max_init_retries}): {e}")
-                    print("Retrying in 5 seconds...")
-                    time.sleep(5)
-                else:
-                    print(Fore.RED + f"Failed to load Spotify after {max_init_retries} attempts: {e}")
-                    raise
+                print(Fore.RED + f"Failed to create Chrome WebDriver: {e}")
+                progress.error(f"Failed to create Chrome WebDriver: {e}")
+                print("\nTroubleshooting steps:")
+                print("1. Make sure Chrome is installed and updated")
+                print("2. Download the correct ChromeDriver version from https://chromedriver.chromium.org/")
+                print("3. Try running with --headless flag")
+                print("4. Restart your computer to clear stuck processes")
+                return
+            
+            # Initial navigation with retry logic
+            max_init_retries = 3
+            for attempt in range(max_init_retries):
+                try:
+                    print("Navigating to Spotify...")
+                    driver.get("https://open.spotify.com")
+                    time.sleep(3)  # Wait for session/cookies to initialize
+                    break
+                except Exception as e:
+                    if attempt < max_init_retries - 1:
+                        print(Fore.YELLOW + f"Failed to load Spotify (attempt {attempt + 1}/{max_init_retries}): {e}")
+                        print("Retrying in 5 seconds...")
+                        time.sleep(5)
+                    else:
+                        print(Fore.RED + f"Failed to load Spotify after {max_init_retries} attempts: {e}")
+                        raise
 
-        # Only prompt if --no-prompt is NOT set
-        if not args.no_prompt:
-            input("Please sign in to Spotify in the opened browser window, then press Enter here to continue...")
+            # Only prompt if --no-prompt is NOT set
+            if not args.no_prompt:
+                input("Please sign in to Spotify in the opened browser window, then press Enter here to continue...")
 
-        bar_format = "{l_bar}{bar}| {n_fmt}/{total_fmt} artists | Elapsed: {elapsed} | ETA: {remaining}"
-        
-        results, failed_urls = scrape_all(driver, urls, today, bar_format, existing_artist_ids)
-        
-        if failed_urls:
-            print(Fore.YELLOW + f"\nRetrying {len(failed_urls)} failed URLs...")
-            retry_results, still_failed = retry_failed(driver, failed_urls, today)
-            results.extend(retry_results)
-            failed_urls = still_failed
+            browser_results, failed_urls = scrape_all(driver, urls, today, bar_format, existing_artist_ids)
+            results.extend(browser_results)
+            
+            if failed_urls:
+                print(Fore.YELLOW + f"\nRetrying {len(failed_urls)} failed URLs...")
+                progress.phase(f"Retrying {len(failed_urls)} failed URLs")
+                retry_results, still_failed = retry_failed(driver, failed_urls, today)
+                results.extend(retry_results)
+                failed_urls = still_failed
             
+        progress.phase(f"Saving {len(results)} results")
         save_results(results, today, args.output)
         append_to_master(results)
         report(results, failed_urls)
@@ -708,6 +928,7 @@ def main():
         print("Partial results saved.")
     except Exception as e:
         print(Fore.RED + f"\nUnexpected error during scraping: {e}")
+        progress.error(f"Unexpected error during scraping: {e}")
         print("This might be due to network issues or Spotify blocking requests.")
         print("Try running the script again later or with fewer concurrent requests.")
         if 'results' in locals() and results:
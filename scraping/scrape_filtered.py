@@ -21,6 +21,9 @@ from dotenv import load_dotenv
 import time
 import re
 import argparse
+import listener_store
+import progress
+import sqlite_store
 
 # Initialize colorama for colored console output
 init(autoreset=True, convert=True, strip=False)
@@ -89,12 +92,19 @@ def load_artists_by_date(target_date=None):
     results_dir = os.path.join(script_dir, "..", "data", "results")
     master_artist_file = os.path.join(results_dir, 'spotify-followed-artists-master.json')
 
-    if not os.path.exists(master_artist_file):
+    if sqlite_store.backend() == 'sqlite':
+        conn = sqlite_store.connect()
+        try:
+            all_artists = sqlite_store.load_collection(conn, 'followed_artists')
+        finally:
+            conn.close()
+    elif not os.path.exists(master_artist_file):
         print(Fore.RED + "Master artist file not found.")
+        progress.error("Master artist file not found")
         return []
-
-    with open(master_artist_file, 'r', encoding='utf-8') as f:
-        all_artists = json.load(f)
+    else:
+        with open(master_artist_file, 'r', encoding='utf-8') as f:
+            all_artists = json.load(f)
 
     if target_date is None:
         return all_artists
@@ -113,18 +123,18 @@ def load_existing_listeners(target_date):
     """
     Load existing monthly listener entries for the target date to avoid duplicates.
     """
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    results_dir = os.path.join(script_dir, "..", "data", "results")
-    master_listeners_file = os.path.join(results_dir, 'spotify-monthly-listeners-master.json')
-
     existing_artist_ids = set()
     
-    if os.path.exists(master_listeners_file):
-        with open(master_listeners_file, 'r', encoding='utf-8') as f:
-            listeners_data = json.load(f)
-        
+    if sqlite_store.backend() == 'sqlite':
+        # Answered from the date index instead of reading the whole history
+        conn = sqlite_store.connect()
+        try:
+            existing_artist_ids = sqlite_store.existing_artist_ids(conn, target_date)
+        finally:
+            conn.close()
+    else:
         # Use the target_date as-is (YYYY-MM-DD format) to match saved data format
-        for entry in listeners_data:
+        for entry in listener_store.iter_records(listener_store.master_path()):
             if entry.get('date') == target_date:
                 artist_id = entry.get('artist_id')
                 if artist_id:
@@ -180,10 +190,12 @@ def scrape_filtered_artists(driver, artists, today, existing_artist_ids):
         if artist_id in existing_artist_ids:
             skipped_count += 1
             print(f"Skipping {artist.get('artist_name', 'Unknown')} - already scraped today")
+            progress.skip(artist.get('artist_name', 'Unknown'))
         else:
             artists_to_scrape.append(artist)
     
     print(f"Scraping {len(artists_to_scrape)} artists (skipped {skipped_count} duplicates)")
+    progress.start(len(artists_to_scrape))
     
     if not artists_to_scrape:
         print(Fore.YELLOW + "No new artists to scrape!")
@@ -197,7 +209,8 @@ def scrape_filtered_artists(driver, artists, today, existing_artist_ids):
               colour="#1DB954" if is_tty else None, disable=not is_tty, 
               dynamic_ncols=is_tty, file=sys.stdout) as pbar:
         
-        for artist in artists_to_scrape:
+        for i, artist in enumerate(artists_to_scrape):
+            progress.artist(i + 1, len(artists_to_scrape), artist.get('artist_name', 'Unknown'))
             name, monthly = scrape_artist(driver, artist)
             artist_url = artist.get('url')
             artist_id = artist.get('artist_id')
@@ -217,6 +230,7 @@ def scrape_filtered_artists(driver, artists, today, existing_artist_ids):
             pbar.update(1)
             time.sleep(0.2)  # Small delay between requests
     
+    progress.done(len(results))
     return results, failed_urls
 
 
@@ -240,52 +254,63 @@ def save_results(results, today, output_path=None):
 
 def append_to_master(results):
     """
-    Append results to the master monthly listeners file with duplicate prevention.
+    Append results to the master monthly listeners store with duplicate prevention.
+    Only today's new rows are written; the existing history is read but never rewritten.
+    With STORAGE_BACKEND=sqlite the rows go to the SQLite store instead.
     """
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    results_dir = os.path.join(script_dir, "..", "data", "results")
-    master_path = os.path.join(results_dir, 'spotify-monthly-listeners-master.json')
-    
-    master = []
-    if os.path.exists(master_path):
-        with open(master_path, 'r', encoding='utf-8') as f:
-            master = json.load(f)
-    
-    # Create a set of existing entries for duplicate detection
-    existing_entries = set()
-    for entry in master:
-        # Create a unique key using artist_id and date
-        key = (entry.get('artist_id'), entry.get('date'))
-        existing_entries.add(key)
-    
-    # Only add results that don't already exist
-    new_results = []
+    if sqlite_store.backend() == 'sqlite':
+        return append_to_database(results)
+    
+    master_path = listener_store.master_path()
+    
+    # Only add results that don't already exist; the store checks the (artist_id, date)
+    # keys for these dates and appends under one lock, so concurrent scrapers can't race
+    stats = {}
+    new_results = listener_store.append_new_records(results, master_path, stats)
+    appended = {id(result) for result in new_results}
     duplicates_prevented = 0
     
     for result in results:
-        key = (result.get('artist_id'), result.get('date'))
-        if key not in existing_entries:
-            new_results.append(result)
-            existing_entries.add(key)  # Add to set to prevent duplicates within this batch
-        else:
+        if id(result) not in appended:
             duplicates_prevented += 1
             print(f"Prevented duplicate: {result.get('artist_name')} for {result.get('date')}")
     
     if new_results:
-        master.extend(new_results)
-        
-        with open(master_path, 'w', encoding='utf-8') as f:
-            json.dump(master, f, ensure_ascii=False, indent=2)
-        
         print(Fore.GREEN + f"Appended {len(new_results)} new results to {master_path}")
         if duplicates_prevented > 0:
             print(Fore.YELLOW + f"Prevented {duplicates_prevented} duplicate entries")
     else:
         print(Fore.YELLOW + "No new results to append - all were duplicates")
     
+    if listener_store.needs_compaction(master_path, stats, stats['duplicate_rows']):
+        lines_before, records_after = listener_store.compact(master_path)
+        print(f"Compacted master file: {lines_before} lines -> {records_after} records")
+    
     return len(new_results)
 
 
+def append_to_database(results, db_path=None):
+    """
+    Insert results into the SQLite store in a single transaction.
+    Rows for an (artist_id, date) that is already stored are skipped by the unique index.
+    """
+    conn = sqlite_store.connect(db_path)
+    try:
+        inserted = sqlite_store.append_listeners(conn, results)
+    finally:
+        conn.close()
+    
+    duplicates_prevented = len(results) - inserted
+    if inserted:
+        print(Fore.GREEN + f"Inserted {inserted} new results into {db_path or sqlite_store.default_db_path()}")
+        if duplicates_prevented > 0:
+            print(Fore.YELLOW + f"Prevented {duplicates_prevented} duplicate entries")
+    else:
+        print(Fore.YELLOW + "No new results to append - all were duplicates")
+    
+    return inserted
+
+
 def main():
     parser = argparse.ArgumentParser(description="Scrape Spotify artist monthly listeners with filters.")
     parser.add_argument('--date', help="Date to filter artists by (YYYY-MM-DD format). Defaults to today.")
@@ -347,6 +372,7 @@ def main():
         
         if failed_urls:
             print(Fore.RED + f"\n[ERROR] {len(failed_urls)} artists failed to scrape:")
+            progress.error(f"{len(failed_urls)} artists failed to scrape")
             for artist in failed_urls:
                 print(Fore.RED + f"  * {artist.get('artist_name', 'Unknown')} - {artist.get('url', 'No URL')}")
     
@@ -0,0 +1,50 @@
+"""
+SQLite Store
+------------
+SQLite storage backend for the listener history and the followed artists,
+suggestions and blacklist lists, selected with STORAGE_BACKEND=sqlite.
+
+The schema is shared with the web app and lives in datastore/sqlite_store.py; this
+module re-exports it and adds the scraping results directory as the default location.
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from datastore import sqlite_store as _store  # noqa: E402
+from datastore.sqlite_store import (  # noqa: E402
+    COLLECTIONS,
+    DB_FILENAME,
+    LISTENER_COLUMNS,
+    SCHEMA,
+    append_listeners,
+    backend,
+    existing_artist_ids,
+    get_version,
+    iter_artist_stats,
+    iter_listeners,
+    load_collection,
+    normalize_date,
+    replace_artist_stats,
+    replace_listeners,
+    save_collection,
+    transaction,
+    upsert_artist_stats,
+)
+
+
+def default_db_path():
+    """
+    Return the database path (SQLITE_PATH, or data/results/spotify-data.sqlite3).
+    """
+    return os.getenv('SQLITE_PATH') or os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "..", "data", "results", DB_FILENAME)
+
+
+def connect(path=None):
+    """
+    Open the database (default_db_path() unless given), creating the schema if needed.
+    """
+    return _store.connect(path or default_db_path())
@@ -5,21 +5,25 @@ Check for and fix duplicates in the master listeners file
 
 import json
 import os
+import shutil
+import sys
 from collections import defaultdict
 
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'scraping'))
+import listener_store
+
 def main():
     script_dir = os.path.dirname(os.path.abspath(__file__))
     base_dir = os.path.dirname(script_dir)
-    master_file = os.path.join(base_dir, "data", "results", "spotify-monthly-listeners-master.json")
+    master_file = listener_store.master_path(os.path.join(base_dir, "data", "results"))
     
     print("🔍 Checking for duplicates in master listeners file...")
     
-    if not os.path.exists(master_file):
+    if not os.path.exists(master_file) and not os.path.exists(listener_store.legacy_path_for(master_file)):
         print("❌ Master file not found!")
         return
     
-    with open(master_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    data = listener_store.read_records(master_file)
     
     print(f"📊 Total entries: {len(data)}")
     
@@ -55,8 +59,11 @@ def main():
     
     # Create backup
     backup_file = master_file + f".backup.before_dedup"
-    with open(backup_file, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    if os.path.exists(master_file):
+        shutil.copy2(master_file, backup_file)
+    else:
+        with open(backup_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
     print(f"💾 Created backup: {backup_file}")
     
     # Keep only the latest entry for each duplicate set (last in the list)
@@ -78,8 +85,7 @@ def main():
             cleaned_data.append(entry)
     
     # Save cleaned data
-    with open(master_file, 'w', encoding='utf-8') as f:
-        json.dump(cleaned_data, f, ensure_ascii=False, indent=2)
+    listener_store.write_records(cleaned_data, master_file)
     
     removed_count = len(data) - len(cleaned_data)
     print(f"\n🎉 Deduplication complete!")
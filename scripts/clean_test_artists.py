@@ -10,8 +10,12 @@ This script removes test artists from:
 import json
 import os
 import shutil
+import sys
 from datetime import datetime
 
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'scraping'))
+import listener_store
+
 # Test artist identifiers to remove
 TEST_ARTISTS = {
     "1234567890ABCDEF",  # Fake test ID
@@ -40,8 +44,7 @@ def clean_monthly_listeners_file(filepath):
     print(f"Cleaning {filepath}...")
     backup_file(filepath)
     
-    with open(filepath, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    data = listener_store.read_records(filepath)
     
     original_count = len(data)
     cleaned_data = []
@@ -59,8 +62,11 @@ def clean_monthly_listeners_file(filepath):
     print(f"  Removed {removed_count} entries out of {original_count}")
     
     if removed_count > 0:
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(cleaned_data, f, indent=2, ensure_ascii=False)
+        if filepath.endswith('.jsonl'):
+            listener_store.write_records(cleaned_data, filepath)
+        else:
+            with open(filepath, 'w', encoding='utf-8') as f:
+                json.dump(cleaned_data, f, indent=2, ensure_ascii=False)
         print(f"  Updated {filepath}")
 
 def clean_followed_artists_file(filepath):
@@ -108,7 +114,7 @@ def main():
     
     # Clean master listener file
     print("\n=== Cleaning master listener file ===")
-    master_file = os.path.join(results_dir, "spotify-monthly-listeners-master.json")
+    master_file = listener_store.master_path(results_dir)
     clean_monthly_listeners_file(master_file)
     
     # Clean followed artists file
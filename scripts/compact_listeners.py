@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Compact the append-only monthly listeners master file.
+
+Rewrites spotify-monthly-listeners-master.jsonl keeping the latest row for each
+(artist_id, date) and dropping partial lines left by interrupted writes. The scrapers
+compact automatically when needed; this script forces it, e.g. from a cron job.
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'scraping'))
+import listener_store
+
+def main():
+    parser = argparse.ArgumentParser(description="Compact the JSONL listeners master file.")
+    parser.add_argument('--results-dir', default=listener_store.default_results_dir(),
+                        help="Directory containing the master file")
+    args = parser.parse_args()
+    
+    master_file = listener_store.master_path(args.results_dir)
+    if not os.path.exists(master_file):
+        print(f"❌ Master file not found: {master_file}")
+        return 1
+    
+    size_before = os.path.getsize(master_file)
+    lines_before, records_after = listener_store.compact(master_file)
+    size_after = os.path.getsize(master_file)
+    
+    print(f"🧹 Compacted {master_file}")
+    print(f"   Lines: {lines_before:,} → {records_after:,}")
+    print(f"   Size: {size_before:,} → {size_after:,} bytes")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,17 +9,23 @@ keeping the latest entry (by timestamp or position in file).
 import json
 import os
 import shutil
+import sys
 from datetime import datetime
 from collections import defaultdict
 from typing import List, Dict, Any
 
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'scraping'))
+import listener_store
+
 def load_data(file_path: str) -> List[Dict[str, Any]]:
-    """Load JSON data from file."""
-    with open(file_path, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    """Load listener data from a JSONL master file or a legacy JSON array."""
+    return listener_store.read_records(file_path)
 
 def save_data(data: List[Dict[str, Any]], file_path: str) -> None:
-    """Save JSON data to file."""
+    """Save listener data in the format implied by the file extension."""
+    if file_path.endswith('.jsonl'):
+        listener_store.write_records(data, file_path)
+        return
     with open(file_path, 'w', encoding='utf-8') as f:
         json.dump(data, f, ensure_ascii=False, indent=2)
 
@@ -92,9 +98,8 @@ def backup_file(file_path: str) -> str:
 def main():
     """Main deduplication process."""
     # File paths
-    master_file = os.path.join('..', 'data', 'results', 'spotify-monthly-listeners-master.json')
     script_dir = os.path.dirname(os.path.abspath(__file__))
-    master_file = os.path.join(script_dir, master_file)
+    master_file = listener_store.master_path(os.path.join(script_dir, '..', 'data', 'results'))
     
     if not os.path.exists(master_file):
         print(f"❌ Error: Master file not found at {master_file}")
@@ -1,13 +1,15 @@
-import json
 import os
+import sys
 import numpy as np
 
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'scraping'))
+import listener_store
+
 # Path to the master file
-MASTER_PATH = os.path.join(os.path.dirname(__file__), '..', 'src', 'results', 'spotify-monthly-listeners-master.json')
+MASTER_PATH = listener_store.master_path()
 
 def main():
-    with open(MASTER_PATH, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    data = listener_store.read_records(MASTER_PATH)
     # Use only the latest entry per artist for a fair tiering
     latest = {}
     for entry in data:
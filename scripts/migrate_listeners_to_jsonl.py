@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Migrate the monthly listeners master file from a JSON array to append-only JSONL.
+
+Reads spotify-monthly-listeners-master.json, writes spotify-monthly-listeners-master.jsonl
+next to it and verifies that every record made it across. The original JSON file is left
+in place as a backup.
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'scraping'))
+import listener_store
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate the listeners master file to JSONL.")
+    parser.add_argument('--results-dir', default=listener_store.default_results_dir(),
+                        help="Directory containing the master files")
+    parser.add_argument('--overwrite', action='store_true', help="Replace an existing JSONL master file")
+    args = parser.parse_args()
+    
+    jsonl_path = listener_store.master_path(args.results_dir)
+    json_path = listener_store.legacy_path_for(jsonl_path)
+    
+    if not os.path.exists(json_path):
+        print(f"❌ Legacy master file not found: {json_path}")
+        return 1
+    
+    print(f"🔄 Migrating {json_path}")
+    migrated = listener_store.migrate_from_json(json_path, jsonl_path, overwrite=args.overwrite)
+    if migrated is None:
+        print(f"⚠️ {jsonl_path} already exists - use --overwrite to replace it")
+        return 1
+    
+    # Verify the round trip before anyone relies on the new file
+    original = listener_store.read_records(json_path)
+    stats = {}
+    converted = listener_store.read_records(jsonl_path, stats)
+    if converted != original or stats['bad_lines']:
+        print(f"❌ Verification failed: {len(original)} records in JSON, {len(converted)} in JSONL")
+        return 1
+    
+    print(f"✅ Migrated {migrated:,} records to {jsonl_path}")
+    print(f"💾 Original kept as backup: {json_path}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
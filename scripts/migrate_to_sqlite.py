@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Migrate the JSON data files into the SQLite storage backend and verify the result.
+
+Copies the monthly listeners history, the daily follower/popularity figures, followed
+artists, suggestions and blacklist into one SQLite database, then checks every record against the source files. Run with
+--verify-only to re-check an existing database. The JSON files are left untouched, so
+switching back is just a matter of setting STORAGE_BACKEND=json again.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'scraping'))
+import listener_store
+import sqlite_store
+
+def load_json_list(path):
+    """Load a JSON list file, or an empty list if it doesn't exist."""
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def load_sources(results_dir, webapp_dir):
+    """Load the listener history, the artist stats and the three lists from the JSON files."""
+    stats_path = os.path.join(results_dir, listener_store.STATS_FILENAME)
+    return {
+        'listeners': listener_store.dedupe_records(listener_store.read_records(listener_store.master_path(results_dir))),
+        'artist_stats': listener_store.dedupe_records(listener_store.read_records(stats_path, legacy=False)),
+        'followed_artists': load_json_list(os.path.join(results_dir, 'spotify-followed-artists-master.json')),
+        'suggestions': load_json_list(os.path.join(webapp_dir, 'artist_suggestions.json')),
+        'blacklist': load_json_list(os.path.join(webapp_dir, 'artist_blacklist.json'))
+    }
+
+def migrate(conn, sources):
+    """Write the source data into the database, one transaction per table."""
+    sqlite_store.replace_listeners(conn, sources['listeners'])
+    print(f"📥 Listeners: {len(sources['listeners']):,} records")
+    sqlite_store.replace_artist_stats(conn, sources['artist_stats'])
+    print(f"📥 Artist stats: {len(sources['artist_stats']):,} records")
+    for collection in sqlite_store.COLLECTIONS:
+        sqlite_store.save_collection(conn, collection, sources[collection])
+        print(f"📥 {collection}: {len(sources[collection]):,} entries")
+
+def verify(conn, sources):
+    """
+    Compare the database with the source data.
+    Returns a list of problems (empty if everything matches).
+    """
+    problems = []
+
+    expected = {}
+    for record in sources['listeners']:
+        key = (record.get('artist_id'), sqlite_store.normalize_date(record.get('date')))
+        expected[key] = record.get('monthly_listeners')
+    stored = {}
+    for record in sqlite_store.iter_listeners(conn):
+        stored[(record.get('artist_id'), record.get('date'))] = record.get('monthly_listeners')
+
+    missing = [key for key in expected if key not in stored]
+    extra = [key for key in stored if key not in expected]
+    changed = [key for key in expected if key in stored and stored[key] != expected[key]]
+    if missing:
+        problems.append(f"{len(missing)} listener rows missing, e.g. {missing[:3]}")
+    if extra:
+        problems.append(f"{len(extra)} unexpected listener rows, e.g. {extra[:3]}")
+    if changed:
+        problems.append(f"{len(changed)} listener rows with different counts, e.g. {changed[:3]}")
+
+    expected_stats = {}
+    for record in sources['artist_stats']:
+        key = (record.get('artist_id'), sqlite_store.normalize_date(record.get('date')))
+        expected_stats[key] = (record.get('followers'), record.get('popularity'))
+    stored_stats = {}
+    for record in sqlite_store.iter_artist_stats(conn):
+        stored_stats[(record['artist_id'], record['date'])] = (record['followers'], record['popularity'])
+    if stored_stats != expected_stats:
+        differing = [key for key in set(expected_stats) | set(stored_stats)
+                     if expected_stats.get(key) != stored_stats.get(key)]
+        problems.append(f"{len(differing)} artist stats rows differ, e.g. {sorted(differing, key=str)[:3]}")
+
+    for collection in sqlite_store.COLLECTIONS:
+        if sqlite_store.load_collection(conn, collection) != sources[collection]:
+            problems.append(f"{collection} does not match the JSON file")
+
+    return problems
+
+def main():
+    base_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+    parser = argparse.ArgumentParser(description="Migrate JSON data files to the SQLite storage backend.")
+    parser.add_argument('--results-dir', default=os.path.join(base_dir, 'data', 'results'),
+                        help="Directory with the listeners, artist stats and followed artists files")
+    parser.add_argument('--webapp-dir', default=os.path.join(base_dir, 'webapp'),
+                        help="Directory with artist_suggestions.json and artist_blacklist.json")
+    parser.add_argument('--db', default=sqlite_store.default_db_path(), help="SQLite database path")
+    parser.add_argument('--verify-only', action='store_true', help="Only compare an existing database with the JSON files")
+    parser.add_argument('--overwrite', action='store_true', help="Replace data already in the database")
+    args = parser.parse_args()
+
+    print("🔍 Loading JSON data files...")
+    sources = load_sources(args.results_dir, args.webapp_dir)
+
+    conn = sqlite_store.connect(args.db)
+    try:
+        if not args.verify_only:
+            has_data = (conn.execute("SELECT 1 FROM listeners LIMIT 1").fetchone()
+                        or conn.execute("SELECT 1 FROM artist_stats LIMIT 1").fetchone())
+            if has_data and not args.overwrite:
+                print(f"⚠️ {args.db} already contains data - use --overwrite to replace it")
+                return 1
+            print(f"🔄 Migrating into {args.db}")
+            migrate(conn, sources)
+
+        print("🔍 Verifying...")
+        problems = verify(conn, sources)
+    finally:
+        conn.close()
+
+    if problems:
+        print("❌ Verification failed:")
+        for problem in problems:
+            print(f"   - {problem}")
+        return 1
+
+    print("✅ Database matches the JSON files")
+    print("💡 Set STORAGE_BACKEND=sqlite (and SQLITE_PATH if needed) to switch the web app and scrapers over")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
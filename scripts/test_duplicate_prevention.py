@@ -33,16 +33,17 @@ def verify_data_consistency():
     """Verify that all data uses consistent date format"""
     script_dir = os.path.dirname(os.path.abspath(__file__))
     base_dir = os.path.dirname(script_dir)
-    master_file = os.path.join(base_dir, "data", "results", "spotify-monthly-listeners-master.json")
+    sys.path.append(os.path.join(script_dir, '..', 'scraping'))
+    import listener_store
+    master_file = listener_store.master_path(os.path.join(base_dir, "data", "results"))
     
     print("\n🔍 Verifying date format consistency...")
     
-    if not os.path.exists(master_file):
+    if not os.path.exists(master_file) and not os.path.exists(listener_store.legacy_path_for(master_file)):
         print("❌ Master file not found!")
         return False
     
-    with open(master_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    data = listener_store.read_records(master_file)
     
     date_formats = set()
     for entry in data:
@@ -15,8 +15,8 @@ if [[ "$PORT" != "" ]] || [[ "$AWS_REGION" != "" ]] || [[ "$HEROKU_APP_NAME" !=
     mkdir -p logs
     
     # Initialize empty data files if they don't exist
-    if [ ! -f "data/results/spotify-monthly-listeners-master.json" ]; then
-        echo "[]" > data/results/spotify-monthly-listeners-master.json
+    if [ ! -f "data/results/spotify-monthly-listeners-master.jsonl" ] && [ ! -f "data/results/spotify-monthly-listeners-master.json" ]; then
+        touch data/results/spotify-monthly-listeners-master.jsonl
         echo "📄 Created empty master data file"
     fi
     
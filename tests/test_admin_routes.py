@@ -0,0 +1,42 @@
+import os
+import sys
+
+from flask import Flask
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'webapp'))
+
+from app.routes import admin
+from app.routes.admin import create_admin_routes
+from app.services.job_service import JobService
+from app.services.job_store import JobStore
+
+
+def test_progress_stream_follows_a_queued_job_and_is_bounded(tmp_path, monkeypatch):
+    monkeypatch.setattr(admin, 'SSE_MAX_STREAMS', 1)
+    monkeypatch.setattr(admin, 'SSE_HEARTBEAT', 0.05)
+    monkeypatch.setattr(admin, 'SSE_MAX_DURATION', 0.3)
+    job_service = JobService(chromedriver_path='', job_store=JobStore(str(tmp_path / 'jobs.jsonl')),
+                             log_dir=str(tmp_path / 'logs'))
+    job_id = job_service.create_scraping_job()  # No dispatcher runs, so it stays queued
+
+    app = Flask(__name__)
+    app.secret_key = 'test'
+    app.register_blueprint(create_admin_routes(None, None, job_service, None), url_prefix='/admin')
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['admin_authenticated'] = True
+
+    # The queued job is streamed too (no polling), with keep-alives until the stream ends
+    first = client.get(f'/admin/scraping_status/{job_id}/events', buffered=False)
+    chunks = first.response
+    assert next(chunks).startswith(b'retry:')
+    assert b'"status": "queued"' in next(chunks)
+
+    # A second stream while the worker's limit is taken is told to come back later
+    busy = client.get(f'/admin/scraping_status/{job_id}/events').get_data(as_text=True)
+    assert busy == f"retry: {admin.SSE_BUSY_RETRY_MS}\n\n"
+
+    assert b': keep-alive' in b''.join(chunks)
+    first.close()
+    again = client.get(f'/admin/scraping_status/{job_id}/events').get_data(as_text=True)
+    assert 'event: snapshot' in again
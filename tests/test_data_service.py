@@ -0,0 +1,345 @@
+import json
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'webapp'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.services.data_service import DataService
+from app.services.snapshot import Snapshot
+from app.services.storage import SqliteStorage
+from datastore import listener_store, sqlite_store
+
+
+@pytest.fixture
+def data_service(tmp_path):
+    data_path = tmp_path / 'spotify-monthly-listeners-master.jsonl'
+    listener_store.write_records([
+        {'artist_id': 'a1', 'artist_name': 'Old Name', 'date': '20250101', 'monthly_listeners': 100},
+        {'artist_id': 'b2', 'artist_name': 'Other', 'date': '2025-01-02', 'monthly_listeners': 50},
+        {'artist_id': 'a1', 'artist_name': 'New Name', 'date': '2025-01-03', 'monthly_listeners': 300},
+        {'artist_id': 'a1', 'artist_name': 'Old Name', 'date': '2025-01-02', 'monthly_listeners': 200},
+    ], str(data_path))
+    followed_path = tmp_path / 'followed.json'
+    followed_path.write_text(json.dumps([
+        {'artist_name': 'Queen', 'url': 'https://open.spotify.com/artist/1dfeR4HaWDbWqFHLkxsg1d'},
+    ]))
+    return DataService(str(data_path), str(followed_path), str(tmp_path / 's.json'), str(tmp_path / 'b.json'))
+
+
+def test_artist_indexes(data_service):
+    history = data_service.get_artist_history('a1')
+    assert [row['monthly_listeners'] for row in history] == [100, 200, 300]
+    assert data_service.get_latest_entry('a1')['artist_name'] == 'New Name'
+    assert data_service.get_artist_ids_by_slug('new-name') == ['a1']
+    assert len(data_service.get_entries_for_date('20250102')) == 2
+    assert data_service.get_artist_history('missing') == []
+    assert data_service.get_latest_entry('missing') is None
+
+    # Cached rows are read-only, so they can be shared with callers without copies
+    with pytest.raises(TypeError):
+        history[0]['date'] = None
+    with pytest.raises(AttributeError):
+        history[0].date = None
+    assert history[0].date == '20250101'
+    assert history[0].to_dict() == {'artist_id': 'a1', 'artist_name': 'Old Name', 'date': '20250101',
+                                    'monthly_listeners': 100}
+
+    series = data_service.get_artist_series('a1')
+    assert series['listeners'].tolist() == [100, 200, 300]
+    assert str(series['day'][0]) == '2025-01-01'
+    assert not series['listeners'].flags.writeable
+    assert len(data_service.get_artist_series('missing')['day']) == 0
+
+
+def test_is_artist_followed(data_service):
+    assert data_service.is_artist_followed('queen')
+    assert data_service.is_artist_followed('Someone', '1dfeR4HaWDbWqFHLkxsg1d')
+    assert not data_service.is_artist_followed('Someone', 'other-id')
+
+    data_service.save_followed_artists([{'artist_name': 'Someone', 'artist_id': 'other-id'}])
+    assert data_service.is_artist_followed('Someone')
+    assert not data_service.is_artist_followed('Queen')
+
+
+def test_materialized_leaderboards(tmp_path):
+    data_path = tmp_path / 'spotify-monthly-listeners-master.jsonl'
+    today = datetime.now()
+    days = [(today - timedelta(days=offset)).strftime('%Y-%m-%d') for offset in (2, 1, 0)]
+    listener_store.write_records(
+        [{'artist_id': 'up', 'artist_name': 'Riser', 'date': day, 'monthly_listeners': n}
+         for day, n in zip(days, (2000, 2500, 3000))] +
+        [{'artist_id': 'down', 'artist_name': 'Faller', 'date': day, 'monthly_listeners': n}
+         for day, n in zip(days, (90000, 80000, 60000))],
+        str(data_path))
+    leaderboard_path = tmp_path / 'leaderboards.json'
+    service = DataService(str(data_path), str(tmp_path / 'f.json'), str(tmp_path / 's.json'),
+                          str(tmp_path / 'b.json'), leaderboard_path=str(leaderboard_path))
+
+    service.materialize_leaderboards(image_resolver=lambda artist_id: f"https://img/{artist_id}")
+    payload = json.loads(leaderboard_path.read_text())
+    assert len(payload['leaderboards']) == 2 * 2 * 6
+
+    # A fresh service (another worker) reads the persisted result, images included
+    reader = DataService(str(data_path), str(tmp_path / 'f.json'), str(tmp_path / 's.json'),
+                         str(tmp_path / 'b.json'), leaderboard_path=str(leaderboard_path))
+    growth = reader.get_leaderboard_data(mode='growth', tier='all', current_month=False)['leaderboard']
+    assert [row['artist_id'] for row in growth] == ['up', 'down']
+    assert growth[0]['image_url'] == 'https://img/up'
+    assert growth[0]['change'] == 1000
+    assert [row['artist'] for row in reader.get_leaderboard_data(mode='loss', tier='major', current_month=False)['leaderboard']] == ['Faller']
+    assert reader.get_leaderboard_data(mode='growth', tier='micro', current_month=False)['leaderboard'] == []
+
+    # Page views keep serving the persisted leaderboards until the post-scrape hook replaces them
+    listener_store.append_records([{'artist_id': 'up', 'artist_name': 'Riser', 'date': days[-1], 'monthly_listeners': 9000}], str(data_path))
+    reader.clear_cache()
+    growth = reader.get_leaderboard_data(mode='growth', tier='all', current_month=False)['leaderboard']
+    assert growth[0]['end'] == 3000
+
+    # Image URLs that can't be resolved this time are carried over
+    service.materialize_leaderboards(image_resolver=lambda artist_id: None)
+    growth = reader.get_leaderboard_data(mode='growth', tier='all', current_month=False)['leaderboard']
+    assert growth[0]['end'] == 9000
+    assert growth[0]['image_url'] == 'https://img/up'
+
+
+def test_leaderboard_query(tmp_path):
+    data_path = tmp_path / 'spotify-monthly-listeners-master.jsonl'
+    records = []
+    for day, riser, faller, new in ((1, 1000, 80000, None), (5, 1500, 70000, 200), (9, 1600, 75000, 600)):
+        date = f"2025-03-{day:02d}"
+        records.append({'artist_id': 'riser', 'artist_name': 'Riser', 'date': date, 'monthly_listeners': riser})
+        records.append({'artist_id': 'faller', 'artist_name': 'Faller', 'date': date.replace('-', ''), 'monthly_listeners': faller})
+        if new is not None:
+            records.append({'artist_id': 'new', 'artist_name': 'Newcomer', 'date': date, 'monthly_listeners': new})
+    listener_store.write_records(records, str(data_path))
+    followed_path = tmp_path / 'followed.json'
+    followed_path.write_text(json.dumps([
+        {'artist_id': 'riser', 'artist_name': 'Riser', 'source': 'admin_follow', 'date_added': '2024-06-01'},
+        {'artist_id': 'faller', 'artist_name': 'Faller', 'source': 'public_follow', 'date_added': '2025-01-15 10:00:00'},
+        {'artist_id': 'new', 'artist_name': 'Newcomer', 'source': 'public_follow', 'date_added': '2025-03-05'},
+    ]))
+    service = DataService(str(data_path), str(followed_path), str(tmp_path / 's.json'), str(tmp_path / 'b.json'))
+
+    result = service.query_leaderboard(window='custom', start='2025-03-01', end='2025-03-09')
+    assert [row['artist_id'] for row in result['results']] == ['new', 'riser', 'faller']
+    assert result['results'][0]['percent_change'] == 200.0
+    assert result['total'] == 3
+
+    # Velocity is listeners per day between the first and last point in the window
+    by_velocity = service.query_leaderboard(window='custom', start='2025-03-01', end='2025-03-09', sort='velocity')
+    assert [(row['artist_id'], row['velocity']) for row in by_velocity['results']][:2] == [('new', 100.0), ('riser', 75.0)]
+
+    losses = service.query_leaderboard(window='custom', start='2025-03-01', end='2025-03-05', sort='change', order='asc')
+    assert losses['results'][0]['artist_id'] == 'faller'
+    assert losses['results'][0]['change'] == -10000
+
+    assert [row['artist_id'] for row in service.query_leaderboard(
+        window='custom', start='2025-03-01', end='2025-03-09', source='public_follow')['results']] == ['new', 'faller']
+    assert [row['artist_id'] for row in service.query_leaderboard(
+        window='custom', start='2025-03-01', end='2025-03-09', added_from='2025-01-01', added_to='2025-01-31')['results']] == ['faller']
+    assert [row['artist_id'] for row in service.query_leaderboard(
+        window='custom', start='2025-03-01', end='2025-03-09', tier='major')['results']] == ['faller']
+
+    paged = service.query_leaderboard(window='custom', start='2025-03-01', end='2025-03-09', page=2, per_page=2)
+    assert paged['pages'] == 2
+    assert [row['rank'] for row in paged['results']] == [3]
+
+    with pytest.raises(ValueError):
+        service.query_leaderboard(window='custom')
+    with pytest.raises(ValueError):
+        service.query_leaderboard(window='30d', order='ascending')
+
+
+def test_sqlite_storage(tmp_path):
+    db_path = str(tmp_path / 'data.sqlite3')
+    service = DataService(str(tmp_path / 'unused.jsonl'), '', '', '', storage=SqliteStorage(db_path))
+
+    # A scraper process writes through its own connection
+    scraper_conn = sqlite_store.connect(db_path)
+    assert sqlite_store.append_listeners(scraper_conn, [
+        {'artist_id': 'a1', 'artist_name': 'Alpha', 'date': '20250101', 'monthly_listeners': 10, 'url': 'u'},
+        {'artist_id': 'a1', 'artist_name': 'Alpha', 'date': '2025-01-02', 'monthly_listeners': 20, 'url': 'u'},
+    ]) == 2
+    assert [row['monthly_listeners'] for row in service.get_artist_history('a1')] == [10, 20]
+
+    # Duplicate (artist_id, date) rows are ignored by the unique index
+    assert sqlite_store.append_listeners(scraper_conn, [
+        {'artist_id': 'a1', 'artist_name': 'Alpha', 'date': '2025-01-02', 'monthly_listeners': 99},
+    ]) == 0
+    assert sqlite_store.existing_artist_ids(scraper_conn, '2025-01-01') == {'a1'}
+
+    assert service.save_followed_artists([{'artist_name': 'Alpha', 'artist_id': 'a1'}])
+    assert service.is_artist_followed('alpha')
+    assert sqlite_store.load_collection(scraper_conn, 'followed_artists') == [{'artist_name': 'Alpha', 'artist_id': 'a1'}]
+    assert service.save_blacklist([{'name': 'Nope', 'spotify_id': 'x1'}])
+    assert service.load_blacklist() == (['nope'], ['x1'])
+    scraper_conn.close()
+
+
+def test_shared_snapshot(tmp_path):
+    data_path = tmp_path / 'spotify-monthly-listeners-master.jsonl'
+    listener_store.write_records([
+        {'artist_id': 'a1', 'artist_name': 'Old Name', 'date': '20250101', 'monthly_listeners': 100,
+         'url': 'https://open.spotify.com/artist/a1'},
+        {'artist_id': 'a1', 'artist_name': 'New Name', 'date': '2025-01-03', 'monthly_listeners': 300,
+         'url': 'https://open.spotify.com/artist/a1'},
+        {'artist_id': 'b2', 'artist_name': 'Other', 'date': '2025-01-03'},
+    ], str(data_path))
+    snapshot_path = tmp_path / 'listeners.snapshot'
+    args = (str(data_path), str(tmp_path / 'f.json'), str(tmp_path / 's.json'), str(tmp_path / 'b.json'))
+
+    writer = DataService(*args, snapshot_path=str(snapshot_path))
+    assert writer.get_record_count() == 3
+    assert snapshot_path.exists()
+
+    # A second worker maps the snapshot the first one wrote instead of re-parsing
+    reader = DataService(*args, snapshot_path=str(snapshot_path))
+    assert [row['monthly_listeners'] for row in reader.get_artist_history('a1')] == [100, 300]
+    assert reader.get_artist_history('a1')[0]['date'] == '2025-01-01'
+    assert reader.get_latest_entry('b2') == {'artist_name': 'Other', 'date': '2025-01-03', 'artist_id': 'b2'}
+    assert reader.get_artist_ids_by_slug('new-name') == ['a1']
+    assert len(reader.get_entries_for_date('20250103')) == 2
+    assert reader.get_artist_names() == {'Old Name', 'New Name', 'Other'}
+    assert reader.get_artist_series('a1')['listeners'].tolist() == [100, 300]
+    assert [a['artist_id'] for a in reader.search_artists('name')] == ['a1']
+
+    # New scrape results invalidate the snapshot and it is rebuilt once
+    listener_store.append_records([{'artist_id': 'b2', 'artist_name': 'Other', 'date': '2025-01-04',
+                                    'monthly_listeners': 10}], str(data_path))
+    reader.clear_cache()
+    assert reader.get_record_count() == 4
+
+
+def test_snapshot_round_trip(tmp_path):
+    from app.services.dataset import ListDataset
+    from app.services.snapshot import write_snapshot
+
+    path = str(tmp_path / 'listeners.snapshot')
+    assert write_snapshot(ListDataset([]), path, [1, 0]) == 0
+    empty = Snapshot(path)  # A fresh install starts from an empty history
+    assert len(empty) == 0 and empty.records() == [] and empty.latest('a1') is None
+
+    write_snapshot(ListDataset([
+        {'artist_id': 'a1', 'artist_name': 'A', 'date': '2025-01-01', 'monthly_listeners': 1,
+         'url': 'https://open.spotify.com/artist/old-a1', 'source': 'scrape'},
+        {'artist_id': 'a1', 'artist_name': 'A', 'date': '2025-01-02', 'monthly_listeners': 2,
+         'url': 'https://open.spotify.com/artist/a1'},
+    ]), path, [2, 0])
+    rows = Snapshot(path).artist_history('a1')
+    # Rows keep their own URL and any extra stored fields
+    assert rows[0]['url'] == 'https://open.spotify.com/artist/old-a1' and rows[0]['source'] == 'scrape'
+    assert rows[1]['url'] == 'https://open.spotify.com/artist/a1' and rows[1].get('source') is None
+
+
+def test_empty_history_with_snapshot(tmp_path):
+    data_path = tmp_path / 'spotify-monthly-listeners-master.jsonl'
+    data_path.write_text('')
+    service = DataService(str(data_path), str(tmp_path / 'f.json'), str(tmp_path / 's.json'),
+                          str(tmp_path / 'b.json'), snapshot_path=str(tmp_path / 'listeners.snapshot'))
+    assert service.get_record_count() == 0
+    assert isinstance(service._dataset, Snapshot)
+
+
+def test_stale_while_revalidate(data_service, monkeypatch):
+    assert data_service.get_record_count() == 4
+    listener_store.append_records([{'artist_id': 'c3', 'artist_name': 'Third', 'date': '2025-01-04',
+                                    'monthly_listeners': 5}], data_service.data_path)
+
+    # The change is picked up from the file signature; the old data is served meanwhile
+    assert data_service.get_record_count() in (4, 5)
+    data_service._reload_thread.join()
+    assert data_service.get_record_count() == 5
+
+    # A failed read keeps the last good version
+    def broken_read(stats=None):
+        raise ValueError("partial write")
+    monkeypatch.setattr(data_service.storage, 'read_listeners', broken_read)
+    assert data_service.get_record_count(use_cache=False) == 5
+    assert data_service.get_latest_entry('c3')['monthly_listeners'] == 5
+
+
+def test_find_tracked_artists(data_service):
+    assert [a['artist_id'] for a in data_service.find_tracked_artists('NAME')] == ['a1']
+    assert data_service.find_tracked_artists('new name')[0]['monthly_listeners'] == 300
+    assert data_service.find_tracked_artists('oth')[0]['url'] == 'https://open.spotify.com/artist/b2'
+    assert data_service.find_tracked_artists('zzz') == []
+
+
+def test_collection_registry(data_service, tmp_path):
+    data_service.save_suggestions([{'artist_name': 'Suggested', 'spotify_id': 's1'}])
+    data_service.save_blacklist(['Bad Name', {'name': 'Worse', 'spotify_id': 'x1'}])
+    assert data_service.is_artist_suggested('suggested')
+    assert data_service.is_artist_suggested('Other', 's1')
+    assert data_service.is_artist_blacklisted('bad name')
+    assert data_service.is_artist_blacklisted('Someone', 'x1')
+    assert not data_service.is_artist_blacklisted('Someone', 'y2')
+    assert data_service.load_blacklist() == (['bad name', 'worse'], ['x1'])
+
+    # Callers edit their own copies; only saves reach the cache
+    suggestions = data_service.load_suggestions()
+    suggestions[0]['artist_name'] = 'Changed'
+    assert data_service.load_suggestions()[0]['artist_name'] == 'Suggested'
+
+    # Changes made by another process are picked up from the file signature
+    followed_path = tmp_path / 'followed.json'
+    followed_path.write_text(json.dumps([{'artist_name': 'Written Elsewhere', 'artist_id': 'w1'}]))
+    os.utime(followed_path, ns=(1, 1))
+    assert data_service.is_artist_followed('written elsewhere')
+    assert not data_service.is_artist_followed('Queen')
+
+
+@pytest.mark.parametrize('backend', ['json', 'sqlite'])
+def test_artist_stats(data_service, tmp_path, backend, monkeypatch):
+    if backend == 'sqlite':
+        storage = SqliteStorage(str(tmp_path / 'data.sqlite3'))
+        sqlite_store.append_listeners(storage._conn(), listener_store.read_records(data_service.data_path))
+        storage.save_collection('followed_artists', data_service.load_followed_artists())
+        data_service = DataService(data_service.data_path, '', '', '', storage=storage)
+
+    assert data_service.get_tracked_artist_ids() == ['a1', 'b2', '1dfeR4HaWDbWqFHLkxsg1d']
+    data_service.record_artist_stats({'a1': {'followers': 10, 'popularity': 40},
+                                      'b2': {'followers': 500, 'popularity': 30}}, date='2025-01-01')
+    data_service.record_artist_stats({'a1': {'followers': 90, 'popularity': 45},
+                                      'b2': {'followers': 510, 'popularity': 31}}, date='2025-01-31')
+    # Recording the same day again replaces that day's figures
+    data_service.record_artist_stats({'a1': {'followers': 100, 'popularity': 50}}, date='2025-01-31')
+
+    assert data_service.get_artist_stats('a1') == [
+        {'date': '2025-01-01', 'followers': 10, 'popularity': 40},
+        {'date': '2025-01-31', 'followers': 100, 'popularity': 50},
+    ]
+    assert [row['artist_id'] for row in data_service.rank_artists_by_stat('followers')] == ['b2', 'a1']
+    growth = data_service.rank_artists_by_stat('followers', days=30)
+    assert [(row['artist_name'], row['change']) for row in growth] == [('New Name', 90), ('Other', 10)]
+    assert data_service.rank_artists_by_stat('popularity', limit=1)[0]['value'] == 50
+
+    if backend == 'json':
+        # Appends never read the file back; the replaced row stays until the next compaction
+        assert len(open(data_service.storage.stats_path).read().splitlines()) == 5
+        monkeypatch.setattr(listener_store, 'iter_records', lambda *args: pytest.fail("append read the file"))
+        assert data_service.record_artist_stats({'a1': {'followers': 1}}, date='2025-02-01') == 1
+
+
+def test_name_index():
+    from app.services.name_index import NameIndex
+
+    index = NameIndex({'Taylor Swift': 100, 'James Taylor': 50, 'Taylor': 1, 'Swiftie Band': 500,
+                       'Tayla': 0, 'The Beatles': 10})
+    assert index.search('taylor') == ['Taylor', 'Taylor Swift', 'James Taylor']
+    assert index.search('SWIFT', limit=1) == ['Swiftie Band']
+    assert index.search('eatle') == ['The Beatles']
+    assert index.search('taylr swift') == ['Taylor Swift']  # Misspelling via shared trigrams
+    assert index.search('ta') == ['Taylor Swift', 'Taylor', 'Tayla', 'James Taylor']
+    assert index.search('at') == ['The Beatles']
+    assert index.search('zzz') == []
+
+
+def test_suggest_uses_name_index(data_service):
+    assert data_service.suggest_artist_names('name') == ['New Name', 'Old Name']
+    first_index = data_service._get_name_index()
+    assert data_service.suggest_artist_names('oth', limit=1) == ['Other']
+    assert data_service._get_name_index() is first_index  # Built once per data version
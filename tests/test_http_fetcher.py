@@ -0,0 +1,67 @@
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("aiohttp")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scraping'))
+
+from http_fetcher import fetch_artist_pages_sync, parse_artist_page
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures', 'artist_pages')
+
+
+class RecordedArtistPageHandler(BaseHTTPRequestHandler):
+    """Serves recorded artist pages at /artist/<id>, 404 for anything else."""
+
+    def do_GET(self):
+        artist_id = self.path.rstrip('/').split('/')[-1]
+        page_path = os.path.join(FIXTURES_DIR, f"{artist_id}.html")
+        if not self.path.startswith('/artist/') or not os.path.exists(page_path):
+            self.send_response(404)
+            self.end_headers()
+            return
+        with open(page_path, 'rb') as f:
+            body = f.read()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def artist_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), RecordedArtistPageHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_parse_artist_page_ignores_abbreviated_counts():
+    page = '<meta property="og:title" content="Queen"><meta property="og:description" content="Artist · 52.3M monthly listeners.">'
+    assert parse_artist_page(page) == (None, None)
+
+
+def test_fetch_artist_pages_against_recorded_pages(artist_server):
+    urls = [
+        {'url': f"{artist_server}/artist/1dfeR4HaWDbWqFHLkxsg1d", 'artist_name': 'Queen'},
+        f"{artist_server}/artist/4Z8W4fKeB5YxbusRsdQVPb",
+        f"{artist_server}/artist/doesnotexist",
+    ] * 50
+
+    pages = fetch_artist_pages_sync(urls, concurrency=20)
+
+    assert len(pages) == len(urls)
+    assert pages[0] == ('Queen', '52,314,117')
+    # Only the abbreviated count is present, so this page needs the Selenium fallback
+    assert pages[1] == (None, None)
+    assert pages[2] == (None, None)
+    assert pages[-3] == ('Queen', '52,314,117')
@@ -0,0 +1,222 @@
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'webapp'))
+
+from app.services.job_service import (JobService, JobStatusWriter, apply_progress_event,
+                                      PRIORITY_MANUAL, PRIORITY_SCHEDULED)
+from app.services.job_log import JobLogWriter, read_job_log
+from app.services.job_store import JobStore
+
+SCRAPING_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'scraping'))
+
+FAKE_SCRAPER = f"""
+import sys
+sys.path.insert(0, {SCRAPING_DIR!r})
+import progress
+
+progress.skip('Already Done')
+progress.start(3)
+for i, name in enumerate(['Alpha', 'Beta', 'Gamma']):
+    print(f"Scraping {{name}}", flush=True)
+    progress.artist(i + 1, 3, name)
+progress.error('Failed to scrape 1 artists')
+progress.done(3)
+"""
+
+SLOW_SCRAPER = """
+import subprocess, sys, time
+child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)'])
+open('child.pid', 'w').write(str(child.pid))
+print('started', flush=True)
+time.sleep(60)
+"""
+
+
+def wait_for_job(job_service, job_id, timeout=10, status=None):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = job_service.get_job_status(job_id)
+        if job and (job.get('status') == status if status else job.get('completed')):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"Job {job_id} did not reach {status or 'completion'}")
+
+
+def process_gone(pid):
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().split(')')[-1].split()[0] == 'Z'
+    except OSError:
+        return True
+
+
+def test_scraper_progress_arrives_on_its_own_channel(tmp_path):
+    (tmp_path / 'scrape.py').write_text(FAKE_SCRAPER)
+    job_service = JobService(chromedriver_path='', job_store=JobStore(str(tmp_path / 'jobs.jsonl')),
+                             log_dir=str(tmp_path / 'logs'))
+    job_service.script_dir = str(tmp_path)
+
+    job_id = job_service.create_scraping_job()
+    assert job_service.start_scraping_job(job_id)
+    job = wait_for_job(job_service, job_id)
+
+    assert job['status'] == 'completed'
+    assert job['output'].splitlines() == ['Scraping Alpha', 'Scraping Beta', 'Scraping Gamma']
+    assert job['progress']['phase'] == 'Completed'
+    assert job['progress']['current'] == job['progress']['total'] == 3
+    assert job['progress']['current_artist'] == 'Gamma'
+    assert job['error'] == 'Failed to scrape 1 artists'
+    assert not job['output_truncated']
+    assert job_service.get_job_log(job_id)['lines'] == job['output'].splitlines()
+
+
+def test_apply_progress_event():
+    progress = {'current': 0, 'total': 0, 'phase': 'Initializing'}
+    assert apply_progress_event(progress, {'event': 'artist', 'current': 2, 'total': 5, 'artist': 'Beta'})
+    assert progress['details'] == 'Processing: Beta'
+    assert not apply_progress_event(progress, {'event': 'artist', 'current': 2, 'total': 5, 'artist': 'Beta'})
+    assert not apply_progress_event(progress, {'event': 'artist', 'current': 'x'})
+    assert not apply_progress_event(progress, {'event': 'unknown'})
+
+
+def test_status_writes_are_coalesced():
+    store = JobStore()
+    store.create({'job_id': 'j', 'completed': False})
+    writer = JobStatusWriter(store, 'j', interval=0.2)
+    for i in range(100):
+        writer.update({'progress': {'current': i}})
+    assert writer.writes == 1
+
+    time.sleep(0.4)
+    assert writer.writes == 2
+    assert store.get('j')['progress'] == {'current': 99}
+
+    writer.update({'status': 'completed'}, flush=True)
+    assert writer.writes == 3
+
+
+def test_job_store_journal_is_shared_and_compacted(tmp_path):
+    path = str(tmp_path / 'jobs.jsonl')
+    worker_a = JobStore(path, max_journal_bytes=2000)
+    worker_b = JobStore(path)
+
+    worker_a.create({'job_id': 'j', 'status': 'starting', 'completed': False})
+    for i in range(50):
+        worker_a.update('j', {'status': 'running', 'progress': {'current': i}})
+    assert worker_b.get('j')['progress'] == {'current': 49}
+    assert os.path.getsize(path) < 2000  # Compacted along the way
+
+    worker_b.update('j', {'status': 'completed', 'completed': True})
+    assert worker_a.get('j')['status'] == 'completed'
+    assert JobStore(path).all() == worker_a.all()
+
+
+def test_job_store_watch_streams_deltas():
+    store = JobStore()
+    store.create({'job_id': 'j', 'status': 'running', 'completed': False, 'progress': {'current': 0}})
+    events = store.watch('j', heartbeat=0.05, max_duration=5)
+
+    assert next(events) == ('snapshot', store.get('j'))
+    store.update('j', {'progress': {'current': 1}})
+    assert next(events) == ('update', {'progress': {'current': 1}})
+    assert next(events) == ('heartbeat', None)
+    store.update('j', {'status': 'completed', 'completed': True})
+    assert next(events) == ('update', {'status': 'completed', 'completed': True})
+    assert next(events)[0] == 'done'
+    assert list(events) == []
+
+
+def test_job_store_marks_orphaned_jobs(tmp_path):
+    path = str(tmp_path / 'jobs.jsonl')
+    store = JobStore(path)
+    store.create({'job_id': 'alive', 'completed': False, 'worker_pid': os.getpid()})
+    store.create({'job_id': 'orphan', 'completed': False, 'worker_pid': 2 ** 22 + 1})
+
+    assert JobStore(path).recover_interrupted() == 1
+    assert store.get('orphan')['status'] == 'error'
+    assert not store.get('alive')['completed']
+
+
+def test_job_log_rotates_and_pages(tmp_path):
+    log_dir = str(tmp_path)
+    writer = JobLogWriter(log_dir, 'j', segment_bytes=100, max_segments=3)
+    for i in range(100):
+        writer.write(f"line {i:03d}")  # 9 bytes with the newline
+    writer.close()
+    assert len(os.listdir(log_dir)) == 3
+
+    page = read_job_log(log_dir, 'j', offset=0, limit=50)
+    assert page['offset'] == page['first_offset'] > 0  # The oldest lines were rotated away
+    assert page['end_offset'] == writer.size == 900
+    assert len(page['lines']) == 5 and page['lines'][0].startswith('line ')
+
+    lines = []
+    offset = page['offset']
+    while True:
+        page = read_job_log(log_dir, 'j', offset=offset, limit=50)
+        lines.extend(page['lines'])
+        offset = page['next_offset']
+        if page['eof']:
+            break
+    assert lines[-1] == 'line 099'
+    assert lines == [f"line {i:03d}" for i in range(100 - len(lines), 100)]
+
+
+@pytest.mark.skipif(os.name != 'posix', reason="process groups are POSIX only")
+def test_queue_limits_concurrency_coalesces_and_cancels(tmp_path):
+    (tmp_path / 'scrape.py').write_text(SLOW_SCRAPER)
+    (tmp_path / 'scrape_filtered.py').write_text("print('done')")
+    job_service = JobService(chromedriver_path='', job_store=JobStore(str(tmp_path / 'jobs.jsonl')),
+                             log_dir=str(tmp_path / 'logs'), max_concurrent_jobs=1)
+    job_service.script_dir = str(tmp_path)
+
+    full = job_service.create_scraping_job()
+    assert job_service.start_scraping_job(full)
+    wait_for_job(job_service, full, status='running')
+
+    scheduled = job_service.create_scraping_job(today_only=True, priority=PRIORITY_SCHEDULED)
+    other = job_service.create_scraping_job(today_only=True, allow_duplicates=True, priority=PRIORITY_SCHEDULED)
+    manual = job_service.create_scraping_job(today_only=True)
+    assert manual == scheduled  # Identical pending jobs are merged, at the higher priority
+    assert job_service.get_job_status(manual)['priority'] == PRIORITY_MANUAL
+    assert job_service.job_store.queue_position(manual) == 0
+    assert job_service.job_store.queue_position(other) == 1
+
+    time.sleep(0.3)
+    assert job_service.get_job_status(manual)['status'] == 'queued'  # Only one job runs at a time
+
+    assert job_service.cancel_job(other) == 'cancelled'
+    assert job_service.cancel_job(full) == 'cancelling'
+    assert wait_for_job(job_service, full)['status'] == 'cancelled'
+    child_pid = int((tmp_path / 'child.pid').read_text())
+    deadline = time.monotonic() + 5
+    while not process_gone(child_pid) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert process_gone(child_pid)  # The whole process tree was stopped
+
+    assert wait_for_job(job_service, manual)['status'] == 'completed'
+    assert job_service.get_job_status(other)['status'] == 'cancelled'
+    assert job_service.cancel_job(manual) is None
+
+
+@pytest.mark.skipif(os.name != 'posix', reason="process groups are POSIX only")
+def test_hung_scraper_times_out_and_frees_its_slot(tmp_path):
+    (tmp_path / 'scrape.py').write_text(SLOW_SCRAPER)
+    (tmp_path / 'scrape_filtered.py').write_text("print('done')")
+    job_service = JobService(chromedriver_path='', scraping_timeout=1,
+                             job_store=JobStore(str(tmp_path / 'jobs.jsonl')),
+                             log_dir=str(tmp_path / 'logs'), max_concurrent_jobs=1)
+    job_service.script_dir = str(tmp_path)
+
+    hung = job_service.create_scraping_job()
+    assert job_service.start_scraping_job(hung)
+    waiting = job_service.create_scraping_job(today_only=True)
+
+    job = wait_for_job(job_service, hung, timeout=15)
+    assert job['status'] == 'timeout'
+    assert 'started' in job['output']
+    assert wait_for_job(job_service, waiting)['status'] == 'completed'
@@ -0,0 +1,97 @@
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from datastore import listener_store
+
+
+def row(artist_id, date, listeners=100):
+    return {'artist_id': artist_id, 'artist_name': artist_id.upper(), 'date': date, 'monthly_listeners': listeners}
+
+
+def test_append_starts_a_fresh_line_after_a_partial_write(tmp_path):
+    path = str(tmp_path / listener_store.MASTER_FILENAME)
+    listener_store.append_records([row('a1', '20250101')], path)
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{"artist_id": "a2", "da')  # Interrupted mid-record
+
+    assert listener_store.append_records([row('a1', '20250102')], path) == 1
+
+    stats = {}
+    assert [r['date'] for r in listener_store.read_records(path, stats)] == ['20250101', '20250102']
+    assert stats == {'lines': 3, 'bad_lines': 1}
+
+
+def test_append_migrates_the_legacy_file_first(tmp_path):
+    path = str(tmp_path / listener_store.MASTER_FILENAME)
+    with open(listener_store.legacy_path_for(path), 'w', encoding='utf-8') as f:
+        json.dump([row('a1', '20250101')], f)
+
+    listener_store.append_records([row('a1', '20250102')], path)
+
+    assert [r['date'] for r in listener_store.read_records(path)] == ['20250101', '20250102']
+    assert os.path.exists(listener_store.legacy_path_for(path))  # Kept as a backup
+
+
+def test_append_new_records_skips_stored_and_repeated_keys(tmp_path):
+    path = str(tmp_path / listener_store.MASTER_FILENAME)
+    listener_store.write_records([row('a1', '20250101'), row('a1', '20250102'), row('a1', '20250102')], path)
+
+    stats = {}
+    appended = listener_store.append_new_records(
+        [row('a1', '20250102', 5), row('a2', '20250102'), row('a2', '20250102', 7)], path, stats)
+
+    assert appended == [row('a2', '20250102')]
+    assert stats == {'lines': 3, 'bad_lines': 0, 'duplicate_rows': 1}
+    assert len(listener_store.read_records(path)) == 4
+    assert listener_store.append_new_records([row('a2', '20250102')], path) == []
+
+
+def test_compact_keeps_the_latest_row_per_artist_and_day(tmp_path):
+    path = str(tmp_path / listener_store.MASTER_FILENAME)
+    listener_store.write_records([row('a1', '20250101', 1), row('a2', '20250101'), row('a1', '20250101', 2)], path)
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('not json\n')
+
+    assert listener_store.compact(path) == (4, 2)
+    assert listener_store.read_records(path) == [row('a1', '20250101', 2), row('a2', '20250101')]
+
+    stats = {}
+    listener_store.read_records(path, stats)
+    assert not listener_store.needs_compaction(path, stats)  # Just compacted
+
+
+def test_needs_compaction_when_garbage_piles_up(tmp_path):
+    path = str(tmp_path / listener_store.MASTER_FILENAME)
+    listener_store.write_records([row('a1', '20250101')] * 10, path)
+
+    stats = {}
+    listener_store.read_records(path, stats)
+    assert listener_store.needs_compaction(path, stats, duplicate_count=9)
+    assert not listener_store.needs_compaction(path, stats)  # First use starts the interval clock
+
+
+def test_migrate_from_json(tmp_path):
+    json_path = str(tmp_path / listener_store.LEGACY_MASTER_FILENAME)
+    jsonl_path = str(tmp_path / listener_store.MASTER_FILENAME)
+    records = [row('a1', '20250101'), {'artist_name': 'No ID', 'date': '20250101'}]
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(records, f)
+
+    assert listener_store.migrate_from_json(json_path, jsonl_path) == 2
+    assert listener_store.read_records(jsonl_path) == records
+    assert listener_store.migrate_from_json(json_path, jsonl_path) is None  # Never overwrites by default
+    assert listener_store.migrate_from_json(json_path, jsonl_path, overwrite=True) == 2
+
+
+def test_scraping_module_shares_the_format(tmp_path):
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scraping'))
+    try:
+        import listener_store as scraping_store
+    finally:
+        sys.path.pop(0)
+
+    assert scraping_store.append_new_records is listener_store.append_new_records
+    assert scraping_store.master_path(str(tmp_path)) == str(tmp_path / listener_store.MASTER_FILENAME)
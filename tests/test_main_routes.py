@@ -0,0 +1,59 @@
+import os
+import sys
+
+import pytest
+from flask import Flask
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'webapp'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.services.data_service import DataService
+from app.routes.main import create_main_routes
+from datastore import listener_store
+
+
+class NoImages:
+    def fetch_artist_images(self, artist_ids):
+        return {}
+
+
+@pytest.fixture
+def client(tmp_path):
+    data_path = tmp_path / 'spotify-monthly-listeners-master.jsonl'
+    listener_store.write_records([
+        {'artist_id': 'a1', 'artist_name': 'Alpha', 'date': '2025-01-01', 'monthly_listeners': 100},
+        {'artist_id': 'b2', 'artist_name': 'Beta', 'date': '2025-01-01', 'monthly_listeners': 50},
+    ], str(data_path))
+    data_service = DataService(str(data_path), str(tmp_path / 'f.json'), str(tmp_path / 's.json'),
+                               str(tmp_path / 'b.json'), leaderboard_path=str(tmp_path / 'leaderboards.json'))
+    data_service.record_artist_stats({'a1': {'followers': 10, 'popularity': 60},
+                                      'b2': {'followers': 500, 'popularity': 30}}, date='2025-01-01')
+    data_service.record_artist_stats({'a1': {'followers': 900, 'popularity': 61},
+                                      'b2': {'followers': 510, 'popularity': 31}}, date='2025-01-31')
+
+    app = Flask(__name__, template_folder=os.path.join(os.path.dirname(__file__), '..', 'webapp', 'templates'))
+    app.register_blueprint(create_main_routes(NoImages(), data_service))
+    return app.test_client()
+
+
+def test_api_leaderboard_ranks_by_followers_and_popularity(client):
+    by_followers = client.get('/api/leaderboard?sort=followers').get_json()
+    assert [row['artist_id'] for row in by_followers['results']] == ['a1', 'b2']
+    assert by_followers['results'][0] == {'rank': 1, 'artist_id': 'a1', 'artist_name': 'Alpha', 'slug': 'alpha',
+                                          'date': '2025-01-31', 'value': 900, 'change': None}
+
+    growth = client.get('/api/leaderboard?sort=followers&days=30&order=asc&per_page=1').get_json()
+    assert [(row['artist_id'], row['change']) for row in growth['results']] == [('b2', 10)]
+    assert growth['total'] == 2 and growth['pages'] == 2
+
+    assert client.get('/api/leaderboard?sort=popularity').get_json()['results'][0]['value'] == 61
+
+    assert client.get('/api/leaderboard?sort=followers&tier=micro').status_code == 400
+    assert client.get('/api/leaderboard?sort=change&days=30').status_code == 400
+    assert client.get('/api/leaderboard?order=up').status_code == 400
+
+
+def test_leaderboard_page_has_a_followers_mode(client):
+    page = client.get('/leaderboard?mode=followers').get_data(as_text=True)
+    assert page.index('Alpha') < page.index('Beta')
+    assert '900' in page
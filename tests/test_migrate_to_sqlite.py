@@ -0,0 +1,39 @@
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+import migrate_to_sqlite
+from migrate_to_sqlite import listener_store, sqlite_store
+
+
+def test_round_trip_includes_artist_stats(tmp_path):
+    results_dir, webapp_dir = tmp_path / 'results', tmp_path / 'webapp'
+    results_dir.mkdir()
+    webapp_dir.mkdir()
+    listener_store.write_records([
+        {'artist_id': 'a1', 'artist_name': 'One', 'date': '20250101', 'monthly_listeners': 100},
+    ], listener_store.master_path(str(results_dir)))
+    listener_store.write_records([
+        {'artist_id': 'a1', 'date': '2025-01-01', 'followers': 10, 'popularity': 40},
+        {'artist_id': 'a1', 'date': '2025-01-02', 'followers': 11, 'popularity': None},
+        {'artist_id': 'a1', 'date': '2025-01-02', 'followers': 12, 'popularity': 41},  # Latest row wins
+    ], str(results_dir / listener_store.STATS_FILENAME))
+    (webapp_dir / 'artist_blacklist.json').write_text(json.dumps([{'artist_id': 'b1'}]))
+
+    sources = migrate_to_sqlite.load_sources(str(results_dir), str(webapp_dir))
+    conn = sqlite_store.connect(str(tmp_path / 'db.sqlite3'))
+    try:
+        migrate_to_sqlite.migrate(conn, sources)
+        assert migrate_to_sqlite.verify(conn, sources) == []
+        assert list(sqlite_store.iter_artist_stats(conn)) == [
+            {'artist_id': 'a1', 'date': '2025-01-01', 'followers': 10, 'popularity': 40},
+            {'artist_id': 'a1', 'date': '2025-01-02', 'followers': 12, 'popularity': 41},
+        ]
+
+        sqlite_store.upsert_artist_stats(conn, [{'artist_id': 'a1', 'date': '2025-01-01', 'followers': 99}])
+        assert migrate_to_sqlite.verify(conn, sources) == [
+            "1 artist stats rows differ, e.g. [('a1', '2025-01-01')]"]
+    finally:
+        conn.close()
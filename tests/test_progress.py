@@ -0,0 +1,38 @@
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scraping'))
+
+import progress
+
+
+@pytest.fixture
+def progress_pipe(monkeypatch):
+    read_fd, write_fd = os.pipe()
+    monkeypatch.setattr(progress, '_fd', write_fd)
+    monkeypatch.setattr(progress, '_fd_checked', True)
+    yield read_fd
+    os.close(write_fd)
+    os.close(read_fd)
+
+
+@pytest.mark.parametrize('char', ['音', '🎵', '"'])
+def test_long_events_are_shortened_by_field(progress_pipe, char):
+    progress.artist(45, 150, char * 200)
+    progress.error(f"Unexpected error for {char * 200}")
+
+    lines = os.read(progress_pipe, 65536).decode('utf-8').splitlines()
+    assert all(len(line.encode('utf-8')) < progress.MAX_EVENT_BYTES for line in lines)
+    artist_event, error_event = map(json.loads, lines)
+    assert artist_event['current'] == 45 and artist_event['total'] == 150
+    assert 0 < len(artist_event['artist']) <= progress.MAX_NAME_LENGTH
+    assert set(artist_event['artist']) == {char}
+    assert error_event['message'].startswith('Unexpected error for ' + char)
+
+
+def test_short_events_are_unchanged(progress_pipe):
+    progress.phase('Retrying 3 failed URLs')
+    assert json.loads(os.read(progress_pipe, 65536)) == {'event': 'phase', 'phase': 'Retrying 3 failed URLs'}
@@ -0,0 +1,94 @@
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scraping'))
+
+import progress
+import scrape
+
+FIXTURE = os.path.join(os.path.dirname(__file__), 'fixtures', 'listeners-master.jsonl')
+
+
+def artist(artist_id, name):
+    return {'artist_id': artist_id, 'artist_name': name, 'url': f"https://open.spotify.com/artist/{artist_id}"}
+
+
+class FakeDriver:
+    def __init__(self, port):
+        self.worker_id = port - 9222
+
+    def get(self, url):
+        pass
+
+    def quit(self):
+        pass
+
+
+def fake_setup_driver(chromedriver_path=None, headless=False, remote_debugging_port=9222, kill_stale_processes=True):
+    if remote_debugging_port - 9222 == 2:
+        raise RuntimeError("Chrome did not start")
+    return FakeDriver(remote_debugging_port)
+
+
+def fake_scrape_artist(driver, url, wait_time=5):
+    if url['artist_id'] == 'broken':
+        return None, None
+    # The name records which worker scraped the artist
+    return f"{url['artist_name']}@{driver.worker_id}", '1000'
+
+
+def test_filter_already_scraped_uses_todays_rows(tmp_path, monkeypatch):
+    master = tmp_path / 'spotify-monthly-listeners-master.jsonl'
+    shutil.copy(FIXTURE, master)
+    monkeypatch.setenv('STORAGE_BACKEND', 'json')
+    monkeypatch.setattr(scrape.listener_store, 'master_path', lambda results_dir=None: str(master))
+
+    existing = scrape.load_existing_listeners('2025-01-02')
+    assert existing == {'aaa111'}
+
+    urls = [artist('aaa111', 'Already Done'), artist('bbb222', 'Done Yesterday'),
+            'https://open.spotify.com/artist/aaa111?si=share', {'url': 'https://open.spotify.com/artist/ccc333'}]
+    assert scrape.filter_already_scraped(urls, existing) == [urls[1], urls[3]]
+
+
+@pytest.mark.skipif(multiprocessing.get_start_method() != 'fork', reason="stubs reach the workers by forking")
+def test_scrape_parallel_partitions_counts_and_merges(monkeypatch):
+    monkeypatch.setattr(scrape, 'setup_driver', fake_setup_driver)
+    monkeypatch.setattr(scrape, 'scrape_artist', fake_scrape_artist)
+    monkeypatch.setattr(scrape.time, 'sleep', lambda seconds: None)
+    read_fd, write_fd = os.pipe()
+    monkeypatch.setattr(progress, '_fd', write_fd)
+    monkeypatch.setattr(progress, '_fd_checked', True)
+
+    urls = [artist('broken', 'Broken')] + [artist(f"id{i}", f"Artist {i}") for i in range(8)]
+    urls.insert(3, artist('done', 'Done Today'))
+    try:
+        results, failed = scrape.scrape_parallel(urls, '2025-01-02', None, {'done'}, workers=3)
+    finally:
+        os.close(write_fd)
+    with os.fdopen(read_fd, 'rb') as f:
+        events = [json.loads(line) for line in f.read().splitlines()]
+
+    # The 9 artists left after filtering are dealt round-robin; worker 0 retries 'broken'
+    # before giving up on it, and worker 2 can't start Chrome
+    to_scrape = [url for url in urls if url['artist_id'] != 'done']
+    shares = {worker_id: to_scrape[worker_id::3] for worker_id in range(3)}
+    scraped = {result['artist_id']: result['artist_name'].split('@')[1] for result in results}
+    expected = {url['artist_id']: str(worker_id) for worker_id in (0, 1) for url in shares[worker_id]
+                if url['artist_id'] != 'broken'}
+    assert scraped == expected
+    assert all(result['date'] == '2025-01-02' and result['monthly_listeners'] == 1000 for result in results)
+    assert sorted(url['artist_id'] for url in failed) == sorted(
+        ['broken'] + [url['artist_id'] for url in shares[2] if url['artist_id'] != 'broken'])
+
+    # One overall count shared by all workers, not one per worker
+    positions = [(event['current'], event['total']) for event in events if event['event'] == 'artist']
+    assert sorted(positions) == [(n, 9) for n in range(1, len(positions) + 1)]
+    assert {'event': 'skip', 'artist': 'Done Today'} in events
+    assert {'event': 'start', 'total': 9} in events
+    assert any(event['event'] == 'error' and 'Worker 2 failed' in event['message'] for event in events)
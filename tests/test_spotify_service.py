@@ -0,0 +1,344 @@
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+spotipy = pytest.importorskip("spotipy")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'webapp'))
+
+from app.services import http_session
+from app.services.spotify_service import SpotifyService, DEFAULT_ARTIST_IMAGE
+
+
+def artist(artist_id, images=True):
+    return {
+        'id': artist_id,
+        'name': f'Artist {artist_id}',
+        'images': [{'url': f'https://img/{artist_id}'}] if images else [],
+        'genres': ['pop'],
+        'popularity': 10,
+        'followers': {'total': 5},
+        'external_urls': {'spotify': f'https://open.spotify.com/artist/{artist_id}'}
+    }
+
+
+class FakeClient:
+    """Stands in for spotipy.Spotify, recording every request."""
+
+    def __init__(self):
+        self.calls = []
+
+    def artists(self, artist_ids):
+        self.calls.append(('artists', list(artist_ids)))
+        return {'artists': [None if artist_id == 'gone' else artist(artist_id, artist_id != 'plain')
+                            for artist_id in artist_ids]}
+
+    def artist(self, artist_id):
+        self.calls.append(('artist', artist_id))
+        return artist(artist_id)
+
+
+@pytest.fixture
+def service():
+    service = SpotifyService('id', 'secret', 'http://localhost/callback', 'scope')
+    service._public_client = FakeClient()
+    return service
+
+
+def test_fetch_artists_batches(service):
+    artist_ids = [f'a{i}' for i in range(60)] + ['plain', 'gone', 'a0']
+    images = service.fetch_artist_images(artist_ids)
+
+    assert service._public_client.calls == [('artists', [f'a{i}' for i in range(50)]),
+                                            ('artists', [f'a{i}' for i in range(50, 60)] + ['plain', 'gone'])]
+    assert images['a7'] == 'https://img/a7'
+    assert images['plain'] == DEFAULT_ARTIST_IMAGE
+    assert images['gone'] == DEFAULT_ARTIST_IMAGE
+
+    # Single-artist lookups are served from the caches the batch filled
+    assert service.fetch_artist_image('a59') == 'https://img/a59'
+    assert service.get_artist_info('a3')['followers'] == 5
+    assert service.fetch_artist_image('gone') == DEFAULT_ARTIST_IMAGE
+    assert len(service._public_client.calls) == 2
+
+
+def test_get_artist_info_fills_image_cache(service):
+    assert service.get_artist_info('solo')['name'] == 'Artist solo'
+    assert service.fetch_artist_image('solo') == 'https://img/solo'
+    assert service.fetch_artists(['solo']) == {'solo': service.get_artist_info('solo')}
+    assert service._public_client.calls == [('artist', 'solo')]
+
+
+def test_metadata_cache_shared_and_bounded(tmp_path, monkeypatch):
+    from app.services import metadata_cache
+    from app.services.metadata_cache import MetadataCache, MISS
+
+    path = str(tmp_path / 'cache.sqlite3')
+    first = SpotifyService('id', 'secret', 'uri', 'scope', cache=MetadataCache(path))
+    first._public_client = FakeClient()
+    first.fetch_artist_images(['a1', 'gone'])
+
+    # Another worker (or a restarted one) reads the same entries without calling Spotify
+    second = SpotifyService('id', 'secret', 'uri', 'scope', cache=MetadataCache(path))
+    second._public_client = FakeClient()
+    assert second.fetch_artist_image('a1') == 'https://img/a1'
+    assert second.get_artist_info('a1')['name'] == 'Artist a1'
+    assert second._public_client.calls == []
+
+    # Failed lookups expire after the short negative TTL
+    cache = MetadataCache(path, negative_ttl=0)
+    cache.set('image', 'gone', DEFAULT_ARTIST_IMAGE, negative=True)
+    assert cache.get('image', 'gone') is MISS
+
+    # LRU eviction keeps the cache under its size cap
+    now = [1000.0]
+    monkeypatch.setattr(metadata_cache.time, 'time', lambda: now[0])
+    small = MetadataCache(max_entries=2)
+    for key in ('x', 'y', 'z'):
+        now[0] += metadata_cache.TOUCH_INTERVAL + 1
+        small.set('image', key, key)
+    now[0] += metadata_cache.TOUCH_INTERVAL + 1
+    assert small.get('image', 'x') == 'x'
+    small.evict()
+    assert small.get('image', 'y') is MISS
+    assert small.get('image', 'x') == 'x' and small.get('image', 'z') == 'z'
+
+
+class RateLimitedHandler(BaseHTTPRequestHandler):
+    """Answers the status with a Retry-After header until the configured number of requests has been seen."""
+
+    status = 503
+    rejections = 1
+    requests_seen = 0
+
+    def do_GET(self):
+        type(self).requests_seen += 1
+        if self.requests_seen <= self.rejections:
+            self.send_response(self.status)
+            self.send_header('Retry-After', '0')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        body = b'{"id": "a1"}'
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def test_pooled_session_retries(monkeypatch):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), RateLimitedHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/v1/artists/a1"
+        session = http_session.create_session(retries=2, backoff_factor=0)
+        assert session.get(url, timeout=(1, 1)).json() == {'id': 'a1'}
+        assert RateLimitedHandler.requests_seen == 2
+
+        # Retries are bounded: the last 503 is handed back instead of retrying forever
+        RateLimitedHandler.requests_seen = 0
+        RateLimitedHandler.rejections = 10
+        assert session.get(url, timeout=(1, 1)).status_code == 503
+        assert RateLimitedHandler.requests_seen == 3
+
+        # A 429 comes straight back, for the caller's circuit breaker
+        RateLimitedHandler.requests_seen = 0
+        RateLimitedHandler.status = 429
+        assert session.get(url, timeout=(1, 1)).status_code == 429
+        assert RateLimitedHandler.requests_seen == 1
+    finally:
+        server.shutdown()
+
+    # Long Retry-After values are capped
+    class Response:
+        headers = {'Retry-After': '3600'}
+        def getheader(self, name, default=None):
+            return self.headers.get(name, default)
+    assert http_session.BoundedRetry(total=1).get_retry_after(Response()) == http_session.MAX_RETRY_AFTER
+
+
+def test_clients_share_session():
+    service = SpotifyService('id', 'secret', 'uri', 'scope')
+    assert service.get_public_client()._session is service.http_session
+    assert service.get_oauth()._session is service.http_session
+
+
+def test_token_bucket_and_breaker(tmp_path):
+    from app.services.rate_limiter import CircuitBreaker, TokenBucket
+
+    now = [100.0]
+    path = str(tmp_path / 'budget.json')
+    bucket = TokenBucket(rate=1, capacity=2, state_path=path, clock=lambda: now[0])
+    other_worker = TokenBucket(rate=1, capacity=2, state_path=path, clock=lambda: now[0])
+    assert bucket.try_acquire() and other_worker.try_acquire()
+    assert not bucket.try_acquire()
+    now[0] += 1
+    assert other_worker.try_acquire()
+
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=lambda: now[0])
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert not breaker.allow()
+    now[0] += 10
+    assert breaker.allow()  # Half-open trial call
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.allow()
+
+    # A Retry-After opens the breaker right away for that long
+    breaker.record_failure(retry_after=60)
+    now[0] += 30
+    assert not breaker.allow()
+
+
+class FailingClient(FakeClient):
+    def artist(self, artist_id):
+        self.calls.append(('artist', artist_id))
+        raise spotipy.SpotifyException(429, -1, 'rate limited', headers={'Retry-After': '120'})
+
+
+def test_degraded_api_serves_cached_data(service):
+    from app.services.metadata_cache import MetadataCache
+
+    service.cache = MetadataCache(ttl=0)
+    service.fetch_artist_images(['a1'])  # Cached but immediately expired
+    service._public_client = FailingClient()
+    service.get_authenticated_client = lambda: None
+
+    assert service.get_artist_info('x1') == {}
+    assert service.guard.degraded()
+    calls = len(service._public_client.calls)
+
+    # While the breaker is open nothing is sent; expired entries and placeholders are served
+    assert service.fetch_artist_image('a1') == 'https://img/a1'
+    assert service.get_artist_info('a1')['name'] == 'Artist a1'
+    assert service.fetch_artist_images(['a1', 'new']) == {'a1': 'https://img/a1', 'new': DEFAULT_ARTIST_IMAGE}
+    assert service.get_top_tracks('a1') == []
+    assert service.search_artists('anything') == []
+    assert len(service._public_client.calls) == calls
+
+
+class FlakyClient(FakeClient):
+    def artist(self, artist_id):
+        self.calls.append(('artist', artist_id))
+        raise requests.ConnectionError('connection reset')
+
+
+def test_transient_failure_keeps_expired_entries(service):
+    from app.services.metadata_cache import MetadataCache, MISS
+
+    service.cache = MetadataCache(ttl=0)
+    service.fetch_artist_images(['a1'])  # Cached but immediately expired
+    service._public_client = FlakyClient()
+    service.get_authenticated_client = lambda: None
+
+    assert service.fetch_artist_image('a1') == 'https://img/a1'
+    assert service.get_artist_info('a1')['name'] == 'Artist a1'
+    assert service.cache.get('image', 'a1', include_expired=True) == 'https://img/a1'
+    # Without an earlier entry the failure is remembered briefly
+    assert service.fetch_artist_image('new') == DEFAULT_ARTIST_IMAGE
+    assert service.cache.get('image', 'new') == DEFAULT_ARTIST_IMAGE
+    assert service.cache.get('image', 'unknown') is MISS
+
+
+def test_raw_rate_limited_response_opens_breaker(service):
+    response = requests.Response()
+    response.status_code = 429
+    response.headers['Retry-After'] = '120'
+    assert service._call(lambda: response) is response
+    assert service.guard.degraded()
+
+
+class SlowClient(FakeClient):
+    """Blocks every lookup until released, so concurrent callers pile up."""
+
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+
+    def artist(self, artist_id):
+        self.release.wait(5)
+        return super().artist(artist_id)
+
+
+def test_concurrent_lookups_share_one_call(service):
+    client = service._public_client = SlowClient()
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(service.get_artist_info('a1'))) for _ in range(3)]
+    threads += [threading.Thread(target=lambda: results.append(service.fetch_artist_image('a1'))) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.1)  # Let every thread reach the lookup while the first call is blocked
+    client.release.set()
+    for thread in threads:
+        thread.join()
+
+    assert client.calls == [('artist', 'a1')]
+    assert results.count('https://img/a1') == 3
+    assert service._flights.in_flight() == 0
+
+
+class BulkClient(FakeClient):
+    def artist_top_tracks(self, artist_id, country='US'):
+        self.calls.append(('top_tracks', artist_id))
+        return {'tracks': [{'name': f'{artist_id} hit', 'external_urls': {'spotify': f'https://open.spotify.com/track/{artist_id}'},
+                            'album': {'images': []}}]}
+
+
+def test_refresh_artist_metadata_serves_pages_without_api_calls(tmp_path):
+    from app.services.artist_metadata import ArtistMetadataStore
+    from app.services.rate_limiter import ApiGuard
+
+    path = str(tmp_path / 'metadata.json')
+    nightly = SpotifyService('id', 'secret', 'uri', 'scope', guard=ApiGuard(rate=1000, burst=100),
+                             metadata_store=ArtistMetadataStore(path))
+    nightly._public_client = BulkClient()
+    artist_ids = [f'a{i}' for i in range(55)] + ['gone']
+    assert nightly.refresh_artist_metadata(artist_ids) == {'requested': 56, 'refreshed': 55, 'failed': 1}
+    assert [call[0] for call in nightly._public_client.calls].count('artists') == 2
+    assert nightly.collect_artist_stats(['a1', 'gone']) == {'a1': {'followers': 5, 'popularity': 10}}
+
+    # A web worker reads the store and never calls Spotify for refreshed artists
+    worker = SpotifyService('id', 'secret', 'uri', 'scope', metadata_store=ArtistMetadataStore(path))
+    worker._public_client = FailingClient()
+    assert worker.get_artist_info('a3')['followers'] == 5
+    assert worker.fetch_artist_image('a3') == 'https://img/a3'
+    assert worker.fetch_artist_images(['a4'])['a4'] == 'https://img/a4'
+    assert worker.get_top_tracks('a3')[0]['name'] == 'a3 hit'
+    assert worker.get_stored_top_tracks('a3', market='SE') is None
+    assert worker.get_stored_top_tracks('gone') is None
+    assert worker._public_client.calls == []
+
+
+class SearchClient(FakeClient):
+    names = ['Taylor Swift', 'Taylor Dayne', 'James Taylor', 'Tay Money']
+
+    def search(self, q, type='artist', limit=10):
+        self.calls.append(('search', q))
+        items = [artist(name.lower().replace(' ', '-')) | {'name': name}
+                 for name in self.names if q in name.lower()][:limit]
+        return {'artists': {'items': items}}
+
+
+def test_search_cache_reuses_prefixes(service):
+    client = service._public_client = SearchClient()
+    assert len(service.search_artists('Tay')) == 4
+    assert [a['name'] for a in service.search_artists('  TAYLOR ')] == ['Taylor Swift', 'Taylor Dayne', 'James Taylor']
+    assert [a['name'] for a in service.search_artists('taylor s')] == ['Taylor Swift']
+    assert client.calls == [('search', 'tay')]
+
+    # Truncated prefix results aren't filtered when too few matches remain
+    assert len(service.search_artists('ta', limit=2)) == 2
+    assert service.search_artists('tay m', limit=2)[0]['name'] == 'Tay Money'
+    assert client.calls[-1] == ('search', 'tay m')
+    assert service.search_cache.stats()['prefix_hits'] == 2
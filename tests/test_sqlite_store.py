@@ -0,0 +1,44 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from datastore import sqlite_store
+
+
+def import_scraping_store():
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scraping'))
+    try:
+        import sqlite_store as scraping_store
+    finally:
+        sys.path.pop(0)
+    return scraping_store
+
+
+def test_scrapers_and_web_app_share_one_schema(tmp_path, monkeypatch):
+    scraping_store = import_scraping_store()
+    db_path = str(tmp_path / sqlite_store.DB_FILENAME)
+    monkeypatch.setenv('SQLITE_PATH', db_path)
+    assert scraping_store.default_db_path() == db_path
+
+    # A database created by a scraper already has the tables the web app writes to
+    conn = scraping_store.connect()
+    try:
+        scraping_store.append_listeners(conn, [{'artist_id': 'a1', 'date': '20250101', 'monthly_listeners': 10}])
+    finally:
+        conn.close()
+
+    conn = sqlite_store.connect(db_path)
+    try:
+        sqlite_store.upsert_artist_stats(conn, [{'artist_id': 'a1', 'date': '20250101', 'followers': 5}])
+        assert [r['date'] for r in sqlite_store.iter_listeners(conn)] == ['2025-01-01']
+        assert list(sqlite_store.iter_artist_stats(conn)) == [
+            {'artist_id': 'a1', 'date': '2025-01-01', 'followers': 5, 'popularity': None}]
+    finally:
+        conn.close()
+
+
+def test_backend_setting(monkeypatch):
+    monkeypatch.setenv('STORAGE_BACKEND', 'SQLite')
+    assert sqlite_store.backend() == 'sqlite'
+    assert import_scraping_store().backend is sqlite_store.backend
@@ -105,6 +105,13 @@ configure_environment()
 from app.config import Config
 from app.services import SpotifyService, DataService, JobService
 from app.services.scheduler_service import SchedulerService
+from app.services.storage import create_storage
+from app.services.metadata_cache import MetadataCache
+from app.services.artist_metadata import ArtistMetadataStore
+from app.services.search_cache import SearchCache
+from app.services.job_store import JobStore
+from app.services.http_session import create_session
+from app.services.rate_limiter import ApiGuard
 from app.routes.main import create_main_routes
 from app.routes.admin import create_admin_routes
 
@@ -176,22 +183,67 @@ def create_app():
         client_id=Config.SPOTIFY_CLIENT_ID,
         client_secret=Config.SPOTIFY_CLIENT_SECRET,
         redirect_uri=Config.SPOTIFY_REDIRECT_URI,
-        scope=Config.SPOTIFY_SCOPE
+        scope=Config.SPOTIFY_SCOPE,
+        cache=MetadataCache(
+            Config.SPOTIFY_CACHE_PATH,
+            max_entries=Config.SPOTIFY_CACHE_MAX_ENTRIES,
+            ttl=Config.SPOTIFY_CACHE_TTL,
+            negative_ttl=Config.SPOTIFY_CACHE_NEGATIVE_TTL
+        ),
+        http_session=create_session(retries=Config.SPOTIFY_MAX_RETRIES),
+        timeout=(Config.SPOTIFY_CONNECT_TIMEOUT, Config.SPOTIFY_READ_TIMEOUT),
+        guard=ApiGuard(
+            rate=Config.SPOTIFY_RATE_LIMIT,
+            burst=Config.SPOTIFY_RATE_BURST,
+            failure_threshold=Config.SPOTIFY_BREAKER_FAILURES,
+            reset_timeout=Config.SPOTIFY_BREAKER_RESET,
+            state_dir=Config.DATA_DIR
+        ),
+        metadata_store=ArtistMetadataStore(Config.ARTIST_METADATA_PATH, market=Config.SPOTIFY_MARKET),
+        search_cache=SearchCache(max_entries=Config.SPOTIFY_SEARCH_CACHE_SIZE, ttl=Config.SPOTIFY_SEARCH_CACHE_TTL)
     )
     
     data_service = DataService(
         data_path=Config.DATA_PATH,
         followed_artists_path=Config.FOLLOWED_ARTISTS_PATH,
         suggestions_file=Config.SUGGESTIONS_FILE,
-        blacklist_file=Config.BLACKLIST_FILE
+        blacklist_file=Config.BLACKLIST_FILE,
+        leaderboard_path=Config.LEADERBOARD_PATH,
+        storage=create_storage(Config),
+        snapshot_path=Config.SNAPSHOT_PATH
     )
+    
+    def refresh_leaderboards():
+        """Materialize all leaderboards (with top-10 images) once new scrape results land."""
+        data_service.materialize_leaderboards(image_resolver=spotify_service.fetch_artist_image,
+                                              image_prefetcher=spotify_service.fetch_artists)
+    
     job_service = JobService(
         chromedriver_path=Config.CHROMEDRIVER_PATH,
-        scraping_timeout=Config.SCRAPING_TIMEOUT
+        scraping_timeout=Config.SCRAPING_TIMEOUT,
+        scraping_workers=Config.SCRAPING_WORKERS,
+        on_scrape_complete=refresh_leaderboards,
+        job_store=JobStore(Config.JOBS_JOURNAL_PATH),
+        log_dir=Config.JOB_LOG_DIR,
+        max_concurrent_jobs=Config.SCRAPING_MAX_CONCURRENT_JOBS
     )
     
+    def refresh_artist_metadata():
+        """
+        Record today's followers and popularity for every tracked artist, then refresh the
+        stored metadata (info, images, top tracks) of every followed artist.
+        """
+        data_service.record_artist_stats(spotify_service.collect_artist_stats(data_service.get_tracked_artist_ids()))
+        spotify_service.refresh_artist_metadata(data_service.get_followed_artist_ids())
+    
     # Initialize scheduler service
-    scheduler_service = SchedulerService(job_service)
+    scheduler_service = SchedulerService(
+        job_service,
+        metadata_refresher=refresh_artist_metadata,
+        metadata_refresh_time=Config.METADATA_REFRESH_TIME,
+        lock_path=Config.SCHEDULER_LOCK_PATH,
+        state_path=Config.SCHEDULER_STATE_PATH
+    )
     
     # Store services in app context for access in routes
     app.spotify_service = spotify_service
@@ -248,10 +300,13 @@ def create_app():
         else:
             return str(num)
 
-    # Clean up old job files on startup
+    # Drop old jobs (and mark jobs orphaned by a restart) on startup
     job_service.cleanup_old_jobs()
     
-    # Start the scheduler service
+    # Run queued jobs (including ones queued by other workers) as slots free up
+    job_service.start_dispatcher()
+    
+    # Start the scheduler service in every worker; one of them is elected to run the jobs
     scheduler_service.start_scheduler()
     
     return app
@@ -1 +1,9 @@
 # app/__init__.py - Package initialization
+import os
+import sys
+
+# The storage formats in datastore/ are shared with the scrapers. The Docker image copies
+# the package next to app/; in a checkout it sits at the repository root
+_REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if os.path.isdir(os.path.join(_REPO_ROOT, 'datastore')) and _REPO_ROOT not in sys.path:
+    sys.path.append(_REPO_ROOT)
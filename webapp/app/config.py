@@ -3,8 +3,13 @@ Configuration module for the Spotify Listener Tracker app.
 """
 
 import os
+import logging
 from dotenv import load_dotenv
 
+from datastore import listener_store
+
+logger = logging.getLogger(__name__)
+
 # Load environment variables
 load_dotenv()
 
@@ -28,14 +33,53 @@ class Config:
     BASE_DIR = os.path.dirname(os.path.dirname(__file__))
     DATA_DIR = os.getenv('DATA_PATH', os.path.join(BASE_DIR, "..", "data", "results"))
     
-    DATA_PATH = os.path.join(DATA_DIR, "spotify-monthly-listeners-master.json")
+    DATA_PATH = os.path.join(DATA_DIR, "spotify-monthly-listeners-master.jsonl")
+    LEGACY_DATA_PATH = os.path.join(DATA_DIR, "spotify-monthly-listeners-master.json")
     FOLLOWED_ARTISTS_PATH = os.path.join(DATA_DIR, "spotify-followed-artists-master.json")
     SUGGESTIONS_FILE = os.path.join(BASE_DIR, "artist_suggestions.json")
     BLACKLIST_FILE = os.path.join(BASE_DIR, "artist_blacklist.json")
+    LEADERBOARD_PATH = os.path.join(DATA_DIR, "spotify-leaderboards.json")  # Materialized at ingest time
+    SNAPSHOT_PATH = os.path.join(DATA_DIR, "spotify-listeners.snapshot")  # Memory-mapped by every worker
+    ARTIST_STATS_PATH = os.path.join(DATA_DIR, "spotify-artist-stats.jsonl")  # Daily followers and popularity
+    
+    # Storage backend: 'json' (files above) or 'sqlite' (single database, see scripts/migrate_to_sqlite.py)
+    STORAGE_BACKEND = os.getenv('STORAGE_BACKEND', 'json').lower()
+    SQLITE_PATH = os.getenv('SQLITE_PATH', os.path.join(DATA_DIR, "spotify-data.sqlite3"))
+    
+    # Spotify API HTTP settings (pooled session, see services/http_session.py)
+    SPOTIFY_CONNECT_TIMEOUT = float(os.getenv('SPOTIFY_CONNECT_TIMEOUT', '3.05'))
+    SPOTIFY_READ_TIMEOUT = float(os.getenv('SPOTIFY_READ_TIMEOUT', '10'))
+    SPOTIFY_MAX_RETRIES = int(os.getenv('SPOTIFY_MAX_RETRIES', '2'))
+    # Call budget shared by all workers, and the circuit breaker that pauses calls after failures
+    SPOTIFY_RATE_LIMIT = float(os.getenv('SPOTIFY_RATE_LIMIT', '10'))  # Calls per second
+    SPOTIFY_RATE_BURST = float(os.getenv('SPOTIFY_RATE_BURST', '20'))
+    SPOTIFY_BREAKER_FAILURES = int(os.getenv('SPOTIFY_BREAKER_FAILURES', '5'))
+    SPOTIFY_BREAKER_RESET = float(os.getenv('SPOTIFY_BREAKER_RESET', '30'))  # Seconds
+    
+    # Spotify metadata cache (artist images, info, top tracks), shared by all workers
+    SPOTIFY_CACHE_PATH = os.getenv('SPOTIFY_CACHE_PATH', os.path.join(DATA_DIR, "spotify-metadata-cache.sqlite3"))
+    SPOTIFY_CACHE_MAX_ENTRIES = int(os.getenv('SPOTIFY_CACHE_MAX_ENTRIES', '50000'))
+    SPOTIFY_CACHE_TTL = int(os.getenv('SPOTIFY_CACHE_TTL', str(7 * 24 * 3600)))  # 1 week
+    SPOTIFY_CACHE_NEGATIVE_TTL = int(os.getenv('SPOTIFY_CACHE_NEGATIVE_TTL', '600'))  # Failed lookups: 10 minutes
+    # Autocomplete search results, per worker
+    SPOTIFY_SEARCH_CACHE_SIZE = int(os.getenv('SPOTIFY_SEARCH_CACHE_SIZE', '1000'))
+    SPOTIFY_SEARCH_CACHE_TTL = int(os.getenv('SPOTIFY_SEARCH_CACHE_TTL', '3600'))  # 1 hour
+    
+    # Artist metadata refreshed nightly for every followed artist; routes read it before calling Spotify
+    ARTIST_METADATA_PATH = os.path.join(DATA_DIR, "spotify-artist-metadata.json")
+    METADATA_REFRESH_TIME = os.getenv('METADATA_REFRESH_TIME', '04:00')  # HH:MM, after the daily scrape
+    SPOTIFY_MARKET = os.getenv('SPOTIFY_MARKET', 'US')  # Market for the stored top tracks
     
     # Scraping settings
     CHROMEDRIVER_PATH = os.getenv('CHROMEDRIVER_PATH', 'chromedriver')
     SCRAPING_TIMEOUT = 1800  # 30 minutes
+    SCRAPING_WORKERS = int(os.getenv('SCRAPING_WORKERS', '1'))  # Parallel Chrome workers for full scrapes
+    SCRAPING_MAX_CONCURRENT_JOBS = int(os.getenv('SCRAPING_MAX_CONCURRENT_JOBS', '1'))  # Per container; more wait in the queue
+    JOBS_JOURNAL_PATH = os.path.join(DATA_DIR, "scraping-jobs.jsonl")  # Job history shared by every worker
+    JOB_LOG_DIR = os.path.join(DATA_DIR, "scraping-job-logs")  # Full output of each job, in rotating segments
+    # One worker leads the scheduler (fcntl lock); the schedule is shared through the state file
+    SCHEDULER_LOCK_PATH = os.path.join(DATA_DIR, "scheduler.lock")
+    SCHEDULER_STATE_PATH = os.path.join(DATA_DIR, "scheduler-state.json")
     
     # Template settings
     TEMPLATES_AUTO_RELOAD = DEBUG
@@ -49,12 +93,24 @@ class Config:
         # Ensure data directories exist
         os.makedirs(cls.DATA_DIR, exist_ok=True)
         
+        # Scraper subprocesses inherit the environment, so they write to the same backend
+        os.environ['STORAGE_BACKEND'] = cls.STORAGE_BACKEND
+        os.environ['SQLITE_PATH'] = cls.SQLITE_PATH
+        
+        # One-shot migration of the legacy JSON array to the append-only JSONL store
+        if not os.path.exists(cls.DATA_PATH) and os.path.exists(cls.LEGACY_DATA_PATH):
+            migrated = listener_store.migrate_from_json(cls.LEGACY_DATA_PATH, cls.DATA_PATH)
+            if migrated is not None:
+                logger.info(f"Migrated {migrated} listener records to {cls.DATA_PATH}")
+        
         # Create empty data files if they don't exist
         for file_path in [cls.DATA_PATH, cls.FOLLOWED_ARTISTS_PATH, cls.SUGGESTIONS_FILE, cls.BLACKLIST_FILE]:
             if not os.path.exists(file_path):
                 if file_path.endswith('.json'):
                     with open(file_path, 'w') as f:
                         f.write('[]')
+                elif file_path.endswith('.jsonl'):
+                    open(file_path, 'a').close()
     
     @classmethod
     def validate(cls):
@@ -2,11 +2,13 @@
 Admin routes for the Spotify Listener Tracker app.
 """
 
-from flask import Blueprint, render_template, request, jsonify, redirect, url_for, session, current_app
+from flask import Blueprint, render_template, request, jsonify, redirect, url_for, session, current_app, Response, stream_with_context
 from datetime import datetime
 import logging
 import hashlib
+import json
 import os
+import threading
 
 logger = logging.getLogger(__name__)
 admin_security_logger = logging.getLogger('admin_security')
@@ -17,6 +19,19 @@ ADMIN_PASSWORD = os.environ.get('ADMIN_PASSWORD')
 if not ADMIN_PASSWORD:
     logger.warning("ADMIN_PASSWORD not found in .env file! Admin login will not work.")
 
+# Scraping progress stream. Each open stream holds a gunicorn thread for as long as the job
+# runs, so the thread pool is sized for them (see the Dockerfile) and each worker serves at
+# most SSE_MAX_STREAMS at once; the rest of its threads stay free for pages
+SSE_HEARTBEAT = 15  # Seconds between keep-alive comments
+SSE_MAX_DURATION = 3600  # Seconds before a stream ends and the browser reconnects (a safety net)
+SSE_MAX_STREAMS = 4  # Open streams per worker
+SSE_RETRY_MS = 2000
+SSE_BUSY_RETRY_MS = 10000  # Reconnect delay when the worker already serves SSE_MAX_STREAMS
+
+# Scraping job log pages
+LOG_PAGE_BYTES = 64 * 1024
+LOG_MAX_PAGE_BYTES = 1024 * 1024
+
 def get_client_ip():
     """Get client IP address for logging"""
     return request.environ.get('HTTP_X_FORWARDED_FOR', request.remote_addr)
@@ -25,6 +40,7 @@ def create_admin_routes(spotify_service, data_service, job_service, scheduler_se
     """Create admin routes blueprint with injected services."""
     
     admin_bp = Blueprint('admin', __name__)
+    sse_streams = threading.BoundedSemaphore(SSE_MAX_STREAMS)
     
     def require_admin_auth():
         """Check if user is authenticated as admin"""
@@ -408,7 +424,7 @@ def create_admin_routes(spotify_service, data_service, job_service, scheduler_se
                 scraping_type = "filtered (today's artists only)" if today_only else "full"
                 return jsonify({
                     "success": True,
-                    "message": f"Scraping started successfully ({scraping_type})",
+                    "message": f"Scraping queued successfully ({scraping_type})",
                     "job_id": job_id
                 })
             else:
@@ -440,6 +456,41 @@ def create_admin_routes(spotify_service, data_service, job_service, scheduler_se
             logger.error(f"Error getting job status: {e}")
             return jsonify({"success": False, "message": f"Error: {str(e)}"})
     
+    @admin_bp.route("/scraping_status/<job_id>/events")
+    @admin_login_required
+    def admin_scraping_events(job_id):
+        """
+        Stream a scraping job's progress as Server-Sent Events.
+        
+        Sends a 'snapshot' of the job, an 'update' with only the changed fields on each
+        change, and 'done' when the job finishes. Streams end after SSE_MAX_DURATION;
+        EventSource reconnects and gets a fresh snapshot. When this worker already serves
+        SSE_MAX_STREAMS, the stream ends at once and the browser retries a little later.
+        """
+        if not sse_streams.acquire(blocking=False):
+            return Response(f"retry: {SSE_BUSY_RETRY_MS}\n\n", mimetype='text/event-stream',
+                            headers={'Cache-Control': 'no-cache'})
+        
+        def stream():
+            # Ask EventSource to wait a bit before reconnecting
+            yield f"retry: {SSE_RETRY_MS}\n\n"
+            try:
+                for event, data in job_service.watch_job(job_id, heartbeat=SSE_HEARTBEAT, max_duration=SSE_MAX_DURATION):
+                    if event == 'heartbeat':
+                        yield ": keep-alive\n\n"
+                    else:
+                        yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+            except GeneratorExit:
+                pass
+            except Exception as e:
+                logger.error(f"Error streaming job {job_id}: {e}")
+        
+        response = Response(stream_with_context(stream()), mimetype='text/event-stream',
+                            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+        # Frees the slot when the stream ends or the client goes away (also if it never starts)
+        response.call_on_close(sse_streams.release)
+        return response
+    
     @admin_bp.route("/scraping_jobs")
     @admin_login_required
     def admin_scraping_jobs():
@@ -455,6 +506,44 @@ def create_admin_routes(spotify_service, data_service, job_service, scheduler_se
             logger.error(f"Error getting all jobs: {e}")
             return jsonify({"success": False, "message": f"Error: {str(e)}"})
     
+    @admin_bp.route("/scraping_jobs/<job_id>/log")
+    @admin_login_required
+    def admin_scraping_job_log(job_id):
+        """
+        Page through a scraping job's full output.
+        
+        Query parameters: offset (byte offset, from the previous page's next_offset) and
+        limit (bytes per page).
+        """
+        try:
+            if not job_service.get_job_status(job_id):
+                return jsonify({"success": False, "message": "Job not found"}), 404
+            
+            offset = max(request.args.get('offset', 0, type=int), 0)
+            limit = min(max(request.args.get('limit', LOG_PAGE_BYTES, type=int), 1), LOG_MAX_PAGE_BYTES)
+            page = job_service.get_job_log(job_id, offset=offset, limit=limit)
+            return jsonify({"success": True, "job_id": job_id, **page})
+        
+        except Exception as e:
+            logger.error(f"Error reading log for job {job_id}: {e}")
+            return jsonify({"success": False, "message": f"Error: {str(e)}"})
+    
+    @admin_bp.route("/scraping_jobs/<job_id>/cancel", methods=["POST"])
+    @admin_login_required
+    def admin_cancel_scraping_job(job_id):
+        """Cancel a queued or running scraping job."""
+        try:
+            result = job_service.cancel_job(job_id)
+            if result == 'cancelled':
+                return jsonify({"success": True, "status": result, "message": "Queued scraping job cancelled"})
+            if result == 'cancelling':
+                return jsonify({"success": True, "status": result, "message": "Stopping the scraping job..."})
+            return jsonify({"success": False, "message": "Job not found or already finished"})
+        
+        except Exception as e:
+            logger.error(f"Error cancelling job {job_id}: {e}")
+            return jsonify({"success": False, "message": f"Error: {str(e)}"})
+    
     @admin_bp.route("/process_suggestions", methods=["POST"])
     def admin_process_suggestions():
         """Admin endpoint to process approved suggestions."""
@@ -519,7 +608,7 @@ def create_admin_routes(spotify_service, data_service, job_service, scheduler_se
                 
                 return jsonify({
                     "success": True,
-                    "message": "Full scraping started immediately",
+                    "message": "Full scraping queued to start immediately",
                     "job_id": job_id
                 })
             else:
@@ -8,6 +8,10 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+SEARCH_RESULTS_LIMIT = 10  # Autocomplete suggestions per query
+SUGGEST_LIMIT = 10
+SUGGEST_MAX_LIMIT = 50
+
 def create_main_routes(spotify_service, data_service):
     """Create main routes blueprint with injected services."""
     
@@ -55,12 +59,10 @@ def create_main_routes(spotify_service, data_service):
                                                artist_name_slug=slug, 
                                                artist_id=artist_id))
             
-            # Add image URLs for results
+            # Add image URLs for results (batched, 50 artists per Spotify request)
+            image_urls = spotify_service.fetch_artist_images(result.get("artist_id") for result in results)
             for result in results:
-                if result.get("artist_id"):
-                    result["image_url"] = spotify_service.fetch_artist_image(result["artist_id"])
-                else:
-                    result["image_url"] = None
+                result["image_url"] = image_urls.get(result.get("artist_id"))
             
             results_for_chart = list(reversed(results))
             
@@ -108,25 +110,15 @@ def create_main_routes(spotify_service, data_service):
     
     @main_bp.route("/suggest", methods=["GET"])
     def suggest():
-        """Auto-suggest artist names."""
-        term = request.args.get("term", "").strip().lower()
+        """Auto-suggest artist names (ranked, best match first)."""
+        term = request.args.get("term", "").strip()
+        limit = min(request.args.get("limit", SUGGEST_LIMIT, type=int) or SUGGEST_LIMIT, SUGGEST_MAX_LIMIT)
         
         if not term:
             return jsonify([])
         
         try:
-            data = data_service.load_data()
-            suggestions = []
-            seen = set()
-            
-            for entry in data:
-                name = entry.get("artist_name", "")
-                if term in name.lower() and name not in seen:
-                    suggestions.append(name)
-                    seen.add(name)
-            
-            suggestions.sort()
-            return jsonify(suggestions)
+            return jsonify(data_service.suggest_artist_names(term, limit=limit))
         
         except Exception as e:
             logger.error(f"Error in suggest: {e}")
@@ -141,12 +133,12 @@ def create_main_routes(spotify_service, data_service):
         try:
             leaderboard_data = data_service.get_leaderboard_data(mode=mode, tier=tier)
             
-            # Add image URLs for leaderboard entries
-            for entry in leaderboard_data['leaderboard']:
-                if entry.get("artist_id"):
-                    entry["image_url"] = spotify_service.fetch_artist_image(entry["artist_id"])
-                else:
-                    entry["image_url"] = None
+            # Image URLs are materialized with the leaderboard; only fill in any that are missing,
+            # all in one batched request
+            missing = [entry for entry in leaderboard_data['leaderboard'] if not entry.get("image_url")]
+            image_urls = spotify_service.fetch_artist_images(entry.get("artist_id") for entry in missing)
+            for entry in missing:
+                entry["image_url"] = image_urls.get(entry.get("artist_id"))
             
             return render_template(
                 "leaderboard.html",
@@ -169,18 +161,52 @@ def create_main_routes(spotify_service, data_service):
                 error="An error occurred while loading the leaderboard."
             )
     
+    @main_bp.route("/api/leaderboard")
+    def leaderboard_query():
+        """
+        Ad-hoc leaderboard as JSON.
+        
+        Query parameters: window (7d, 30d, 90d, month, ytd, custom), start, end, tier,
+        source (repeatable), added_from, added_to, sort (change, percent_change, velocity),
+        order (asc, desc), page, per_page.
+        
+        sort=followers or sort=popularity ranks the daily Spotify figures instead, by the
+        latest value or, with days, by the change over that many days.
+        """
+        try:
+            result = data_service.query_leaderboard(
+                window=request.args.get('window', '30d'),
+                start=request.args.get('start'),
+                end=request.args.get('end'),
+                tier=request.args.get('tier', 'all'),
+                source=request.args.getlist('source') or None,
+                added_from=request.args.get('added_from'),
+                added_to=request.args.get('added_to'),
+                sort=request.args.get('sort', 'percent_change'),
+                order=request.args.get('order', 'desc'),
+                page=request.args.get('page', 1, type=int),
+                per_page=request.args.get('per_page', 25, type=int),
+                days=request.args.get('days', type=int)
+            )
+            return jsonify(result)
+        
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        except Exception as e:
+            logger.error(f"Error in leaderboard query: {e}")
+            return jsonify({"error": "An error occurred while querying the leaderboard."}), 500
+    
     @main_bp.route("/artist/<artist_id>")
     def artist_detail_redirect(artist_id):
         """Redirect to artist detail with slug."""
         try:
-            data = data_service.load_data()
-            for entry in data:
-                if entry.get("artist_id") == artist_id:
-                    artist_name = entry.get("artist_name", "artist")
-                    slug = data_service.slugify(artist_name)
-                    return redirect(url_for('main.artist_detail', 
-                                           artist_name_slug=slug, 
-                                           artist_id=artist_id))
+            entry = data_service.get_latest_entry(artist_id)
+            if entry:
+                artist_name = entry.get("artist_name", "artist")
+                slug = data_service.slugify(artist_name)
+                return redirect(url_for('main.artist_detail', 
+                                       artist_name_slug=slug, 
+                                       artist_id=artist_id))
             
             return redirect(url_for('main.home'))
         
@@ -192,10 +218,10 @@ def create_main_routes(spotify_service, data_service):
     def artist_detail(artist_name_slug, artist_id):
         """Display artist detail page."""
         try:
-            # Get artist history
+            # Get artist history (read-only records, already sorted oldest first;
+            # the datetimeformat filter handles both stored date formats)
             results = data_service.get_artist_history(artist_id)
             
-            # Parse dates for template
             def parse_date(val):
                 if isinstance(val, datetime):
                     return val
@@ -207,21 +233,20 @@ def create_main_routes(spotify_service, data_service):
                             continue
                 return val
             
-            # Parse dates first, then sort
-            for row in results:
-                row["date"] = parse_date(row.get("date"))
-            
-            # Sort by parsed dates (oldest first)
-            results.sort(key=lambda x: x.get("date") or datetime.min, reverse=False)
-            
-            # Get artist info and image
+            # Get artist info and image (from the nightly metadata store when available)
             artist_info = spotify_service.get_artist_info(artist_id)
             artist_image_url = spotify_service.fetch_artist_image(artist_id)
+            top_tracks = spotify_service.get_stored_top_tracks(artist_id)
+            
+            # Daily followers, lined up with the listener history for the chart
+            followers_by_date = {row["date"]: row["followers"] for row in data_service.get_artist_stats(artist_id)}
+            followers_series = [followers_by_date.get(data_service.normalize_date(row.get("date")))
+                                for row in results]
             
             # Calculate all-time high
             all_time_high = None
             if results:
-                max_entry = max(results, key=lambda x: x.get("monthly_listeners", 0))
+                max_entry = max(results, key=lambda x: x.get("monthly_listeners") or 0)
                 all_time_high = {
                     "value": max_entry.get("monthly_listeners", 0),
                     "date": parse_date(max_entry.get("date", ""))
@@ -233,7 +258,9 @@ def create_main_routes(spotify_service, data_service):
                 artist_info=artist_info,
                 artist_image_url=artist_image_url,
                 all_time_high=all_time_high,
-                artist_id=artist_id
+                artist_id=artist_id,
+                top_tracks=top_tracks,
+                followers_series=followers_series if any(value is not None for value in followers_series) else None
             )
         
         except Exception as e:
@@ -257,7 +284,29 @@ def create_main_routes(spotify_service, data_service):
             return jsonify({"artists": []})
         
         try:
-            artists = spotify_service.search_artists(query)
+            # Artists we already track come straight from our own index
+            tracked = data_service.find_tracked_artists(query, limit=SEARCH_RESULTS_LIMIT)
+            known = spotify_service.get_known_artists([artist["artist_id"] for artist in tracked])
+            artists = []
+            for artist in tracked:
+                info = known.get(artist["artist_id"], {})
+                stats = data_service.get_artist_stats(artist["artist_id"]) if not info else []
+                artists.append({
+                    "id": artist["artist_id"],
+                    "name": artist["artist_name"],
+                    "url": info.get("url") or artist["url"],
+                    "image": info.get("image", ""),
+                    "followers": info.get("followers") or (stats[-1]["followers"] if stats else 0) or 0,
+                    "tracked": True
+                })
+            
+            # Fill the rest from Spotify (cached by query and prefix)
+            if len(artists) < SEARCH_RESULTS_LIMIT:
+                seen = {artist["id"] for artist in artists}
+                for artist in spotify_service.search_artists(query, limit=SEARCH_RESULTS_LIMIT):
+                    if artist["id"] not in seen and len(artists) < SEARCH_RESULTS_LIMIT:
+                        artists.append(artist)
+            
             return jsonify({"artists": artists})
         
         except Exception as e:
@@ -330,10 +379,7 @@ def create_main_routes(spotify_service, data_service):
                 return jsonify({"success": False, "message": "Artist name is required"})
             
             # Check blacklist
-            blacklisted_artists, blacklisted_ids = data_service.load_blacklist()
-            
-            if (artist_name.lower() in blacklisted_artists or 
-                (spotify_id and spotify_id in blacklisted_ids)):
+            if data_service.is_artist_blacklisted(artist_name, spotify_id):
                 return jsonify({"success": False, "message": "We do not support predators"})
             
             # Check if already suggested
@@ -373,16 +419,11 @@ def create_main_routes(spotify_service, data_service):
                         auto_follow_success = True
                         auto_follow_message = "Artist automatically followed on Spotify"
                         
-                        # Add to followed artists file
-                        followed_artists = data_service.load_followed_artists()
-                        
-                        # Check if already in list
-                        already_exists = any(
-                            followed.get("artist_id") == spotify_id 
-                            for followed in followed_artists
-                        )
+                        # Add to followed artists file unless it is already in the list
+                        already_exists = data_service.registry.contains('followed_artists', artist_id=spotify_id)
                         
                         if not already_exists:
+                            followed_artists = data_service.load_followed_artists()
                             new_artist = {
                                 "artist_name": artist_name,
                                 "artist_id": spotify_id,
@@ -447,13 +488,12 @@ def create_main_routes(spotify_service, data_service):
     def refresh_data():
         """Refresh data cache manually."""
         try:
-            # Clear cache and reload data
-            data_service.clear_cache()
-            data = data_service.load_data(use_cache=False)
+            # Reload data (the previous version keeps serving if the read fails)
+            records = data_service.get_record_count(use_cache=False)
             return jsonify({
                 "success": True, 
-                "message": f"Data refreshed successfully. Loaded {len(data)} records.",
-                "records": len(data)
+                "message": f"Data refreshed successfully. Loaded {records} records.",
+                "records": records
             })
         except Exception as e:
             logger.error(f"Error refreshing data: {e}")
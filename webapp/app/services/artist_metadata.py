@@ -0,0 +1,116 @@
+"""
+Local store of artist metadata refreshed in bulk.
+
+A nightly job fetches name, images, genres, followers, popularity and top tracks for
+every followed artist with batched API calls and writes them to one JSON file (temp
+file + rename, so readers never see a partial file). Routes read this store before the
+metadata cache or the Spotify API, so artist pages render without calling Spotify.
+Each worker re-reads the file only when another process has replaced it.
+"""
+
+import json
+import os
+import threading
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional
+
+from .atomic_file import atomic_write_json
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MARKET = "US"
+
+
+class ArtistMetadataStore:
+    """Artist ID -> {'info': ..., 'top_tracks': [...], 'refreshed_at': ...}, persisted to a JSON file."""
+
+    def __init__(self, path: Optional[str] = None, market: str = DEFAULT_MARKET):
+        """
+        Args:
+            path: JSON file shared by every worker; None keeps the store in memory
+            market: Market the stored top tracks were fetched for
+        """
+        self.path = path
+        self.market = market
+        self._lock = threading.Lock()
+        self._artists: Dict[str, Dict[str, Any]] = {}
+        self._signature = None
+        self.refreshed_at = None
+
+    def _file_signature(self) -> Optional[tuple]:
+        """Return (mtime_ns, size) of the store file."""
+        if not self.path:
+            return None
+        try:
+            stat = os.stat(self.path)
+            return (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return None
+
+    def _current(self) -> Dict[str, Dict[str, Any]]:
+        """Return the artists, re-reading the file if another process has replaced it."""
+        signature = self._file_signature()
+        if signature is None or signature == self._signature:
+            return self._artists
+
+        with self._lock:
+            if signature != self._signature:
+                try:
+                    with open(self.path, 'r', encoding='utf-8') as f:
+                        payload = json.load(f)
+                    if payload.get('market', DEFAULT_MARKET) == self.market:
+                        self._artists = payload.get('artists', {})
+                        self.refreshed_at = payload.get('refreshed_at')
+                    else:
+                        logger.warning(f"Ignoring artist metadata stored for market {payload.get('market')}")
+                        self._artists = {}
+                except Exception as e:
+                    logger.error(f"Error loading artist metadata store: {e}")
+                self._signature = signature
+            return self._artists
+
+    def get(self, artist_id: str) -> Optional[Dict[str, Any]]:
+        """Return the stored entry for an artist, or None."""
+        return self._current().get(artist_id) if artist_id else None
+
+    def get_many(self, artist_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Return the stored entries for the artists that have one."""
+        artists = self._current()
+        return {artist_id: artists[artist_id] for artist_id in artist_ids if artist_id in artists}
+
+    def __len__(self) -> int:
+        return len(self._current())
+
+    def update(self, entries: Dict[str, Dict[str, Any]]) -> bool:
+        """
+        Merge refreshed entries into the store and persist it.
+
+        Artists missing from entries keep their previous entry, so a refresh cut short
+        by rate limiting never loses data.
+
+        Args:
+            entries: Artist ID -> entry
+
+        Returns:
+            True if the store was saved
+        """
+        with self._lock:
+            artists = dict(self._artists)
+            artists.update(entries)
+            now = datetime.now().isoformat()
+            if not self.path:
+                self._artists, self.refreshed_at = artists, now
+                return True
+
+            payload = {'market': self.market, 'refreshed_at': now, 'artists': artists}
+            try:
+                atomic_write_json(self.path, payload)
+            except Exception as e:
+                logger.error(f"Error saving artist metadata store: {e}")
+                return False
+
+            self._artists, self.refreshed_at = artists, now
+            self._signature = self._file_signature()
+            logger.info(f"Saved metadata for {len(entries)} artists ({len(artists)} stored) to {self.path}")
+            return True
@@ -0,0 +1,37 @@
+"""
+Atomic JSON file writes.
+
+Files read by every gunicorn worker (materialized leaderboards, artist metadata,
+scheduler state) are written to a temp file in the same directory and renamed over
+the target, so a reader sees either the old or the new file, never a partial one.
+"""
+
+import json
+import os
+import tempfile
+from typing import Any, Optional
+
+
+def atomic_write_json(path: str, payload: Any, indent: Optional[int] = None):
+    """
+    Replace the JSON file at path with payload (temp file + rename).
+
+    Args:
+        path: Target file path; its directory is created if needed
+        payload: JSON-serializable value
+        indent: Optional indentation, for files that are also edited by hand
+
+    Raises:
+        OSError, TypeError, ValueError: If the file couldn't be written (the target is left unchanged)
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}-", suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, indent=indent, ensure_ascii=False)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
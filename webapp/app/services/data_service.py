@@ -4,86 +4,232 @@ Data service module for handling data operations.
 
 import json
 import os
-import re
+import threading
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Callable
 import logging
 
+# The shared snapshot needs file locking, which is only available on POSIX
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from . import snapshot
+from .atomic_file import atomic_write_json
+from .dataset import ListDataset, ListenerRecord, artist_id_from_url, normalize_date, slugify
+from .snapshot import Snapshot
+from .registry import CollectionRegistry
+from .storage import JsonStorage
+from .leaderboard_query import LeaderboardQueryEngine, MAX_PER_PAGE, TIER_RANGES
+from .name_index import NameIndex
+
 logger = logging.getLogger(__name__)
 
+# Every combination is materialized whenever new scrape results land
+LEADERBOARD_MODES = ('growth', 'loss')
+LEADERBOARD_TIERS = ('all', 'micro', 'small', 'medium', 'large', 'major')
+LEADERBOARD_WINDOWS = ('month', '30d')
+LEADERBOARD_SIZE = 10
+
+# Daily figures collected from the Spotify API next to the scraped monthly listeners
+ARTIST_STATS = ('followers', 'popularity')
+
 class DataService:
     """Service class for data operations."""
     
-    def __init__(self, data_path: str, followed_artists_path: str, suggestions_file: str, blacklist_file: str):
+    def __init__(self, data_path: str, followed_artists_path: str, suggestions_file: str, blacklist_file: str,
+                 leaderboard_path: Optional[str] = None, storage=None, snapshot_path: Optional[str] = None):
         self.data_path = data_path
         self.followed_artists_path = followed_artists_path
         self.suggestions_file = suggestions_file
         self.blacklist_file = blacklist_file
-        self._data_cache = None
-        self._cache_timestamp = None
-        self._cache_ttl = 60  # 1 minute - more responsive to changes
+        # Pluggable backend (JsonStorage or SqliteStorage); defaults to the JSON files above
+        self.storage = storage or JsonStorage(data_path, followed_artists_path, suggestions_file, blacklist_file)
+        self.leaderboard_path = leaderboard_path
+        self.snapshot_path = snapshot_path
+        self._dataset = None  # ListDataset or memory-mapped Snapshot for the current data version
+        self._dataset_signature = None  # Storage signature _dataset was read at
+        self._reload_lock = threading.Lock()  # Single-flight: one reload at a time
+        self._reload_state_lock = threading.Lock()
+        self._reload_thread = None
+        # Indexed followed artists, suggestions and blacklist, re-read only when they change
+        self.registry = CollectionRegistry(self.storage)
+        self._leaderboard_cache = None
+        self._leaderboard_cache_signature = None
+        self._leaderboard_lock = threading.Lock()  # Single-flight: one first-time materialization at a time
+        self._query_engine = None
+        # Follower/popularity history by artist, re-read only when it changes
+        self._stats_index = None
+        self._stats_signature = None
+        self._stats_lock = threading.Lock()
+        # Autocomplete index over the distinct artist names, rebuilt once per data version
+        self._name_index = None
+        self._name_index_source = None
+        self._name_index_lock = threading.Lock()
     
-    def load_data(self, use_cache: bool = True) -> List[Dict[str, Any]]:
+    def _read_dataset(self, signature: Optional[List[int]]):
         """
-        Load the master data file with optional caching.
+        Read the listener history from storage into a dataset.
+        
+        With a snapshot path configured (and file locking available), the history is parsed
+        by one process per data version and written to a binary snapshot that every worker
+        memory-maps; otherwise each process keeps its own ListDataset.
         
         Args:
-            use_cache: Whether to use cached data if available
+            signature: Storage signature the dataset is read at
         
         Returns:
-            List of artist data dictionaries
+            ListDataset or Snapshot
         """
-        current_time = datetime.now()
+        if not self.snapshot_path or fcntl is None:
+            stats = {}
+            data = self.storage.read_listeners(stats)
+            if stats.get('bad_lines'):
+                logger.warning(f"Skipped {stats['bad_lines']} unreadable lines in {self.data_path}")
+            return ListDataset(data)
         
-        # Check if file exists
-        if not os.path.exists(self.data_path):
-            logger.error(f"Data file not found: {self.data_path}")
-            return []
+        current = self._dataset
+        if isinstance(current, Snapshot) and current.source_signature == signature:
+            return current
         
-        # Get file modification time
-        try:
-            file_mtime = datetime.fromtimestamp(os.path.getmtime(self.data_path))
-        except OSError as e:
-            logger.error(f"Error getting file modification time: {e}")
-            file_mtime = current_time
-        
-        # Check cache validity - invalidate if file is newer than cache
-        cache_valid = (
-            use_cache and 
-            self._data_cache is not None and 
-            self._cache_timestamp is not None and
-            (current_time - self._cache_timestamp).seconds < self._cache_ttl and
-            (self._cache_timestamp >= file_mtime)  # Cache is newer than file
-        )
-        
-        if cache_valid:
-            return self._data_cache
+        # Another worker may already have built the snapshot for this version
+        if snapshot.read_signature(self.snapshot_path) != signature:
+            with open(self.snapshot_path + '.lock', 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    if snapshot.read_signature(self.snapshot_path) != signature:
+                        stats = {}
+                        data = self.storage.read_listeners(stats)
+                        if stats.get('bad_lines'):
+                            logger.warning(f"Skipped {stats['bad_lines']} unreadable lines in {self.data_path}")
+                        rows = snapshot.write_snapshot(ListDataset(data), self.snapshot_path, signature)
+                        logger.info(f"Wrote listener snapshot with {rows} rows to {self.snapshot_path}")
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
         
-        try:
-            with open(self.data_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                
-            # Update cache
-            self._data_cache = data
-            self._cache_timestamp = current_time
+        return Snapshot(self.snapshot_path)
+    
+    def _reload(self, signature: Optional[List[int]], force: bool = False):
+        """
+        Read the dataset for a storage signature and make it current.
+        
+        Runs under the reload lock, so concurrent callers wait for (and then share) one
+        read instead of each parsing the data. If the read fails, the last good dataset
+        stays current.
+        
+        Args:
+            signature: Storage signature taken before reading
+            force: Read even if the current dataset already matches the signature
+        
+        Returns:
+            The current dataset after the reload attempt (None if nothing was ever loaded)
+        """
+        with self._reload_lock:
+            # Another thread may have finished the same reload while we waited
+            if not force and self._dataset is not None and self._dataset_signature == signature:
+                return self._dataset
+            
+            try:
+                dataset = self._read_dataset(signature)
+            except Exception as e:
+                logger.error(f"Error loading data, keeping the previous version: {e}")
+                return self._dataset
             
-            logger.info(f"Loaded {len(data)} records from data file (cache {'refreshed' if not cache_valid else 'used'})")
-            return data
+            # The signature was taken before the read, so a write that lands mid-read
+            # shows up as a new signature and triggers another reload
+            self._dataset = dataset
+            self._dataset_signature = signature
+            logger.info(f"Loaded {len(dataset)} records from data file")
+            return dataset
+    
+    def _reload_in_background(self, signature: Optional[List[int]]):
+        """Start a background reload unless one is already running."""
+        with self._reload_state_lock:
+            if self._reload_thread is not None and self._reload_thread.is_alive():
+                return
+            self._reload_thread = threading.Thread(target=self._reload, args=(signature,),
+                                                   name="data-reload", daemon=True)
+            self._reload_thread.start()
+    
+    def _get_dataset(self, use_cache: bool = True, allow_stale: bool = True):
+        """
+        Return the current listener dataset.
+        
+        The dataset is checked against the storage signature (file mtime and size, or the
+        SQLite write counter) on every call. When it has changed, the previous dataset keeps
+        being served while a single background thread reloads it (stale-while-revalidate);
+        only the very first load, or a caller passing use_cache=False or allow_stale=False,
+        waits for the read.
+        
+        Args:
+            use_cache: Whether to use cached data if available
+            allow_stale: Whether a dataset that is being reloaded may be returned
         
-        except FileNotFoundError:
+        Returns:
+            ListDataset or Snapshot (empty ListDataset if no data could be loaded)
+        """
+        # Check if data exists (the legacy JSON array is read until it has been migrated)
+        if not self.storage.exists():
             logger.error(f"Data file not found: {self.data_path}")
-            return []
-        except json.JSONDecodeError as e:
-            logger.error(f"JSON decode error in data file: {e}")
-            return []
-        except Exception as e:
-            logger.error(f"Error loading data: {e}")
-            return []
+            return self._dataset or ListDataset([])
+        
+        signature = self._data_signature()
+        current = self._dataset
+        
+        if use_cache and current is not None:
+            if signature == self._dataset_signature:
+                return current
+            if allow_stale:
+                self._reload_in_background(signature)
+                return current
+        
+        return self._reload(signature, force=not use_cache) or ListDataset([])
+    
+    def load_data(self, use_cache: bool = True) -> List[ListenerRecord]:
+        """
+        Load the master data as a list of records.
+        
+        With the shared snapshot enabled this materializes every row, so prefer the
+        per-artist, per-date and column lookups for request handling.
+        
+        Args:
+            use_cache: Whether to use cached data if available
+        
+        Returns:
+            List of read-only artist data records
+        """
+        return self._get_dataset(use_cache).records()
+    
+    def get_record_count(self, use_cache: bool = True) -> int:
+        """
+        Get the number of listener records without materializing them.
+        
+        Args:
+            use_cache: Whether to use cached data if available
+        
+        Returns:
+            Number of records
+        """
+        return len(self._get_dataset(use_cache))
     
     def clear_cache(self):
         """Clear the data cache."""
-        self._data_cache = None
-        self._cache_timestamp = None
+        self._dataset = None
+        self._dataset_signature = None
+    
+    @staticmethod
+    def normalize_date(date_str: str) -> str:
+        """
+        Normalize a stored date to YYYY-MM-DD (older rows use YYYYMMDD).
+        
+        Args:
+            date_str: Date string in either format
+        
+        Returns:
+            Date string in YYYY-MM-DD format, or the input unchanged if unrecognized
+        """
+        return normalize_date(date_str)
     
     def get_artist_id_from_url(self, url: str) -> str:
         """
@@ -95,9 +241,7 @@ class DataService:
         Returns:
             Artist ID string
         """
-        if not url:
-            return ""
-        return url.rstrip('/').split('/')[-1]
+        return artist_id_from_url(url)
     
     def slugify(self, value: str) -> str:
         """
@@ -109,12 +253,9 @@ class DataService:
         Returns:
             Slugified string
         """
-        if not value:
-            return ""
-        value = re.sub(r'[^\w\s-]', '', value).strip().lower()
-        return re.sub(r'[-\s]+', '-', value)
+        return slugify(value)
     
-    def get_artist_history(self, artist_id: str) -> List[Dict[str, Any]]:
+    def get_artist_history(self, artist_id: str) -> List[ListenerRecord]:
         """
         Get historical data for a specific artist.
         
@@ -122,10 +263,194 @@ class DataService:
             artist_id: Spotify artist ID
         
         Returns:
-            List of historical data points
+            List of read-only historical data points, oldest first
+        """
+        return self._get_dataset().artist_history(artist_id)
+    
+    def get_latest_entry(self, artist_id: str) -> Optional[ListenerRecord]:
+        """
+        Get the most recent data point for a specific artist.
+        
+        Args:
+            artist_id: Spotify artist ID
+        
+        Returns:
+            Read-only latest entry, or None if the artist has no data
         """
-        data = self.load_data()
-        return [entry for entry in data if entry.get("artist_id") == artist_id]
+        return self._get_dataset().latest(artist_id)
+    
+    def get_artist_ids_by_slug(self, slug: str) -> List[str]:
+        """
+        Get the artist IDs whose current name slugifies to slug.
+        
+        Args:
+            slug: Artist name slug
+        
+        Returns:
+            List of Spotify artist IDs
+        """
+        return self._get_dataset().artist_ids_by_slug(slug)
+    
+    def get_entries_for_date(self, date_str: str) -> List[ListenerRecord]:
+        """
+        Get every data point recorded on a given date.
+        
+        Args:
+            date_str: Date in YYYY-MM-DD or YYYYMMDD format
+        
+        Returns:
+            List of read-only entries
+        """
+        return self._get_dataset().entries_for_date(date_str)
+    
+    def get_artist_series(self, artist_id: str) -> Dict[str, Any]:
+        """
+        Get an artist's history as columnar arrays.
+        
+        Args:
+            artist_id: Spotify artist ID
+        
+        Returns:
+            Dictionary with read-only 'day' (datetime64[D]) and 'listeners' (-1 where
+            missing) NumPy arrays, oldest first
+        """
+        return self._get_dataset().series(artist_id)
+    
+    def get_artist_names(self) -> set:
+        """
+        Get every distinct artist name in the listener history.
+        
+        Returns:
+            Set of artist names
+        """
+        return self._get_dataset().artist_names()
+    
+    def get_tracked_artist_ids(self) -> List[str]:
+        """
+        Get every artist that has listener history or is followed.
+        
+        Returns:
+            List of Spotify artist IDs
+        """
+        artist_ids = list(self._get_dataset().columns()["artist_ids"])
+        artist_ids.extend(self.get_followed_artist_ids())
+        return list(dict.fromkeys(artist_id for artist_id in artist_ids if artist_id))
+    
+    def _get_artist_stats_index(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Return artist ID -> follower/popularity records (oldest first) for the current data version."""
+        signature = self.storage.artist_stats_signature()
+        with self._stats_lock:
+            if self._stats_index is None or signature != self._stats_signature:
+                index = {}
+                for record in self.storage.read_artist_stats():
+                    artist_id = record.get("artist_id")
+                    if not artist_id:
+                        continue
+                    index.setdefault(artist_id, []).append({
+                        "date": normalize_date(record.get("date")),
+                        "followers": record.get("followers"),
+                        "popularity": record.get("popularity")
+                    })
+                for rows in index.values():
+                    rows.sort(key=lambda row: row["date"])
+                self._stats_index = index
+                self._stats_signature = signature
+            return self._stats_index
+    
+    def record_artist_stats(self, stats: Dict[str, Dict[str, Any]], date: Optional[str] = None) -> int:
+        """
+        Record one day's followers and popularity for many artists.
+        
+        Records are keyed by (artist_id, date); recording the same day again replaces it.
+        
+        Args:
+            stats: Artist ID -> {'followers': ..., 'popularity': ...}
+            date: YYYY-MM-DD date (defaults to today)
+        
+        Returns:
+            Number of records written
+        """
+        date = date or datetime.now().strftime("%Y-%m-%d")
+        records = [{
+            "artist_id": artist_id,
+            "date": date,
+            "followers": values.get("followers"),
+            "popularity": values.get("popularity")
+        } for artist_id, values in stats.items() if artist_id]
+        
+        try:
+            written = self.storage.append_artist_stats(records)
+            logger.info(f"Recorded followers and popularity for {written} artists on {date}")
+            return written
+        except Exception as e:
+            logger.error(f"Error recording artist stats: {e}")
+            return 0
+    
+    def get_artist_stats(self, artist_id: str) -> List[Dict[str, Any]]:
+        """
+        Get an artist's daily followers and popularity.
+        
+        Args:
+            artist_id: Spotify artist ID
+        
+        Returns:
+            List of {'date', 'followers', 'popularity'} dictionaries, oldest first
+        """
+        try:
+            return [dict(row) for row in self._get_artist_stats_index().get(artist_id, [])]
+        except Exception as e:
+            logger.error(f"Error loading artist stats for {artist_id}: {e}")
+            return []
+    
+    def rank_artists_by_stat(self, metric: str = 'followers', days: Optional[int] = None,
+                             limit: Optional[int] = LEADERBOARD_SIZE, ascending: bool = False) -> List[Dict[str, Any]]:
+        """
+        Rank artists by their latest followers or popularity, or by its change.
+        
+        Args:
+            metric: 'followers' or 'popularity'
+            days: Rank by the change over this many days instead of the latest value
+            limit: Number of artists to return (None for all)
+            ascending: Lowest first instead of highest first
+        
+        Returns:
+            List of {'artist_id', 'artist_name', 'slug', 'date', 'value', 'change'} dictionaries
+            ('change' is None unless days is given)
+        """
+        metric = metric if metric in ARTIST_STATS else 'followers'
+        try:
+            index = self._get_artist_stats_index()
+            columns = self._get_dataset().columns()
+        except Exception as e:
+            logger.error(f"Error ranking artists by {metric}: {e}")
+            return []
+        
+        ranked = []
+        for artist_id, rows in index.items():
+            rows = [row for row in rows if row[metric] is not None]
+            if not rows:
+                continue
+            latest = rows[-1]
+            change = None
+            if days:
+                since = (datetime.strptime(latest["date"], "%Y-%m-%d") - timedelta(days=days)).strftime("%Y-%m-%d")
+                baseline = [row for row in rows if row["date"] <= since]
+                if not baseline:
+                    continue
+                change = latest[metric] - baseline[-1][metric]
+            code = columns["codes"].get(artist_id)
+            artist_name = columns["names"][code] if code is not None else None
+            ranked.append({
+                "artist_id": artist_id,
+                "artist_name": artist_name,
+                "slug": self.slugify(artist_name) if artist_name else None,
+                "date": latest["date"],
+                "value": latest[metric],
+                "change": change
+            })
+        
+        ranked.sort(key=lambda item: item["change"] if days else item["value"], reverse=not ascending)
+        return ranked if limit is None else ranked[:limit]
     
     def search_artists(self, query: str) -> List[Dict[str, Any]]:
         """
@@ -140,27 +465,23 @@ class DataService:
         if not query:
             return []
         
-        data = self.load_data()
+        dataset = self._get_dataset()
+        columns = dataset.columns()
         query_lower = query.lower()
         
-        # Find artists matching the query
-        filtered = [a.copy() for a in data if query_lower in a.get("artist_name", "").lower()]
-        
-        # Group by artist_id, keep only the most recent entry for each
-        grouped = {}
-        for entry in filtered:
-            artist_id = entry.get("artist_id")
-            if not artist_id and entry.get("artist_url"):
-                artist_id = self.get_artist_id_from_url(entry["artist_url"])
-                entry["artist_id"] = artist_id
-            
+        # Match on each artist's current name and keep its most recent entry
+        results = []
+        for artist_id, name in zip(columns["artist_ids"], columns["names"]):
+            if query_lower not in (name or "").lower():
+                continue
+            latest = dataset.latest(artist_id)
+            if not latest or latest.monthly_listeners is None:
+                continue
+            entry = latest.to_dict()
+            entry["artist_id"] = artist_id
             entry["slug"] = self.slugify(entry.get("artist_name", "artist"))
-            
-            # Keep the most recent entry for each artist_id
-            if artist_id not in grouped or entry.get("date", "") > grouped[artist_id].get("date", ""):
-                grouped[artist_id] = entry
+            results.append(entry)
         
-        results = list(grouped.values())
         results.sort(key=lambda x: x.get("artist_name", "").lower())
         
         # Calculate listener differences (simplified)
@@ -173,62 +494,94 @@ class DataService:
         
         return results
     
-    def get_leaderboard_data(self, mode: str = 'growth', tier: str = 'all', current_month: bool = True) -> Dict[str, Any]:
+    def _get_name_index(self) -> tuple:
         """
-        Generate leaderboard data.
+        Return the name index for the current data version, building it on first use.
+        
+        Returns:
+            Tuple of (NameIndex, current artist name -> artist IDs)
+        """
+        dataset = self._get_dataset()
+        with self._name_index_lock:
+            if self._name_index is None or self._name_index_source is not dataset:
+                columns = dataset.columns()
+                listeners = columns["listeners"]
+                offsets = columns["offsets"]
+                # Current names rank by the artist's latest monthly listeners; former names come last
+                weights = dict.fromkeys(dataset.artist_names(), 0)
+                artist_ids_by_name = {}
+                for code, (artist_id, name) in enumerate(zip(columns["artist_ids"], columns["names"])):
+                    if not name:
+                        continue
+                    latest = int(listeners[offsets[code + 1] - 1]) if offsets[code + 1] > offsets[code] else 0
+                    weights[name] = max(weights.get(name, 0), latest)
+                    artist_ids_by_name.setdefault(name, []).append(artist_id)
+                self._name_index = (NameIndex(weights), artist_ids_by_name)
+                self._name_index_source = dataset
+                logger.info(f"Built name index over {len(weights)} artist names")
+            return self._name_index
+    
+    def suggest_artist_names(self, term: str, limit: int = 10) -> List[str]:
+        """
+        Get ranked artist name suggestions for autocomplete.
         
         Args:
-            mode: 'growth' or 'loss'
-            tier: Artist tier filter
-            current_month: If True, only show current month data; if False, use last 30 days
+            term: Text typed so far
+            limit: Maximum number of names
         
         Returns:
-            Dictionary with leaderboard data and metadata
+            List of artist names, best match first
         """
-        data = self.load_data()
-        artist_changes = {}
+        index, _ = self._get_name_index()
+        return index.search(term, limit)
+    
+    def find_tracked_artists(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Find tracked artists by their current name for autocomplete.
         
-        # Set date range based on current_month parameter
-        if current_month:
-            # Get start and end of current month
-            now = datetime.now()
-            start_of_month = datetime(now.year, now.month, 1)
-            cutoff = start_of_month
-        else:
-            # Use traditional 30-day lookback
-            cutoff = datetime.now() - timedelta(days=30)
-        
-        # Group data by artist
-        for entry in data:
-            artist = entry["artist_name"]
-            date_str = entry["date"]
-            
-            try:
-                if '-' in date_str:
-                    date = datetime.strptime(date_str, "%Y-%m-%d")
-                else:
-                    date = datetime.strptime(date_str, "%Y%m%d")
-            except Exception:
-                continue
-            
-            listeners = entry["monthly_listeners"]
-            if artist not in artist_changes:
-                artist_changes[artist] = []
-            
-            artist_changes[artist].append({
-                "date": date,
-                "listeners": listeners,
-                "artist_url": entry.get("artist_url", ""),
-                "artist_id": entry.get("artist_id"),
-                "slug": self.slugify(artist)
-            })
+        Ranked like suggest_artist_names: exact name, name prefix, word prefix, substring,
+        then misspellings; ties go to more monthly listeners.
+        
+        Args:
+            query: Search query (case and whitespace are ignored)
+            limit: Maximum number of results
+        
+        Returns:
+            List of {'artist_id', 'artist_name', 'url', 'monthly_listeners'} dictionaries
+        """
+        index, artist_ids_by_name = self._get_name_index()
+        dataset = self._get_dataset()
+        columns = dataset.columns()
+        results = []
+        # Former names have no current artist, so don't stop at the limit
+        for name in index.search(query, None):
+            for artist_id in artist_ids_by_name.get(name, []):
+                latest = dataset.latest(artist_id)
+                code = columns["codes"].get(artist_id)
+                results.append({
+                    "artist_id": artist_id,
+                    "artist_name": name,
+                    "url": (columns["urls"][code] if code is not None else None)
+                    or f"https://open.spotify.com/artist/{artist_id}",
+                    "monthly_listeners": (latest.monthly_listeners if latest else None) or 0
+                })
+                if len(results) >= limit:
+                    return results
+        return results
+    
+    def _leaderboard_window(self, window: str, now: datetime) -> tuple[str, Optional[datetime], Optional[datetime]]:
+        """
+        Resolve a leaderboard window to its cutoff date and display dates.
         
-        leaderboard_data = []
+        Args:
+            window: 'month' for the current month, '30d' for the last 30 days
+            now: Reference time
         
-        # Set the display dates based on current_month parameter
-        if current_month:
-            # For current month display, show the month name
-            now = datetime.now()
+        Returns:
+            Tuple of (cutoff as YYYY-MM-DD, start_date, end_date)
+        """
+        if window == 'month':
+            # Get start and end of current month
             start_date = datetime(now.year, now.month, 1)
             # End date is current date or last day of month if we're past it
             if now.month == 12:
@@ -236,96 +589,307 @@ class DataService:
             else:
                 next_month = datetime(now.year, now.month + 1, 1)
             end_date = min(now, next_month - timedelta(days=1))
-        else:
-            start_date = None
-            end_date = None
+            return start_date.strftime("%Y-%m-%d"), start_date, end_date
         
-        for artist, records in artist_changes.items():
-            recent = [r for r in records if r["date"] >= cutoff]
-            if len(recent) < 2:
-                continue
-            
-            recent.sort(key=lambda x: x["date"])
-            
-            start = recent[0]["listeners"]
-            end = recent[-1]["listeners"]
-            
-            if start == 0 or (start < 50 and end < 50):
-                continue
+        # Use traditional 30-day lookback
+        cutoff = now - timedelta(days=30)
+        return cutoff.strftime("%Y-%m-%d"), None, None
+    
+    @staticmethod
+    def _in_tier(start: int, end: int, tier: str) -> bool:
+        """Check whether a start/end listener pair falls in a leaderboard tier."""
+        if tier not in TIER_RANGES:
+            return True
+        low, high = TIER_RANGES[tier]
+        return all(value >= low and (high is None or value <= high) for value in (start, end))
+    
+    def compute_leaderboards(self, now: Optional[datetime] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Compute every window x mode x tier leaderboard in one pass over the per-artist rows.
+        
+        Args:
+            now: Reference time (defaults to the current time)
+        
+        Returns:
+            Dictionary keyed by "window:mode:tier" with leaderboard rows and ISO display dates
+        """
+        now = now or datetime.now()
+        # Leaderboards are materialized right after a scrape, so wait for the new data
+        grouped_rows = list(self._get_dataset(allow_stale=False).grouped_rows())
+        leaderboards = {}
+        
+        for window in LEADERBOARD_WINDOWS:
+            cutoff, start_date, end_date = self._leaderboard_window(window, now)
+            window_rows = []
             
-            change = end - start
-            percent_change = ((end - start) / start) * 100
+            for artist_id, records in grouped_rows:
+                # Rows are already sorted by normalized date, so no parsing is needed
+                recent = [r for r in records
+                          if self.normalize_date(r.get("date")) >= cutoff and r.get("monthly_listeners") is not None]
+                if len(recent) < 2:
+                    continue
+                
+                start = recent[0]["monthly_listeners"]
+                end = recent[-1]["monthly_listeners"]
+                
+                if start == 0 or (start < 50 and end < 50):
+                    continue
+                
+                artist = recent[-1].get("artist_name", "")
+                window_rows.append({
+                    "artist": artist,
+                    "artist_id": artist_id,
+                    "slug": self.slugify(artist),
+                    "change": end - start,
+                    "percent_change": ((end - start) / start) * 100,
+                    "start": start,
+                    "end": end,
+                    "artist_url": recent[-1].get("artist_url") or recent[-1].get("url")
+                })
             
-            # Get artist metadata
-            artist_id = None
-            artist_url = None
-            slug = None
-            for r in reversed(recent):
-                if r and r.get("artist_id"):
-                    artist_id = r["artist_id"]
-                    artist_url = r.get("artist_url")
-                    slug = r.get("slug")
-                    break
+            for mode in LEADERBOARD_MODES:
+                ordered = sorted(window_rows, key=lambda x: x['percent_change'], reverse=(mode != 'loss'))
+                for tier in LEADERBOARD_TIERS:
+                    rows = [row for row in ordered if self._in_tier(row['start'], row['end'], tier)]
+                    leaderboards[f"{window}:{mode}:{tier}"] = {
+                        'leaderboard': [row.copy() for row in rows[:LEADERBOARD_SIZE]],
+                        'start_date': start_date.isoformat() if start_date else None,
+                        'end_date': end_date.isoformat() if end_date else None
+                    }
+        
+        return leaderboards
+    
+    def _data_signature(self) -> Optional[List[int]]:
+        """Return the storage change token, used to detect new scrape results."""
+        try:
+            return self.storage.signature()
+        except Exception as e:
+            logger.error(f"Error reading data signature: {e}")
+            return None
+    
+    def materialize_leaderboards(self, image_resolver: Optional[Callable[[str], Optional[str]]] = None,
+                                 image_prefetcher: Optional[Callable[[List[str]], Any]] = None) -> Dict[str, Any]:
+        """
+        Precompute all leaderboards and persist them next to the master data.
+        Called whenever new scrape results land so page views only read the result.
+        
+        Args:
+            image_resolver: Optional callable mapping an artist ID to its image URL,
+                used to store image URLs for the top rows
+            image_prefetcher: Optional callable given every top-row artist ID up front,
+                so the resolver can be served from one batched lookup
+        
+        Returns:
+            The persisted leaderboard payload
+        """
+        signature = self._data_signature()
+        now = datetime.now()
+        leaderboards = self.compute_leaderboards(now)
+        
+        # Artists still in the top rows keep their image URL when it can't be resolved now
+        previous = self._load_materialized_leaderboards()
+        previous_image_urls = {
+            row["artist_id"]: row["image_url"]
+            for board in (previous or {}).get('leaderboards', {}).values()
+            for row in board['leaderboard'] if row.get("artist_id") and row.get("image_url")
+        }
+        
+        if image_resolver:
+            if image_prefetcher:
+                artist_ids = {row.get("artist_id") for board in leaderboards.values() for row in board['leaderboard']}
+                try:
+                    image_prefetcher(sorted(artist_id for artist_id in artist_ids if artist_id))
+                except Exception as e:
+                    logger.warning(f"Could not prefetch artist images: {e}")
             
-            leaderboard_data.append({
-                "artist": artist,
-                "artist_id": artist_id,
-                "slug": slug,
-                "change": change,
-                "percent_change": percent_change,
-                "start": start,
-                "end": end,
-                "artist_url": artist_url
-            })
+            image_urls = {}
+            for board in leaderboards.values():
+                for row in board['leaderboard']:
+                    artist_id = row.get("artist_id")
+                    if artist_id and artist_id not in image_urls:
+                        try:
+                            image_urls[artist_id] = image_resolver(artist_id)
+                        except Exception as e:
+                            logger.warning(f"Could not resolve image for {artist_id}: {e}")
+                            image_urls[artist_id] = None
+                    row["image_url"] = image_urls.get(artist_id)
         
-        # Filter by tier
-        def in_tier(start, end, tier):
-            if tier == 'micro':
-                return start <= 1000 and end <= 1000
-            elif tier == 'small':
-                return 1001 <= start <= 3000 and 1001 <= end <= 3000
-            elif tier == 'medium':
-                return 3001 <= start <= 15000 and 3001 <= end <= 15000
-            elif tier == 'large':
-                return 15001 <= start <= 50000 and 15001 <= end <= 50000
-            elif tier == 'major':
-                return start > 50000 and end > 50000
-            return True
+        for board in leaderboards.values():
+            for row in board['leaderboard']:
+                if not row.get("image_url"):
+                    row["image_url"] = previous_image_urls.get(row.get("artist_id"))
         
-        leaderboard_data = [row for row in leaderboard_data if in_tier(row['start'], row['end'], tier)]
+        payload = {
+            'source_signature': signature,
+            'as_of': now.strftime("%Y-%m-%d"),
+            'generated_at': now.isoformat(),
+            'leaderboards': leaderboards
+        }
         
-        # Sort by mode
-        if mode == 'loss':
-            leaderboard_data.sort(key=lambda x: x['percent_change'])
-        else:
-            leaderboard_data.sort(key=lambda x: x['percent_change'], reverse=True)
+        if self.leaderboard_path:
+            try:
+                atomic_write_json(self.leaderboard_path, payload)
+                logger.info(f"Materialized {len(leaderboards)} leaderboards to {self.leaderboard_path}")
+            except Exception as e:
+                logger.error(f"Error saving materialized leaderboards: {e}")
         
-        # Take top 10
-        leaderboard_data = leaderboard_data[:10]
+        self._leaderboard_cache = payload
+        self._leaderboard_cache_signature = self._leaderboard_file_signature()
+        return payload
+    
+    def _leaderboard_file_signature(self) -> Optional[tuple]:
+        """Return (mtime_ns, size) of the materialized leaderboards file."""
+        if not self.leaderboard_path:
+            return None
+        try:
+            stat = os.stat(self.leaderboard_path)
+            return (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return None
+    
+    def _load_materialized_leaderboards(self) -> Optional[Dict[str, Any]]:
+        """
+        Return the persisted leaderboards, re-reading the file only when another
+        process has replaced it. Returns None if nothing has been materialized yet.
+        """
+        file_signature = self._leaderboard_file_signature()
+        if file_signature is not None and file_signature != self._leaderboard_cache_signature:
+            try:
+                with open(self.leaderboard_path, 'r', encoding='utf-8') as f:
+                    self._leaderboard_cache = json.load(f)
+                self._leaderboard_cache_signature = file_signature
+            except Exception as e:
+                logger.error(f"Error loading materialized leaderboards: {e}")
+                self._leaderboard_cache = None
+        
+        return self._leaderboard_cache
+    
+    def get_leaderboard_data(self, mode: str = 'growth', tier: str = 'all', current_month: bool = True) -> Dict[str, Any]:
+        """
+        Get leaderboard data from the materialized leaderboards.
+        
+        The last materialized leaderboards are served even once newer data lands;
+        the post-scrape hook replaces them. They are computed here (once, without
+        image URLs) only if nothing has been materialized yet.
+        
+        Args:
+            mode: 'growth' or 'loss', or 'followers' or 'popularity' to rank by the latest
+                recorded figure (computed from the follower/popularity history; tier is ignored)
+            tier: Artist tier filter
+            current_month: If True, only show current month data; if False, use last 30 days
+        
+        Returns:
+            Dictionary with leaderboard data and metadata
+        """
+        if mode in ARTIST_STATS:
+            rows = self.rank_artists_by_stat(mode)
+            for row in rows:
+                row["artist"] = row["artist_name"] or row["artist_id"]
+            return {'leaderboard': rows, 'start_date': None, 'end_date': None, 'mode': mode, 'tier': 'all'}
+        
+        def needs_materializing(payload):
+            # Without a shared file there is no post-scrape result to wait for
+            return payload is None or (not self.leaderboard_path and
+                                       payload.get('source_signature') != self._data_signature())
+        
+        payload = self._load_materialized_leaderboards()
+        if needs_materializing(payload):
+            with self._leaderboard_lock:
+                payload = self._load_materialized_leaderboards()
+                if needs_materializing(payload):
+                    payload = self.materialize_leaderboards()
+        
+        mode = mode if mode in LEADERBOARD_MODES else 'growth'
+        window = 'month' if current_month else '30d'
+        board = payload['leaderboards'].get(f"{window}:{mode}:{tier}")
+        if board is None:
+            board = payload['leaderboards'][f"{window}:{mode}:all"]
         
         return {
-            'leaderboard': leaderboard_data,
-            'start_date': start_date,
-            'end_date': end_date,
+            'leaderboard': [row.copy() for row in board['leaderboard']],
+            'start_date': datetime.fromisoformat(board['start_date']) if board['start_date'] else None,
+            'end_date': datetime.fromisoformat(board['end_date']) if board['end_date'] else None,
             'mode': mode,
             'tier': tier
         }
     
-    def load_suggestions(self) -> List[Dict[str, Any]]:
-        """Load artist suggestions from file."""
-        if not os.path.exists(self.suggestions_file):
-            return []
+    def query_leaderboard(self, **params) -> Dict[str, Any]:
+        """
+        Run an ad-hoc leaderboard query (any window, tier, source or date_added cohort).
+        See LeaderboardQueryEngine.query() for the parameters.
+        
+        A sort of 'followers' or 'popularity' ranks the follower/popularity history instead
+        (see query_stat_leaderboard()); 'days' only applies to those sorts.
+        
+        Returns:
+            Dictionary with a page of results and pagination metadata
+        
+        Raises:
+            ValueError: If a parameter is invalid
+        """
+        days = params.pop('days', None)
+        if params.get('sort') in ARTIST_STATS:
+            return self.query_stat_leaderboard(**params, days=days)
+        if days is not None:
+            raise ValueError("days only applies to the followers and popularity sorts")
+        if self._query_engine is None:
+            self._query_engine = LeaderboardQueryEngine(self)
+        return self._query_engine.query(**params)
+    
+    def query_stat_leaderboard(self, sort: str = 'followers', days: Optional[int] = None, order: str = 'desc',
+                               page: int = 1, per_page: int = 25, tier: str = 'all', source=None,
+                               added_from: Optional[str] = None, added_to: Optional[str] = None,
+                               window: Optional[str] = None, start: Optional[str] = None,
+                               end: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Rank artists by followers or popularity, or by its change over a number of days.
         
+        Args:
+            sort: 'followers' or 'popularity'
+            days: Rank by the change over this many days instead of the latest figure
+            order: 'desc' (highest first) or 'asc'
+            page: 1-based page number
+            per_page: Rows per page (capped at MAX_PER_PAGE)
+            tier, source, added_from, added_to: Not supported for these sorts; must be left unset
+            window, start, end: Listener window parameters, ignored (days sets the window)
+        
+        Returns:
+            Dictionary with the page of results and pagination metadata
+        
+        Raises:
+            ValueError: If a parameter is invalid
+        """
+        if sort not in ARTIST_STATS:
+            raise ValueError(f"Unknown sort key: {sort}")
+        if order not in ('asc', 'desc'):
+            raise ValueError(f"Unknown order: {order}")
+        if days is not None and days < 1:
+            raise ValueError("days must be a positive number of days")
+        if tier != 'all' or source or added_from or added_to:
+            raise ValueError(f"Tier, source and date_added filters don't apply to the {sort} sort")
+        page = max(1, int(page))
+        per_page = min(max(1, int(per_page)), MAX_PER_PAGE)
+        
+        ranked = self.rank_artists_by_stat(sort, days=days, limit=None, ascending=order == 'asc')
+        results = [{'rank': rank, **row}
+                   for rank, row in enumerate(ranked[(page - 1) * per_page: page * per_page],
+                                              start=(page - 1) * per_page + 1)]
+        return {
+            'results': results, 'total': len(ranked), 'page': page, 'per_page': per_page,
+            'pages': -(-len(ranked) // per_page), 'sort': sort, 'order': order, 'days': days
+        }
+    
+    def load_suggestions(self) -> List[Dict[str, Any]]:
+        """Load artist suggestions from storage."""
         try:
-            with open(self.suggestions_file, "r", encoding="utf-8") as f:
-                return json.load(f)
+            return self.registry.load('suggestions')
         except Exception as e:
             logger.error(f"Error loading suggestions: {e}")
             return []
     
     def save_suggestions(self, suggestions: List[Dict[str, Any]]) -> bool:
         """
-        Save suggestions to file.
+        Save suggestions to storage.
         
         Args:
             suggestions: List of suggestion dictionaries
@@ -334,8 +898,7 @@ class DataService:
             True if successful, False otherwise
         """
         try:
-            with open(self.suggestions_file, "w", encoding="utf-8") as f:
-                json.dump(suggestions, f, indent=2, ensure_ascii=False)
+            self.registry.save('suggestions', suggestions)
             return True
         except Exception as e:
             logger.error(f"Error saving suggestions: {e}")
@@ -348,35 +911,16 @@ class DataService:
         Returns:
             Tuple of (blacklisted_names, blacklisted_ids)
         """
-        blacklisted_artists = []
-        blacklisted_ids = []
-        
-        if not os.path.exists(self.blacklist_file):
-            return blacklisted_artists, blacklisted_ids
-        
         try:
-            with open(self.blacklist_file, "r", encoding="utf-8") as f:
-                blacklist_data = json.load(f)
-                
-                for item in blacklist_data:
-                    if isinstance(item, str):
-                        # Old format - just artist name
-                        blacklisted_artists.append(item.lower())
-                    elif isinstance(item, dict):
-                        # New format - object with name, spotify_id, etc.
-                        if item.get("name"):
-                            blacklisted_artists.append(item["name"].lower())
-                        if item.get("spotify_id"):
-                            blacklisted_ids.append(item["spotify_id"])
-        
+            # Entries are either bare names (old format) or objects with name, spotify_id, etc.
+            return self.registry.keys('blacklist')
         except Exception as e:
             logger.error(f"Error loading blacklist: {e}")
-        
-        return blacklisted_artists, blacklisted_ids
+            return [], []
     
     def save_blacklist(self, blacklist_data: List[Dict[str, Any]]) -> bool:
         """
-        Save blacklist data to file.
+        Save blacklist data to storage.
         
         Args:
             blacklist_data: List of blacklist entries
@@ -385,8 +929,7 @@ class DataService:
             bool: True if successful, False otherwise
         """
         try:
-            with open(self.blacklist_file, "w", encoding="utf-8") as f:
-                json.dump(blacklist_data, f, indent=2, ensure_ascii=False)
+            self.registry.save('blacklist', blacklist_data)
             logger.info(f"Saved {len(blacklist_data)} blacklist entries")
             return True
         except Exception as e:
@@ -401,12 +944,8 @@ class DataService:
             List of blacklist entries with full details
         """
         try:
-            if not os.path.exists(self.blacklist_file):
-                return []
+            blacklist_data = self.registry.load('blacklist')
             
-            with open(self.blacklist_file, "r", encoding="utf-8") as f:
-                blacklist_data = json.load(f)
-                
             # Ensure all entries have required fields
             formatted_data = []
             for item in blacklist_data:
@@ -434,20 +973,24 @@ class DataService:
             return []
     
     def load_followed_artists(self) -> List[Dict[str, Any]]:
-        """Load followed artists from file."""
-        if not os.path.exists(self.followed_artists_path):
-            return []
-        
+        """Load followed artists from storage."""
         try:
-            with open(self.followed_artists_path, "r", encoding="utf-8") as f:
-                return json.load(f)
+            return self.registry.load('followed_artists')
         except Exception as e:
             logger.error(f"Error loading followed artists: {e}")
             return []
     
+    def get_followed_artist_ids(self) -> List[str]:
+        """Return the Spotify IDs of every followed artist (from the indexed registry)."""
+        try:
+            return self.registry.keys('followed_artists')[1]
+        except Exception as e:
+            logger.error(f"Error loading followed artist IDs: {e}")
+            return []
+    
     def save_followed_artists(self, artists: List[Dict[str, Any]]) -> bool:
         """
-        Save followed artists to file.
+        Save followed artists to storage.
         
         Args:
             artists: List of artist dictionaries
@@ -456,8 +999,7 @@ class DataService:
             True if successful, False otherwise
         """
         try:
-            with open(self.followed_artists_path, "w", encoding="utf-8") as f:
-                json.dump(artists, f, indent=2, ensure_ascii=False)
+            self.registry.save('followed_artists', artists)
             return True
         except Exception as e:
             logger.error(f"Error saving followed artists: {e}")
@@ -474,22 +1016,11 @@ class DataService:
         Returns:
             True if artist is followed, False otherwise
         """
-        followed_artists = self.load_followed_artists()
-        
-        for followed in followed_artists:
-            followed_name = followed.get("artist_name", "").lower()
-            followed_id = followed.get("artist_id", "")
-            followed_url = followed.get("url", "")
-            
-            # Extract ID from URL if not directly available
-            if not followed_id and followed_url:
-                followed_id = self.get_artist_id_from_url(followed_url)
-            
-            if (artist_name.lower() == followed_name or 
-                (spotify_id and followed_id and spotify_id == followed_id)):
-                return True
-        
-        return False
+        try:
+            return self.registry.contains('followed_artists', artist_name, spotify_id)
+        except Exception as e:
+            logger.error(f"Error checking followed artists: {e}")
+            return False
     
     def is_artist_suggested(self, artist_name: str, spotify_id: str = None) -> bool:
         """
@@ -502,11 +1033,25 @@ class DataService:
         Returns:
             True if artist is already suggested, False otherwise
         """
-        suggestions = self.load_suggestions()
+        try:
+            return self.registry.contains('suggestions', artist_name, spotify_id)
+        except Exception as e:
+            logger.error(f"Error checking suggestions: {e}")
+            return False
+    
+    def is_artist_blacklisted(self, artist_name: str, spotify_id: str = None) -> bool:
+        """
+        Check if an artist is on the blacklist.
         
-        for suggestion in suggestions:
-            if (suggestion.get("artist_name", "").lower() == artist_name.lower() or 
-                (spotify_id and suggestion.get("spotify_id") == spotify_id)):
-                return True
+        Args:
+            artist_name: Artist name
+            spotify_id: Spotify artist ID (optional)
         
-        return False
+        Returns:
+            True if artist is blacklisted, False otherwise
+        """
+        try:
+            return self.registry.contains('blacklist', artist_name, spotify_id)
+        except Exception as e:
+            logger.error(f"Error checking blacklist: {e}")
+            return False
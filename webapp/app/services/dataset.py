@@ -0,0 +1,296 @@
+"""
+In-memory listener dataset with per-artist, per-slug and per-date lookups.
+
+A ListDataset is built from the records read from storage once per data version.
+snapshot.Snapshot offers the same interface over a memory-mapped file shared by all
+gunicorn workers, so DataService can use either interchangeably.
+
+Rows are held as read-only ListenerRecord objects with interned strings, so the cached
+history can be handed to routes and templates without copying.
+"""
+
+import re
+import sys
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+# Day numbers in the column arrays count from 1970-01-01 (numpy's datetime64[D] epoch)
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def normalize_date(date_str: str) -> str:
+    """
+    Normalize a stored date to YYYY-MM-DD (older rows use YYYYMMDD).
+
+    Args:
+        date_str: Date string in either format
+
+    Returns:
+        Date string in YYYY-MM-DD format, or the input unchanged if unrecognized
+    """
+    if isinstance(date_str, str) and len(date_str) == 8 and date_str.isdigit():
+        return f"{date_str[:4]}-{date_str[4:6]}-{date_str[6:]}"
+    return date_str or ""
+
+
+def day_number(date_str: str) -> Optional[int]:
+    """
+    Convert a stored date to days since 1970-01-01, or None if it can't be parsed.
+    """
+    try:
+        return date.fromisoformat(normalize_date(date_str)).toordinal() - EPOCH_ORDINAL
+    except (TypeError, ValueError):
+        return None
+
+
+def day_string(day: int) -> str:
+    """
+    Convert days since 1970-01-01 back to a YYYY-MM-DD string.
+    """
+    return date.fromordinal(int(day) + EPOCH_ORDINAL).isoformat()
+
+
+def artist_id_from_url(url: str) -> str:
+    """
+    Extract artist ID from Spotify URL.
+    """
+    if not url:
+        return ""
+    return url.rstrip('/').split('/')[-1]
+
+
+def slugify(value: str) -> str:
+    """
+    Convert a string to a URL-friendly slug.
+    """
+    if not value:
+        return ""
+    value = re.sub(r'[^\w\s-]', '', value).strip().lower()
+    return re.sub(r'[-\s]+', '-', value)
+
+
+def record_artist_id(record: Dict[str, Any]) -> str:
+    """
+    Return a record's artist ID, falling back to the ID in its artist URL.
+    """
+    return record.get("artist_id") or artist_id_from_url(record.get("url") or record.get("artist_url", ""))
+
+
+_MISSING = object()
+
+
+def _intern(value: Any) -> Any:
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _read_only(array: np.ndarray) -> np.ndarray:
+    array.flags.writeable = False
+    return array
+
+
+class ListenerRecord:
+    """
+    Read-only listener row.
+
+    Uses __slots__ and interned strings instead of a dict per row, and can be read like
+    the stored dict (record["date"], record.get("url")) or by attribute (record.date).
+    Fields that are None are treated as missing keys.
+    """
+
+    __slots__ = ('url', 'artist_name', 'monthly_listeners', 'date', 'artist_id', '_extra')
+
+    FIELDS = ('url', 'artist_name', 'monthly_listeners', 'date', 'artist_id')
+
+    def __init__(self, url: Optional[str], artist_name: Optional[str], monthly_listeners: Optional[int],
+                 date: Optional[str], artist_id: Optional[str], extra: tuple = ()):
+        init = object.__setattr__
+        init(self, 'url', _intern(url))
+        init(self, 'artist_name', _intern(artist_name))
+        init(self, 'monthly_listeners', monthly_listeners)
+        init(self, 'date', _intern(date))
+        init(self, 'artist_id', _intern(artist_id))
+        init(self, '_extra', extra)  # Any other stored fields, as (key, value) pairs
+
+    @classmethod
+    def from_dict(cls, record: Dict[str, Any]) -> 'ListenerRecord':
+        """Build a record from a stored dict."""
+        extra = tuple((key, value) for key, value in record.items() if key not in cls.FIELDS)
+        return cls(record.get('url'), record.get('artist_name'), record.get('monthly_listeners'),
+                   record.get('date'), record.get('artist_id'), extra)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ListenerRecord is read-only")
+
+    def __delattr__(self, name):
+        raise AttributeError("ListenerRecord is read-only")
+
+    def items(self) -> Iterable[tuple]:
+        """Yield (key, value) pairs for the fields that are set."""
+        for key in self.FIELDS:
+            value = getattr(self, key)
+            if value is not None:
+                yield key, value
+        yield from self._extra
+
+    def keys(self) -> List[str]:
+        return [key for key, _ in self.items()]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in self.FIELDS:
+            value = getattr(self, key)
+            return default if value is None else value
+        for extra_key, value in self._extra:
+            if extra_key == key:
+                return value
+        return default
+
+    def __getitem__(self, key: str) -> Any:
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return a mutable dict copy of the record."""
+        return dict(self.items())
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (ListenerRecord, dict)):
+            return self.to_dict() == dict(other.items())
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"ListenerRecord({self.to_dict()!r})"
+
+
+class ListDataset:
+    """Listener records held as a Python list, indexed per artist, slug and date."""
+
+    def __init__(self, records: List[Dict[str, Any]]):
+        self._records = [ListenerRecord.from_dict(record) for record in records]
+        self._columns = None
+
+        by_artist = {}
+        by_date = {}
+        for entry in self._records:
+            artist_id = record_artist_id(entry)
+            if artist_id:
+                by_artist.setdefault(artist_id, []).append(entry)
+            by_date.setdefault(normalize_date(entry.date), []).append(entry)
+
+        latest_by_artist = {}
+        artist_ids_by_slug = {}
+        for artist_id, rows in by_artist.items():
+            rows.sort(key=lambda row: normalize_date(row.date))
+            latest = rows[-1]
+            latest_by_artist[artist_id] = latest
+            artist_ids_by_slug.setdefault(slugify(latest.artist_name or "artist"), []).append(artist_id)
+
+        self._by_artist = by_artist
+        self._by_date = by_date
+        self._latest_by_artist = latest_by_artist
+        self._artist_ids_by_slug = artist_ids_by_slug
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def records(self) -> List[ListenerRecord]:
+        """Return all records in storage order."""
+        return self._records
+
+    def grouped_rows(self) -> Iterable[tuple]:
+        """Yield (artist_id, rows oldest first) for every artist."""
+        return self._by_artist.items()
+
+    def artist_history(self, artist_id: str) -> List[ListenerRecord]:
+        """Return an artist's rows, oldest first."""
+        return list(self._by_artist.get(artist_id, []))
+
+    def latest(self, artist_id: str) -> Optional[ListenerRecord]:
+        """Return an artist's most recent row, or None."""
+        return self._latest_by_artist.get(artist_id)
+
+    def artist_ids_by_slug(self, slug: str) -> List[str]:
+        """Return the artist IDs whose current name slugifies to slug."""
+        return list(self._artist_ids_by_slug.get(slug, []))
+
+    def entries_for_date(self, date_str: str) -> List[ListenerRecord]:
+        """Return every row recorded on a date."""
+        return list(self._by_date.get(normalize_date(date_str), []))
+
+    def artist_names(self) -> set:
+        """Return every distinct artist name in the history."""
+        return {entry.artist_name for entry in self._records if entry.artist_name}
+
+    def series(self, artist_id: str) -> Dict[str, np.ndarray]:
+        """
+        Return an artist's history as read-only column slices.
+
+        Returns:
+            Dictionary with 'day' (datetime64[D]) and 'listeners' (-1 where missing) arrays,
+            oldest first; both are empty for an unknown artist
+        """
+        return column_series(self.columns(), artist_id)
+
+    def columns(self) -> Dict[str, Any]:
+        """
+        Return the history as column arrays sorted by (artist, day).
+
+        Returns:
+            Dictionary with per-row 'artist' codes, 'day' (datetime64[D]) and 'listeners'
+            (-1 where a row has no listener count) read-only arrays, plus per-artist
+            'artist_ids', 'names' (latest) and 'urls' lists and 'offsets' (artist code i
+            owns rows offsets[i]:offsets[i + 1])
+        """
+        if self._columns is None:
+            artist_codes = []
+            days = []
+            listeners = []
+            artist_ids = []
+            names = []
+            urls = []
+            offsets = [0]
+            for code, (artist_id, rows) in enumerate(self._by_artist.items()):
+                artist_ids.append(artist_id)
+                names.append(rows[-1].artist_name or "")
+                urls.append(rows[-1].get("artist_url") or rows[-1].url)
+                for row in rows:
+                    day = day_number(row.date)
+                    if day is None:
+                        continue
+                    artist_codes.append(code)
+                    days.append(day)
+                    value = row.monthly_listeners
+                    listeners.append(-1 if value is None else value)
+                offsets.append(len(artist_codes))
+
+            self._columns = {
+                "artist": _read_only(np.asarray(artist_codes, dtype=np.int32)),
+                "day": _read_only(np.asarray(days, dtype=np.int64).astype("datetime64[D]")),
+                "listeners": _read_only(np.asarray(listeners, dtype=np.int64)),
+                "artist_ids": artist_ids,
+                "names": names,
+                "urls": urls,
+                "offsets": offsets,
+                "codes": {artist_id: code for code, artist_id in enumerate(artist_ids)}
+            }
+        return self._columns
+
+
+def column_series(columns: Dict[str, Any], artist_id: str) -> Dict[str, np.ndarray]:
+    """
+    Slice one artist's 'day' and 'listeners' arrays out of a dataset's columns.
+    """
+    code = columns["codes"].get(artist_id)
+    if code is None:
+        start = end = 0
+    else:
+        start, end = columns["offsets"][code], columns["offsets"][code + 1]
+    return {"day": columns["day"][start:end], "listeners": columns["listeners"][start:end]}
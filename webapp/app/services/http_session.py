@@ -0,0 +1,72 @@
+"""
+Pooled HTTP session for Spotify API calls.
+
+One requests.Session per process keeps TLS connections to the Spotify API alive between
+requests, and its adapter retries connection errors and 5xx responses a bounded number
+of times with exponential backoff, honouring (but capping) Retry-After. 429s are handed
+straight back: the caller's circuit breaker opens for the Retry-After period instead of
+a request thread sleeping through it inside the session. Every
+request made through it should also pass a (connect, read) timeout so a slow response
+can never hold a gunicorn thread until the worker timeout kills it.
+"""
+
+import logging
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = (3.05, 10)  # (connect, read) seconds
+DEFAULT_RETRIES = 2
+DEFAULT_BACKOFF = 0.5
+MAX_RETRY_AFTER = 5  # Longest Retry-After (seconds) we are willing to sleep inside a request
+RETRY_STATUSES = (500, 502, 503, 504)  # Not 429, see above
+POOL_SIZE = 10  # Connections kept per host; gunicorn runs a few threads per worker
+
+
+class BoundedRetry(Retry):
+    """Retry policy that honours Retry-After but never sleeps longer than MAX_RETRY_AFTER."""
+
+    # urllib3 otherwise retries any 429 that carries Retry-After, whatever status_forcelist says
+    RETRY_AFTER_STATUS_CODES = frozenset(Retry.RETRY_AFTER_STATUS_CODES) - {429}
+
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        if retry_after > MAX_RETRY_AFTER:
+            logger.warning(f"Spotify asked to retry after {retry_after:.0f}s; waiting {MAX_RETRY_AFTER}s instead")
+        return min(retry_after, MAX_RETRY_AFTER)
+
+
+def create_session(retries: int = DEFAULT_RETRIES, backoff_factor: float = DEFAULT_BACKOFF,
+                   pool_size: int = POOL_SIZE) -> requests.Session:
+    """
+    Create a keep-alive session with a bounded retry policy.
+
+    Args:
+        retries: Retries per request for connection errors and 5xx responses
+        backoff_factor: Exponential backoff factor between retries
+        pool_size: Connections kept open per host
+
+    Returns:
+        requests.Session
+    """
+    retry = BoundedRetry(
+        total=retries,
+        connect=retries,
+        read=retries,
+        status=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=None,  # Spotify's GET/PUT/DELETE calls and the token POST are all safe to repeat
+        respect_retry_after_header=True,
+        raise_on_status=False  # Hand the last response back so callers see the real status
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
@@ -0,0 +1,167 @@
+"""
+Per-job scraping logs.
+
+A scrape's output is streamed to disk as it arrives instead of being collected in memory
+and stored in the job status. Each job's log is split into segments named after the byte
+offset they start at ("<job_id>.<offset>.log"). A new segment starts once the current
+one passes a size limit, and only the newest segments are kept, so a runaway job can't
+fill the disk. Offsets stay stable across rotation, so clients can page through the log
+with the offset of the next byte they want.
+"""
+
+import glob
+import os
+import logging
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_BYTES = 1024 * 1024  # Start a new segment past this size
+MAX_SEGMENTS = 8  # Segments kept per job (older ones are deleted)
+DEFAULT_PAGE_BYTES = 64 * 1024
+
+
+def _segment_path(log_dir: str, job_id: str, start: int) -> str:
+    return os.path.join(log_dir, f"{job_id}.{start:012d}.log")
+
+
+def _segments(log_dir: str, job_id: str) -> List[Tuple[int, str]]:
+    """Return (start offset, path) of a job's log segments, oldest first."""
+    segments = []
+    for path in glob.glob(os.path.join(glob.escape(log_dir), f"{glob.escape(job_id)}.*.log")):
+        try:
+            segments.append((int(os.path.basename(path)[len(job_id) + 1:-len('.log')]), path))
+        except ValueError:
+            continue
+    return sorted(segments)
+
+
+class JobLogWriter:
+    """Appends a job's output lines to its rotating log segments."""
+
+    def __init__(self, log_dir: str, job_id: str, segment_bytes: int = SEGMENT_BYTES,
+                 max_segments: int = MAX_SEGMENTS):
+        self.log_dir = log_dir
+        self.job_id = job_id
+        self.segment_bytes = segment_bytes
+        self.max_segments = max_segments
+        self.size = 0  # Total bytes written, i.e. the offset of the next byte
+        self.lines = 0
+        self._segment_start = 0
+        self._file = None
+        os.makedirs(log_dir, exist_ok=True)
+
+    def write(self, line: str):
+        """Append one line (without its newline) to the log."""
+        data = (line + '\n').encode('utf-8', errors='replace')
+        try:
+            if self._file is None or self.size - self._segment_start >= self.segment_bytes:
+                self._rotate()
+            self._file.write(data)
+            # Flush per line so the log endpoint (possibly in another worker) sees it
+            self._file.flush()
+        except OSError as e:
+            logger.error(f"Error writing log for job {self.job_id}: {e}")
+        self.size += len(data)
+        self.lines += 1
+
+    def _rotate(self):
+        if self._file is not None:
+            self._file.close()
+        self._segment_start = self.size
+        self._file = open(_segment_path(self.log_dir, self.job_id, self.size), 'ab')
+        for _, path in _segments(self.log_dir, self.job_id)[:-self.max_segments]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def close(self):
+        """Close the current segment."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def read_job_log(log_dir: str, job_id: str, offset: int = 0, limit: int = DEFAULT_PAGE_BYTES) -> Dict[str, Any]:
+    """
+    Read a page of complete lines from a job's log.
+
+    Args:
+        log_dir: Log directory
+        job_id: Job whose log to read
+        offset: Byte offset to start at (the previous page's next_offset)
+        limit: Maximum number of bytes to return
+
+    Returns:
+        Dictionary with lines, offset (where the page starts), next_offset, first_offset
+        (the oldest byte still kept), end_offset (bytes written so far) and eof
+    """
+    segments = _segments(log_dir, job_id)
+    if not segments:
+        return {'lines': [], 'offset': offset, 'next_offset': offset, 'first_offset': 0,
+                'end_offset': 0, 'eof': True}
+
+    first_offset = segments[0][0]
+    try:
+        end_offset = segments[-1][0] + os.path.getsize(segments[-1][1])
+    except OSError:
+        end_offset = segments[-1][0]
+    # Offsets before the oldest kept segment were rotated away
+    offset = min(max(offset, first_offset), end_offset)
+
+    chunks = []
+    remaining = limit
+    for index, (start, path) in enumerate(segments):
+        segment_end = segments[index + 1][0] if index + 1 < len(segments) else end_offset
+        if remaining <= 0 or segment_end <= offset:
+            continue
+        try:
+            with open(path, 'rb') as f:
+                f.seek(max(offset - start, 0))
+                chunk = f.read(min(remaining, segment_end - max(offset, start)))
+        except OSError as e:
+            logger.error(f"Error reading log for job {job_id}: {e}")
+            break
+        chunks.append(chunk)
+        remaining -= len(chunk)
+
+    data = b''.join(chunks)
+    # Only return whole lines, unless a single line is longer than a page
+    cut = data.rfind(b'\n') + 1
+    if cut == 0 and len(data) >= limit:
+        cut = len(data)
+    data = data[:cut]
+    next_offset = offset + len(data)
+    return {
+        'lines': data.decode('utf-8', errors='replace').splitlines(),
+        'offset': offset,
+        'next_offset': next_offset,
+        'first_offset': first_offset,
+        'end_offset': end_offset,
+        'eof': next_offset >= end_offset
+    }
+
+
+def delete_job_logs(log_dir: str, keep_job_ids: Optional[Set[str]] = None) -> int:
+    """
+    Delete the logs of jobs that are no longer kept.
+
+    Args:
+        log_dir: Log directory
+        keep_job_ids: Jobs whose logs to keep (None deletes every log)
+
+    Returns:
+        Number of segment files deleted
+    """
+    deleted = 0
+    for path in glob.glob(os.path.join(glob.escape(log_dir), "*.log")):
+        job_id = os.path.basename(path).split('.', 1)[0]
+        if keep_job_ids is not None and job_id in keep_job_ids:
+            continue
+        try:
+            os.remove(path)
+            deleted += 1
+        except OSError:
+            pass
+    return deleted
@@ -5,89 +5,404 @@ Job service module for handling background jobs.
 import json
 import os
 import uuid
+import signal
 import tempfile
 import subprocess
 import threading
 import sys
-import glob
 import time
+from collections import deque
 from datetime import datetime
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Callable
 import logging
 
+from .job_log import JobLogWriter, delete_job_logs, read_job_log, DEFAULT_PAGE_BYTES
+from .job_slots import JobSlots
+from .job_store import JobStore
+
 logger = logging.getLogger(__name__)
 
+SCRIPT_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "..", "scraping")
+
+# Progress channel shared with scraping/progress.py (kept in step with it)
+PROGRESS_FD_ENV = 'SCRAPER_PROGRESS_FD'
+PROGRESS_STDOUT_ENV = 'SCRAPER_PROGRESS_STDOUT'
+PROGRESS_EVENT_PREFIX = '@progress '
+PROGRESS_PIPE_SUPPORTED = os.name == 'posix'  # Windows can't pass extra descriptors to a child
+PROGRESS_READER_JOIN_TIMEOUT = 5
+
+STATUS_WRITE_INTERVAL = 1.0  # Progress is written to the job store at most once per interval
+OUTPUT_TAIL_LINES = 300  # Last output lines kept in the job status; the full output is in the job log
+MAX_ERROR_LINES = 20  # Scraper error events kept in the job's error field
+
+# Queue priorities (higher runs first)
+PRIORITY_SCHEDULED = 0
+PRIORITY_MANUAL = 10
+
+DISPATCH_INTERVAL = 5  # Seconds between queue checks when nothing wakes the dispatcher
+CANCEL_CHECK_INTERVAL = 1  # Seconds between checks for a cancel request on a running job
+TERMINATE_GRACE_PERIOD = 10  # Seconds a cancelled scraper gets to exit before it is killed
+
+
+def parse_progress_event(line: str) -> Optional[Dict[str, Any]]:
+    """
+    Decode one JSON progress event.
+    
+    Args:
+        line: JSON-encoded event
+    
+    Returns:
+        Event dictionary, or None if the line isn't a valid event
+    """
+    try:
+        event = json.loads(line)
+    except ValueError:
+        return None
+    if not isinstance(event, dict) or not isinstance(event.get('event'), str):
+        return None
+    return event
+
+
+def apply_progress_event(progress: Dict[str, Any], event: Dict[str, Any]) -> bool:
+    """
+    Fold a scraper progress event into the job's progress dictionary.
+    
+    Events:
+    - {"event": "start", "total": 150}
+    - {"event": "artist", "current": 45, "total": 150, "artist": "Artist Name"}
+    - {"event": "skip", "artist": "Artist Name"}
+    - {"event": "phase", "phase": "Retrying 3 failed URLs"}
+    - {"event": "done", "count": 150}
+    
+    Error events ({"event": "error", "message": ...}) don't change the progress; the job
+    collects them for its error field.
+    
+    Args:
+        progress: Progress dictionary (current, total, phase, details, current_artist), updated in place
+        event: Decoded event
+    
+    Returns:
+        True if the progress changed
+    """
+    try:
+        kind = event['event']
+        if kind == 'start':
+            total = int(event['total'])
+            updates = {
+                'total': total,
+                'current': 0,
+                'phase': f'Starting to scrape {total} artists',
+                'details': 'Initializing scraping process...'
+            }
+        elif kind == 'artist':
+            current, total = int(event['current']), int(event['total'])
+            artist_name = str(event.get('artist', 'Unknown'))
+            updates = {
+                'current': current,
+                'total': total,
+                'phase': f'Scraping artists ({current}/{total})',
+                'current_artist': artist_name,
+                'details': f'Processing: {artist_name}'
+            }
+        elif kind == 'skip':
+            updates = {'details': f"Skipped: {event.get('artist', 'Unknown')} (already scraped)"}
+        elif kind == 'phase':
+            updates = {'phase': str(event['phase'])}
+        elif kind == 'done':
+            count = int(event['count'])
+            updates = {
+                'current': count,
+                'total': count,
+                'phase': 'Completed',
+                'details': f'Successfully processed {count} artists'
+            }
+        else:
+            return False
+    except (KeyError, TypeError, ValueError):
+        logger.debug(f"Ignoring malformed progress event: {event}")
+        return False
+    
+    if all(progress.get(key) == value for key, value in updates.items()):
+        return False
+    progress.update(updates)
+    return True
+
+
+def read_progress_events(fd: int, on_event: Callable[[Dict[str, Any]], None]):
+    """
+    Read JSON-lines progress events from a pipe until the writer closes it.
+    
+    Args:
+        fd: Read end of the progress pipe (closed when done)
+        on_event: Called with each decoded event
+    """
+    with os.fdopen(fd, 'r', encoding='utf-8', errors='replace') as pipe:
+        for line in pipe:
+            event = parse_progress_event(line)
+            if event is None:
+                continue
+            try:
+                on_event(event)
+            except Exception as e:
+                logger.error(f"Error handling progress event {event}: {e}")
+
+
+class JobStatusWriter:
+    """
+    Coalesces one job's status updates into the job store.
+    
+    Updates are merged in memory and written at most once per interval (with a trailing
+    write for the last update), however fast the scraper reports. Each write is one
+    journal record holding only the fields changed since the previous write.
+    """
+    
+    def __init__(self, job_store: JobStore, job_id: str, interval: float = STATUS_WRITE_INTERVAL):
+        self.job_store = job_store
+        self.job_id = job_id
+        self.interval = interval
+        self._pending: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._last_write = 0.0
+        self._timer = None
+        self.writes = 0
+    
+    def update(self, updates: Dict[str, Any], flush: bool = False):
+        """
+        Merge updates into the job status.
+        
+        Args:
+            updates: Fields to change
+            flush: Write immediately (status transitions and the final result)
+        """
+        with self._lock:
+            self._pending.update(updates)
+            wait = self._last_write + self.interval - time.monotonic()
+            if flush or wait <= 0:
+                self._write_locked()
+            elif self._timer is None:
+                self._timer = threading.Timer(wait, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+    
+    def flush(self):
+        """Write any pending updates now."""
+        with self._lock:
+            if self._pending:
+                self._write_locked()
+    
+    def _write_locked(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending = self._pending, {}
+        self._last_write = time.monotonic()
+        try:
+            self.job_store.update(self.job_id, pending)
+            self.writes += 1
+        except Exception as e:
+            logger.error(f"Error updating job status for {self.job_id}: {e}")
+
+
 class JobService:
     """Service class for managing background jobs."""
     
-    def __init__(self, chromedriver_path: str, scraping_timeout: int = 1800):
+    def __init__(self, chromedriver_path: str, scraping_timeout: int = 1800, scraping_workers: int = 1,
+                 on_scrape_complete: Optional[Callable[[], None]] = None, job_store: Optional[JobStore] = None,
+                 log_dir: Optional[str] = None, max_concurrent_jobs: int = 1):
         self.chromedriver_path = chromedriver_path
         self.scraping_timeout = scraping_timeout
-        self.temp_dir = tempfile.gettempdir()
+        self.scraping_workers = scraping_workers
+        self.on_scrape_complete = on_scrape_complete  # Called after a successful scrape lands new data
+        self.job_store = job_store if job_store is not None else JobStore()
+        self.script_dir = SCRIPT_DIR
+        self.log_dir = log_dir or os.path.join(tempfile.gettempdir(), "scraping-job-logs")
+        # Slot locks live next to the journal, so the limit covers every worker sharing it
+        self.job_slots = JobSlots(max_concurrent_jobs, path_prefix=self.job_store.path)
+        self.dispatcher_thread: Optional[threading.Thread] = None
+        self._dispatcher_lock = threading.Lock()
     
-    def create_scraping_job(self, headless: bool = True, today_only: bool = False, allow_duplicates: bool = False) -> str:
+    def create_scraping_job(self, headless: bool = True, today_only: bool = False, allow_duplicates: bool = False,
+                            priority: int = PRIORITY_MANUAL) -> str:
         """
-        Create a new scraping job.
+        Queue a new scraping job.
+        
+        A job identical to one still waiting in the queue is merged into it (taking the
+        higher priority) instead of queueing the same scrape twice.
         
         Args:
             headless: Whether to run browser in headless mode (applies to both scripts)
             today_only: Whether to scrape only today's artists
             allow_duplicates: Whether to allow re-scraping artists already scraped today
+            priority: PRIORITY_MANUAL or PRIORITY_SCHEDULED (higher runs first)
         
         Returns:
-            Job ID string
+            Job ID string (of the existing job when merged)
         """
         job_id = str(uuid.uuid4())
-        job_file = os.path.join(self.temp_dir, f"scraping_job_{job_id}.json")
         
         initial_job_data = {
             'job_id': job_id,
-            'status': 'starting',
-            'started_at': datetime.now().isoformat(),
+            'status': 'queued',
+            'queued_at': datetime.now().isoformat(),
+            'priority': priority,
             'output': '',
             'error': '',
             'completed': False,
             'today_only': today_only,
             'headless': headless,
-            'allow_duplicates': allow_duplicates
+            'allow_duplicates': allow_duplicates,
+            'worker_pid': os.getpid()
         }
         
-        # Save initial job status to file
-        try:
-            with open(job_file, 'w', encoding='utf-8') as f:
-                json.dump(initial_job_data, f)
-            logger.info(f"Created scraping job {job_id}")
-        except Exception as e:
-            logger.error(f"Error creating job file: {e}")
-            raise
+        coalesce_key = f"today_only={today_only},headless={headless},allow_duplicates={allow_duplicates}"
+        queued_job_id = self.job_store.enqueue(initial_job_data, coalesce_key=coalesce_key)
+        
+        if queued_job_id == job_id:
+            logger.info(f"Queued scraping job {job_id} (priority {priority})")
+        else:
+            logger.info(f"Merged scraping request into queued job {queued_job_id}")
         
-        return job_id
+        return queued_job_id
     
     def start_scraping_job(self, job_id: str) -> bool:
         """
-        Start a scraping job in the background.
+        Make sure a queued job will run: it starts as soon as a slot is free.
         
         Args:
             job_id: Job ID to start
         
         Returns:
-            True if job started successfully, False otherwise
+            True if the job is queued or running, False otherwise
         """
         job_data = self.get_job_status(job_id)
         if not job_data:
             logger.error(f"Job {job_id} not found")
             return False
+        if job_data.get('completed'):
+            logger.error(f"Job {job_id} has already finished")
+            return False
         
-        def run_scraping():
-            self._execute_scraping_job(job_id, job_data)
+        self.start_dispatcher()
+        return True
+    
+    def start_dispatcher(self):
+        """Start the thread that runs queued jobs when slots are free (once per process)."""
+        with self._dispatcher_lock:
+            if self.dispatcher_thread and self.dispatcher_thread.is_alive():
+                return
+            self.dispatcher_thread = threading.Thread(target=self._dispatch_loop, daemon=True)
+            self.dispatcher_thread.start()
+    
+    def _dispatch_loop(self):
+        """Claim queued jobs while slots are free; wake on any job change."""
+        version = -1
+        while True:
+            try:
+                version = self.job_store.wait_for_change(version, DISPATCH_INTERVAL)
+                self.dispatch_pending()
+            except Exception as e:
+                logger.error(f"Error in job dispatcher: {e}")
+                time.sleep(DISPATCH_INTERVAL)
+    
+    def dispatch_pending(self) -> int:
+        """
+        Start queued jobs until the queue is empty or every slot is taken.
+        
+        Returns:
+            Number of jobs started
+        """
+        started = 0
+        while True:
+            slot = self.job_slots.try_acquire()
+            if slot is None:
+                return started
+            
+            job_data = self.job_store.claim_next({
+                'status': 'starting',
+                'started_at': datetime.now().isoformat(),
+                'worker_pid': os.getpid()  # Lets a restarted worker tell orphaned jobs from running ones
+            })
+            if job_data is None:
+                slot.release()
+                return started
+            
+            def run_scraping(job_data=job_data, slot=slot):
+                try:
+                    self._execute_scraping_job(job_data['job_id'], job_data)
+                finally:
+                    slot.release()
+                    # Hand the slot straight to the next queued job
+                    self.dispatch_pending()
+            
+            # Start scraping in background thread
+            thread = threading.Thread(target=run_scraping)
+            thread.daemon = True
+            thread.start()
+            started += 1
+            
+            logger.info(f"Started scraping job {job_data['job_id']} in slot {slot.index}")
+    
+    def cancel_job(self, job_id: str) -> Optional[str]:
+        """
+        Cancel a queued or running job. A running job's scraper and everything it started
+        (Chrome, chromedriver, worker processes) are terminated by the worker running it.
         
-        # Start scraping in background thread
-        thread = threading.Thread(target=run_scraping)
-        thread.daemon = True
-        thread.start()
+        Args:
+            job_id: Job ID to cancel
         
-        logger.info(f"Started scraping job {job_id}")
-        return True
+        Returns:
+            'cancelled' (was queued), 'cancelling' (running), or None if it can't be cancelled
+        """
+        result = self.job_store.cancel(job_id)
+        if result:
+            logger.info(f"Cancel requested for scraping job {job_id}: {result}")
+        return result
+    
+    def _terminate_process_tree(self, process: subprocess.Popen):
+        """Stop a scraper and its descendants: SIGTERM to its process group, then SIGKILL."""
+        if process.poll() is not None:
+            return
+        try:
+            if os.name == 'posix':
+                os.killpg(process.pid, signal.SIGTERM)
+            else:
+                subprocess.run(['taskkill', '/T', '/PID', str(process.pid)], capture_output=True)
+            process.wait(timeout=TERMINATE_GRACE_PERIOD)
+        except subprocess.TimeoutExpired:
+            logger.warning(f"Scraper {process.pid} did not exit after {TERMINATE_GRACE_PERIOD}s; killing it")
+        except OSError:
+            pass
+        
+        try:
+            # Also reaps descendants still holding on after their parent exited
+            if os.name == 'posix':
+                os.killpg(process.pid, signal.SIGKILL)
+            elif process.poll() is None:
+                subprocess.run(['taskkill', '/F', '/T', '/PID', str(process.pid)], capture_output=True)
+        except OSError:
+            pass
+    
+    def _watch_for_cancel(self, job_id: str, process: subprocess.Popen, cancelled: threading.Event,
+                          timed_out: threading.Event):
+        """Terminate the scraper when its job gets a cancel request or runs past the scraping timeout."""
+        deadline = time.monotonic() + self.scraping_timeout
+        version = -1
+        while process.poll() is None:
+            timeout = min(CANCEL_CHECK_INTERVAL, max(0, deadline - time.monotonic()))
+            version = self.job_store.wait_for_change(version, timeout)
+            if process.poll() is not None:
+                return
+            if time.monotonic() >= deadline:
+                logger.warning(f"Scraping job {job_id} ran past {self.scraping_timeout}s; terminating it")
+                timed_out.set()
+                self._terminate_process_tree(process)
+                return
+            job = self.job_store.get(job_id)
+            if job and job.get('cancel_requested'):
+                logger.info(f"Cancelling scraping job {job_id}")
+                cancelled.set()
+                self._terminate_process_tree(process)
+                return
     
     def _execute_scraping_job(self, job_id: str, job_data: Dict[str, Any]):
         """
@@ -97,24 +412,19 @@ class JobService:
             job_id: Job ID
             job_data: Job configuration data
         """
-        def update_job_status(updates: Dict[str, Any]):
-            """Helper function to update job status file."""
-            try:
-                job_file = os.path.join(self.temp_dir, f"scraping_job_{job_id}.json")
-                
-                if os.path.exists(job_file):
-                    with open(job_file, 'r', encoding='utf-8') as f:
-                        current_data = json.load(f)
-                else:
-                    current_data = job_data.copy()
-                
-                current_data.update(updates)
-                
-                with open(job_file, 'w', encoding='utf-8') as f:
-                    json.dump(current_data, f)
-            
-            except Exception as e:
-                logger.error(f"Error updating job status for {job_id}: {e}")
+        status = JobStatusWriter(self.job_store, job_id)
+        update_job_status = status.update
+        
+        # The full output goes to the job log; only a fixed-size tail is kept in memory
+        job_log = JobLogWriter(self.log_dir, job_id)
+        output_tail = deque(maxlen=OUTPUT_TAIL_LINES)
+        
+        def log_output_fields() -> Dict[str, Any]:
+            return {
+                'output': '\n'.join(output_tail),
+                'output_truncated': job_log.lines > len(output_tail),
+                'log_size': job_log.size
+            }
         
         try:
             # Set environment variables for the subprocess
@@ -122,12 +432,10 @@ class JobService:
             env['CHROMEDRIVER_PATH'] = self.chromedriver_path
             
             # Choose the appropriate scraping script
-            script_dir = os.path.join(os.path.dirname(__file__), "..", "..", "..", "scraping")
-            
             if job_data.get('today_only', False):
-                scrape_script = os.path.join(script_dir, "scrape_filtered.py")
+                scrape_script = os.path.join(self.script_dir, "scrape_filtered.py")
             else:
-                scrape_script = os.path.join(script_dir, "scrape.py")
+                scrape_script = os.path.join(self.script_dir, "scrape.py")
             
             # Build the command
             cmd = [sys.executable, scrape_script]
@@ -147,165 +455,142 @@ class JobService:
                 # Use today's date in YYYY-MM-DD format for filtered script
                 today_date = datetime.now().strftime('%Y-%m-%d')
                 cmd.extend(["--date", today_date])
-            else:
-                # Full scraping with scrape.py (now supports headless too)
-                pass
+            elif self.scraping_workers > 1:
+                # Full scraping with scrape.py split across parallel Chrome workers
+                cmd.extend(["--workers", str(self.scraping_workers)])
             
             logger.info(f"Running scraping command for job {job_id}: {' '.join(cmd)}")
             
             # Update status to running
-            update_job_status({'status': 'running'})
+            update_job_status({'status': 'running'}, flush=True)
             
             # Run the script with real-time progress tracking
             progress_data = {'current': 0, 'total': 0, 'phase': 'Initializing'}
-            output_lines = []
             error_lines = []
             
+            def on_progress_event(event: Dict[str, Any]):
+                if event['event'] == 'error' and len(error_lines) < MAX_ERROR_LINES:
+                    error_lines.append(str(event.get('message', '')))
+                if apply_progress_event(progress_data, event):
+                    update_job_status({'status': 'running', 'progress': progress_data.copy()})
+            
+            # Progress events arrive on their own pipe, separate from the log output
+            progress_read_fd = progress_write_fd = None
+            popen_kwargs = {}
+            if PROGRESS_PIPE_SUPPORTED:
+                progress_read_fd, progress_write_fd = os.pipe()
+                env[PROGRESS_FD_ENV] = str(progress_write_fd)
+                popen_kwargs['pass_fds'] = (progress_write_fd,)
+            else:
+                env[PROGRESS_STDOUT_ENV] = '1'
+            
+            if os.name == 'posix':
+                # Own process group, so cancelling reaches Chrome and the worker processes too
+                popen_kwargs['start_new_session'] = True
+            
+            cancelled = threading.Event()
+            timed_out = threading.Event()
+            progress_reader = None
             try:
-                process = subprocess.Popen(
-                    cmd,
-                    cwd=os.path.dirname(scrape_script),
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.STDOUT,
-                    text=True,
-                    bufsize=1,
-                    universal_newlines=True,
-                    env=env
-                )
+                try:
+                    process = subprocess.Popen(
+                        cmd,
+                        cwd=os.path.dirname(scrape_script),
+                        stdout=subprocess.PIPE,
+                        stderr=subprocess.STDOUT,
+                        text=True,
+                        bufsize=1,
+                        universal_newlines=True,
+                        env=env,
+                        **popen_kwargs
+                    )
+                finally:
+                    if progress_write_fd is not None:
+                        # Only the scraper keeps the write end, so the reader sees EOF when it exits
+                        os.close(progress_write_fd)
+                
+                threading.Thread(target=self._watch_for_cancel, args=(job_id, process, cancelled, timed_out),
+                                 daemon=True).start()
+                
+                if progress_read_fd is not None:
+                    progress_reader = threading.Thread(
+                        target=read_progress_events, args=(progress_read_fd, on_progress_event), daemon=True
+                    )
+                    progress_reader.start()
+                    progress_read_fd = None  # Closed by the reader
                 
-                # Read output line by line for progress tracking
+                # Read output line by line
                 for line in iter(process.stdout.readline, ''):
                     if line:
-                        output_lines.append(line.rstrip())
-                        
-                        # Parse progress information from output
-                        parsed_progress = self._parse_progress_line(line.rstrip())
-                        if parsed_progress:
-                            progress_data.update(parsed_progress)
-                            update_job_status({
-                                'status': 'running',
-                                'progress': progress_data.copy()
-                            })
+                        line = line.rstrip()
+                        if line.startswith(PROGRESS_EVENT_PREFIX):
+                            event = parse_progress_event(line[len(PROGRESS_EVENT_PREFIX):])
+                            if event is not None:
+                                on_progress_event(event)
+                                continue
+                        output_tail.append(line)
+                        job_log.write(line)
+                        # Lets log viewers know there is more to fetch (coalesced with progress)
+                        update_job_status({'log_size': job_log.size})
                 
-                # Wait for process to complete
-                return_code = process.wait(timeout=self.scraping_timeout)
+                # Output ends when the scraper exits (or the watcher terminated it)
+                return_code = process.wait()
                 
-            except subprocess.TimeoutExpired:
-                process.kill()
-                raise
-            
-            # Combine output
-            output = '\n'.join(output_lines)
+                if progress_reader is not None:
+                    progress_reader.join(timeout=PROGRESS_READER_JOIN_TIMEOUT)
+                
+                if timed_out.is_set():
+                    raise subprocess.TimeoutExpired(cmd, self.scraping_timeout)
+            finally:
+                if progress_read_fd is not None:
+                    os.close(progress_read_fd)
             
             # Update job status with results
+            if cancelled.is_set():
+                final_state = 'cancelled'
+            else:
+                final_state = 'completed' if return_code == 0 else 'failed'
             final_status = {
-                'status': 'completed' if return_code == 0 else 'failed',
-                'output': output,
+                'status': final_state,
+                **log_output_fields(),
                 'error': '\n'.join(error_lines) if error_lines else '',
                 'completed': True,
                 'return_code': return_code,
                 'completed_at': datetime.now().isoformat()
             }
-            update_job_status(final_status)
+            update_job_status(final_status, flush=True)
             
             logger.info(f"Scraping job {job_id} completed with return code: {return_code}")
+            
+            if final_state == 'completed' and self.on_scrape_complete:
+                try:
+                    self.on_scrape_complete()
+                except Exception as e:
+                    logger.error(f"Post-scrape hook failed for job {job_id}: {e}")
         
         except subprocess.TimeoutExpired:
             update_job_status({
                 'status': 'timeout',
+                **log_output_fields(),
                 'error': f'Scraping script timed out after {self.scraping_timeout // 60} minutes',
                 'completed': True,
                 'completed_at': datetime.now().isoformat()
-            })
+            }, flush=True)
             logger.warning(f"Scraping job {job_id} timed out")
         
         except Exception as e:
             update_job_status({
                 'status': 'error',
+                **log_output_fields(),
                 'error': str(e),
                 'completed': True,
                 'completed_at': datetime.now().isoformat()
-            })
+            }, flush=True)
             logger.error(f"Scraping job {job_id} error: {e}")
-    
-    def _parse_progress_line(self, line: str) -> Optional[Dict[str, Any]]:
-        """
-        Parse a line of output for progress information.
-        
-        Expected formats:
-        - "PROGRESS: Starting scrape of 150 artists"
-        - "PROGRESS: Processing artist 45/150: Artist Name"
-        - "PROGRESS: Completed scraping 150 artists"
-        - "Skipping Artist Name - already scraped today"
-        
-        Returns:
-            Dictionary with progress data or None if no progress found
-        """
-        import re
         
-        # Check for explicit progress markers
-        if line.startswith('PROGRESS:'):
-            progress_line = line[9:].strip()  # Remove "PROGRESS:" prefix
-            
-            # Pattern for starting: "Starting scrape of X artists"
-            start_match = re.search(r'Starting scrape of (\d+) artists', progress_line)
-            if start_match:
-                total = int(start_match.group(1))
-                return {
-                    'total': total,
-                    'current': 0,
-                    'phase': f'Starting to scrape {total} artists',
-                    'details': 'Initializing scraping process...'
-                }
-            
-            # Pattern for current progress: "Processing artist X/Y: Artist Name"
-            progress_match = re.search(r'Processing artist (\d+)/(\d+):\s*(.+)', progress_line)
-            if progress_match:
-                current = int(progress_match.group(1))
-                total = int(progress_match.group(2))
-                artist_name = progress_match.group(3).strip()
-                return {
-                    'current': current,
-                    'total': total,
-                    'phase': f'Scraping artists ({current}/{total})',
-                    'current_artist': artist_name,
-                    'details': f'Processing: {artist_name}'
-                }
-            
-            # Pattern for completion: "Completed scraping X artists"
-            completed_match = re.search(r'Completed scraping (\d+) artists', progress_line)
-            if completed_match:
-                count = int(completed_match.group(1))
-                return {
-                    'current': count,
-                    'total': count,
-                    'phase': 'Completed',
-                    'details': f'Successfully processed {count} artists'
-                }
-        
-        # Pattern for skipped artists
-        if 'Skipping' in line and 'already scraped today' in line:
-            # Extract artist name
-            artist_match = re.search(r'Skipping (.+?) - already scraped today', line)
-            if artist_match:
-                artist_name = artist_match.group(1).strip()
-                return {
-                    'details': f'Skipped: {artist_name} (already scraped)'
-                }
-        
-        # Pattern for legacy tqdm output fallback
-        tqdm_match = re.search(r'(\d+)%.*?(\d+)/(\d+)', line)
-        if tqdm_match:
-            current = int(tqdm_match.group(2))
-            total = int(tqdm_match.group(3))
-            return {
-                'current': current,
-                'total': total,
-                'phase': 'Scraping artists'
-            }
-        
-        return None
-
+        finally:
+            job_log.close()
+    
     def get_job_status(self, job_id: str) -> Optional[Dict[str, Any]]:
         """
         Get the status of a specific job.
@@ -316,17 +601,7 @@ class JobService:
         Returns:
             Job status dictionary or None if not found
         """
-        job_file = os.path.join(self.temp_dir, f"scraping_job_{job_id}.json")
-        
-        if not os.path.exists(job_file):
-            return None
-        
-        try:
-            with open(job_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except Exception as e:
-            logger.error(f"Error reading job file for {job_id}: {e}")
-            return None
+        return self.job_store.get(job_id)
     
     def get_all_jobs(self) -> Dict[str, Dict[str, Any]]:
         """
@@ -335,48 +610,49 @@ class JobService:
         Returns:
             Dictionary mapping job IDs to job data
         """
-        job_pattern = os.path.join(self.temp_dir, "scraping_job_*.json")
-        job_files = glob.glob(job_pattern)
-        
-        jobs = {}
-        for job_file in job_files:
-            try:
-                with open(job_file, 'r', encoding='utf-8') as f:
-                    job_data = json.load(f)
-                    job_id = job_data.get('job_id')
-                    if job_id:
-                        jobs[job_id] = job_data
-            except Exception as e:
-                logger.error(f"Error reading job file {job_file}: {e}")
-                continue
+        return self.job_store.all()
+    
+    def watch_job(self, job_id: str, heartbeat: float = 15, max_duration: float = 300):
+        """
+        Follow a job's progress as (event, data) tuples, see JobStore.watch.
         
-        return jobs
+        Args:
+            job_id: Job to follow
+            heartbeat: Seconds between heartbeats while nothing changes
+            max_duration: Seconds before the stream ends (clients reconnect)
+        """
+        return self.job_store.watch(job_id, heartbeat=heartbeat, max_duration=max_duration)
     
-    def cleanup_old_jobs(self, max_age_hours: int = 24):
+    def get_job_log(self, job_id: str, offset: int = 0, limit: int = DEFAULT_PAGE_BYTES) -> Dict[str, Any]:
         """
-        Clean up job files older than specified hours.
+        Read a page of a job's full output.
         
         Args:
-            max_age_hours: Maximum age in hours before cleanup
+            job_id: Job whose log to read
+            offset: Byte offset to start at (the previous page's next_offset)
+            limit: Maximum number of bytes to return
+        
+        Returns:
+            Page dictionary, see job_log.read_job_log
+        """
+        return read_job_log(self.log_dir, job_id, offset=offset, limit=limit)
+    
+    def cleanup_old_jobs(self, max_age_hours: Optional[int] = None):
         """
-        job_pattern = os.path.join(self.temp_dir, "scraping_job_*.json")
-        job_files = glob.glob(job_pattern)
+        Drop old finished jobs and their logs, and mark jobs orphaned by a restart as interrupted.
         
-        current_time = time.time()
-        max_age_seconds = max_age_hours * 3600
+        Args:
+            max_age_hours: Maximum age in hours before cleanup (defaults to the store's retention)
+        """
+        if max_age_hours is not None:
+            self.job_store.max_age_hours = max_age_hours
         
-        cleaned_count = 0
-        for job_file in job_files:
-            try:
-                # Check if file is older than max age
-                if current_time - os.path.getmtime(job_file) > max_age_seconds:
-                    os.remove(job_file)
-                    cleaned_count += 1
-            except Exception as e:
-                logger.error(f"Error cleaning up job file {job_file}: {e}")
+        self.job_store.recover_interrupted()
+        cleaned_count = self.job_store.prune()
+        delete_job_logs(self.log_dir, set(self.job_store.all()))
         
         if cleaned_count > 0:
-            logger.info(f"Cleaned up {cleaned_count} old job files")
+            logger.info(f"Cleaned up {cleaned_count} old jobs")
     
     def run_process_suggestions(self) -> Dict[str, Any]:
         """
@@ -387,8 +663,7 @@ class JobService:
         """
         try:
             # Path to the suggestion processing script
-            script_dir = os.path.join(os.path.dirname(__file__), "..", "..", "..", "scraping")
-            process_script = os.path.join(script_dir, "process_suggestions.py")
+            process_script = os.path.join(self.script_dir, "process_suggestions.py")
             
             # Set environment variables for the subprocess
             env = os.environ.copy()
@@ -0,0 +1,69 @@
+"""
+Concurrency slots for scraping jobs.
+
+A job may only run while it holds a slot. With a path prefix, slot N is an exclusive
+fcntl lock on "<prefix>.slotN", so the limit holds across every gunicorn worker in the
+container, and the kernel frees a dead worker's slots. Without fcntl (Windows) or a
+prefix, the slots are a semaphore within this process.
+"""
+
+import threading
+import logging
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class JobSlot:
+    """A held slot; release() hands it back."""
+
+    def __init__(self, index: int, lock_file=None, semaphore: Optional[threading.Semaphore] = None):
+        self.index = index
+        self._lock_file = lock_file
+        self._semaphore = semaphore
+
+    def release(self):
+        if self._lock_file is not None:
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+            self._lock_file.close()
+            self._lock_file = None
+        elif self._semaphore is not None:
+            self._semaphore.release()
+            self._semaphore = None
+
+
+class JobSlots:
+    """A fixed number of job slots, shared across processes when possible."""
+
+    def __init__(self, count: int = 1, path_prefix: Optional[str] = None):
+        """
+        Args:
+            count: Maximum number of jobs running at once
+            path_prefix: Prefix of the slot lock files; None limits this process only
+        """
+        self.count = max(1, count)
+        self.path_prefix = path_prefix if path_prefix and fcntl is not None else None
+        self._semaphore = threading.Semaphore(self.count)
+
+    def try_acquire(self) -> Optional[JobSlot]:
+        """Take a free slot without waiting, or return None if all are held."""
+        if self.path_prefix is None:
+            if self._semaphore.acquire(blocking=False):
+                return JobSlot(0, semaphore=self._semaphore)
+            return None
+
+        for index in range(self.count):
+            # Each attempt uses its own open file, so slots also exclude threads of this process
+            lock_file = open(f"{self.path_prefix}.slot{index}", 'a')
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                lock_file.close()
+                continue
+            return JobSlot(index, lock_file=lock_file)
+        return None
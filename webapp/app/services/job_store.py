@@ -0,0 +1,435 @@
+"""
+Scraping job store.
+
+Jobs live in memory and every change is appended to a JSON-lines journal:
+
+    {"op": "put", "job": {...}}                  a whole job (creation, compaction)
+    {"op": "set", "id": "...", "changes": {...}}  changed fields only
+
+The journal lets a restarted worker recover its job history, and lets the other gunicorn
+workers follow jobs they don't run: before answering, a store reads only the bytes
+appended since its last look (one stat() when nothing changed), instead of scanning a
+directory of per-job files. When the journal grows past a size limit it is rewritten as
+one "put" per job, dropping finished jobs past their retention. Appends and compaction
+serialize on a lock file (fcntl, where available).
+
+Jobs wait in the store with status 'queued' until a worker claims one (claim_next()
+picks the highest priority, then the oldest); claims and queue changes run as
+transactions under the lock file, so two workers can never claim the same job.
+
+Changes wake up watch(), which streams a job's deltas to the admin page over SSE.
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+import logging
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_FILENAME = 'scraping-jobs.jsonl'
+MAX_JOURNAL_BYTES = 4 * 1024 * 1024  # Compact once the journal grows past this
+DEFAULT_MAX_AGE_HOURS = 24  # Finished jobs are kept this long
+SYNC_INTERVAL = 0.5  # How often watchers look for changes made by other workers
+
+
+def _pid_alive(pid: int) -> bool:
+    """Check whether a process exists."""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, OSError):
+        return True
+    return True
+
+
+class JobStore:
+    """Thread-safe in-memory job store backed by an append-only journal."""
+
+    def __init__(self, path: Optional[str] = None, max_journal_bytes: int = MAX_JOURNAL_BYTES,
+                 max_age_hours: float = DEFAULT_MAX_AGE_HOURS):
+        """
+        Args:
+            path: Journal file shared by every worker; None keeps jobs in memory only
+            max_journal_bytes: Journal size that triggers compaction
+            max_age_hours: How long finished jobs are kept
+        """
+        self.path = path
+        self.max_journal_bytes = max_journal_bytes
+        self.max_age_hours = max_age_hours
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._offset = 0
+        self._inode = None
+        self._in_transaction = False
+        self.version = 0  # Bumped on every change, local or read from the journal
+
+        if self.path:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with self._lock:
+                self._sync_locked()
+
+    # Journal
+
+    def _file_lock(self):
+        """Open and lock the journal's lock file (None without fcntl)."""
+        if fcntl is None:
+            return None
+        lock_file = open(self.path + '.lock', 'a')
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        return lock_file
+
+    @staticmethod
+    def _file_unlock(lock_file):
+        if lock_file is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+            lock_file.close()
+
+    def _apply(self, record: Dict[str, Any]) -> bool:
+        op = record.get('op')
+        if op == 'put' and isinstance(record.get('job'), dict):
+            job = record['job']
+            self._jobs[job['job_id']] = job
+        elif op == 'set' and record.get('id') in self._jobs:
+            self._jobs[record['id']].update(record.get('changes', {}))
+        elif op == 'del':
+            self._jobs.pop(record.get('id'), None)
+        else:
+            return False
+        return True
+
+    def _sync_locked(self) -> bool:
+        """Apply records other processes appended since the last sync. Caller holds _lock."""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return False
+
+        if stat.st_ino != self._inode or stat.st_size < self._offset:
+            # First load, or another worker compacted the journal
+            self._jobs = {}
+            self._offset = 0
+            self._inode = stat.st_ino
+        if stat.st_size == self._offset:
+            return False
+
+        try:
+            with open(self.path, 'rb') as f:
+                f.seek(self._offset)
+                data = f.read(stat.st_size - self._offset)
+        except OSError as e:
+            logger.error(f"Error reading job journal: {e}")
+            return False
+
+        # Leave a partially written last line for the next sync
+        end = data.rfind(b'\n') + 1
+        changed = False
+        for line in data[:end].splitlines():
+            try:
+                changed = self._apply(json.loads(line)) or changed
+            except (ValueError, KeyError, TypeError):
+                logger.warning("Skipping corrupt job journal record")
+        self._offset += end
+        if changed:
+            self.version += 1
+            self._changed.notify_all()
+        return changed
+
+    @contextmanager
+    def _transaction(self):
+        """Hold the store and journal locks, caught up with the journal, for a read-modify-write."""
+        with self._lock:
+            lock_file = self._file_lock() if self.path else None
+            self._in_transaction = True
+            try:
+                if self.path:
+                    self._sync_locked()
+                yield
+            finally:
+                self._in_transaction = False
+                self._file_unlock(lock_file)
+
+    def _append_locked(self, record: Dict[str, Any]):
+        """Apply a record and append it to the journal. Caller holds _lock."""
+        if not self.path:
+            self._apply(record)
+            self.version += 1
+            self._changed.notify_all()
+            return
+
+        line = (json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8')
+        # flock() locks conflict even within one process, so don't lock twice
+        lock_file = None if self._in_transaction else self._file_lock()
+        try:
+            # Catch up first so records stay in journal order
+            self._sync_locked()
+            self._apply(record)
+            try:
+                with open(self.path, 'ab') as f:
+                    f.write(line)
+                    size = f.tell()
+                if self._inode is None:
+                    self._inode = os.stat(self.path).st_ino
+                self._offset = size
+            except OSError as e:
+                logger.error(f"Error appending to job journal: {e}")
+
+            if self._offset > self.max_journal_bytes:
+                self._compact_locked()
+        finally:
+            self._file_unlock(lock_file)
+
+        self.version += 1
+        self._changed.notify_all()
+
+    def _prune_locked(self) -> int:
+        cutoff = (datetime.now() - timedelta(hours=self.max_age_hours)).isoformat()
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.get('completed') and (job.get('completed_at') or job.get('started_at') or '') < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+        return len(expired)
+
+    def _compact_locked(self):
+        """Rewrite the journal as one record per retained job. Caller holds _lock and the file lock."""
+        self._prune_locked()
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, temp_path = tempfile.mkstemp(prefix='.scraping-jobs-', suffix='.jsonl.tmp', dir=directory)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                for job in self._jobs.values():
+                    f.write(json.dumps({'op': 'put', 'job': job}, ensure_ascii=False) + '\n')
+            os.replace(temp_path, self.path)
+            stat = os.stat(self.path)
+            self._inode, self._offset = stat.st_ino, stat.st_size
+            logger.info(f"Compacted job journal to {len(self._jobs)} jobs ({stat.st_size} bytes)")
+        except Exception as e:
+            logger.error(f"Error compacting job journal: {e}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    # Jobs
+
+    def create(self, job: Dict[str, Any]):
+        """Add a new job (a dictionary with a 'job_id')."""
+        with self._lock:
+            self._append_locked({'op': 'put', 'job': dict(job)})
+
+    def update(self, job_id: str, changes: Dict[str, Any]) -> bool:
+        """
+        Change fields of a job.
+
+        Args:
+            job_id: Job to update
+            changes: Fields to set
+
+        Returns:
+            False if the job doesn't exist
+        """
+        with self._lock:
+            if self.path:
+                self._sync_locked()
+            if job_id not in self._jobs:
+                return False
+            self._append_locked({'op': 'set', 'id': job_id, 'changes': changes})
+            return True
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of a job, or None."""
+        with self._lock:
+            if self.path:
+                self._sync_locked()
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def all(self) -> Dict[str, Dict[str, Any]]:
+        """Return copies of every job, by job ID."""
+        with self._lock:
+            if self.path:
+                self._sync_locked()
+            return {job_id: dict(job) for job_id, job in self._jobs.items()}
+
+    def prune(self) -> int:
+        """
+        Drop finished jobs past their retention and compact the journal.
+
+        Returns:
+            Number of jobs dropped
+        """
+        with self._lock:
+            if not self.path:
+                return self._prune_locked()
+            lock_file = self._file_lock()
+            try:
+                self._sync_locked()
+                before = len(self._jobs)
+                self._compact_locked()
+                return before - len(self._jobs)
+            finally:
+                self._file_unlock(lock_file)
+
+    def enqueue(self, job: Dict[str, Any], coalesce_key: Optional[str] = None) -> str:
+        """
+        Add a job to the queue, or merge it into an identical job that is still queued.
+
+        Args:
+            job: Job dictionary with 'job_id' and 'priority' (higher runs first)
+            coalesce_key: Jobs with the same key are identical; None never coalesces
+
+        Returns:
+            ID of the new job, or of the queued job it was merged into
+        """
+        with self._transaction():
+            if coalesce_key is not None:
+                for queued in self._jobs.values():
+                    if queued.get('status') == 'queued' and queued.get('coalesce_key') == coalesce_key:
+                        if job.get('priority', 0) > queued.get('priority', 0):
+                            self._append_locked({'op': 'set', 'id': queued['job_id'],
+                                                 'changes': {'priority': job['priority']}})
+                        return queued['job_id']
+            self._append_locked({'op': 'put', 'job': dict(job, status='queued', coalesce_key=coalesce_key)})
+            return job['job_id']
+
+    def claim_next(self, changes: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Take the highest-priority (then oldest) queued job.
+
+        Args:
+            changes: Fields set on the claimed job (its new status, the claiming worker)
+
+        Returns:
+            Copy of the claimed job, or None if the queue is empty
+        """
+        with self._transaction():
+            queued = [job for job in self._jobs.values() if job.get('status') == 'queued']
+            if not queued:
+                return None
+            job = min(queued, key=lambda job: (-job.get('priority', 0), job.get('queued_at') or ''))
+            self._append_locked({'op': 'set', 'id': job['job_id'], 'changes': changes})
+            return dict(self._jobs[job['job_id']])
+
+    def cancel(self, job_id: str) -> Optional[str]:
+        """
+        Cancel a job: a queued job is dropped from the queue at once, a running job is
+        flagged with cancel_requested for the worker running it.
+
+        Args:
+            job_id: Job to cancel
+
+        Returns:
+            'cancelled', 'cancelling', or None if the job doesn't exist or has finished
+        """
+        with self._transaction():
+            job = self._jobs.get(job_id)
+            if job is None or job.get('completed'):
+                return None
+            if job.get('status') == 'queued':
+                self._append_locked({'op': 'set', 'id': job_id, 'changes': {
+                    'status': 'cancelled',
+                    'completed': True,
+                    'completed_at': datetime.now().isoformat()
+                }})
+                return 'cancelled'
+            self._append_locked({'op': 'set', 'id': job_id, 'changes': {'cancel_requested': True}})
+            return 'cancelling'
+
+    def queue_position(self, job_id: str) -> Optional[int]:
+        """Return a queued job's place in the queue (0 = next), or None."""
+        jobs = self.all()
+        queued = sorted((job for job in jobs.values() if job.get('status') == 'queued'),
+                        key=lambda job: (-job.get('priority', 0), job.get('queued_at') or ''))
+        for position, job in enumerate(queued):
+            if job['job_id'] == job_id:
+                return position
+        return None
+
+    def recover_interrupted(self) -> int:
+        """
+        Mark unfinished jobs whose worker process is gone as interrupted. Queued jobs
+        are left alone: any worker can still run them.
+
+        Returns:
+            Number of jobs marked
+        """
+        interrupted = [job_id for job_id, job in self.all().items()
+                       if not job.get('completed') and job.get('status') != 'queued'
+                       and not _pid_alive(job.get('worker_pid') or 0)]
+        for job_id in interrupted:
+            self.update(job_id, {
+                'status': 'error',
+                'error': 'Interrupted by a restart of the web app',
+                'completed': True,
+                'completed_at': datetime.now().isoformat()
+            })
+        if interrupted:
+            logger.warning(f"Marked {len(interrupted)} interrupted scraping jobs")
+        return len(interrupted)
+
+    def wait_for_change(self, version: int, timeout: float) -> int:
+        """
+        Block until the store changes past a version, or the timeout passes.
+
+        Args:
+            version: Last version the caller saw
+            timeout: Seconds to wait
+
+        Returns:
+            The current version
+        """
+        deadline = time.monotonic() + timeout
+        with self._lock:
+            while self.version == version:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                # Local changes notify at once; other workers' changes are seen on the next sync
+                self._changed.wait(min(remaining, SYNC_INTERVAL) if self.path else remaining)
+                if self.path:
+                    self._sync_locked()
+            return self.version
+
+    def watch(self, job_id: str, heartbeat: float = 15, max_duration: float = 300) -> Iterator[Tuple[str, Any]]:
+        """
+        Follow a job: yield ('snapshot', job), then ('update', changed fields) on each
+        change, ('heartbeat', None) when idle, and ('done', job) when it finishes.
+
+        Args:
+            job_id: Job to follow
+            heartbeat: Seconds between heartbeats while nothing changes
+            max_duration: Stop after this many seconds (clients reconnect)
+
+        Yields:
+            (event, data) tuples
+        """
+        deadline = time.monotonic() + max_duration
+        version = -1
+        sent = None
+        while True:
+            version = self.wait_for_change(version, heartbeat)
+            job = self.get(job_id)
+            if job is None:
+                yield 'missing', {'job_id': job_id}
+                return
+            if sent is None:
+                yield 'snapshot', job
+            else:
+                delta = {key: value for key, value in job.items() if sent.get(key) != value}
+                yield ('update', delta) if delta else ('heartbeat', None)
+            sent = job
+            if job.get('completed'):
+                yield 'done', job
+                return
+            if time.monotonic() >= deadline:
+                return
@@ -0,0 +1,253 @@
+"""
+Ad-hoc leaderboard query engine.
+
+Holds the listener history as NumPy column arrays (sorted by artist, then day) so
+leaderboards over any window, tier, source or date_added cohort can be answered
+with a handful of vectorized operations instead of regrouping the raw rows.
+"""
+
+import logging
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Listener ranges for each tier; an artist is in a tier if both its start and end counts are
+TIER_RANGES = {
+    'micro': (0, 1000),
+    'small': (1001, 3000),
+    'medium': (3001, 15000),
+    'large': (15001, 50000),
+    'major': (50001, None)
+}
+
+SORT_KEYS = ('change', 'percent_change', 'velocity')
+WINDOWS = ('7d', '30d', '90d', 'month', 'ytd', 'custom')
+MAX_PER_PAGE = 100
+
+
+def resolve_window(window: str = '30d', start: Optional[str] = None, end: Optional[str] = None,
+                   today: Optional[date] = None) -> tuple[date, date]:
+    """
+    Resolve a named or custom window to inclusive start/end dates.
+
+    Args:
+        window: One of WINDOWS
+        start: Start date (YYYY-MM-DD), required for 'custom'
+        end: End date (YYYY-MM-DD), defaults to today
+        today: Reference date (defaults to the current date)
+
+    Returns:
+        Tuple of (start_date, end_date)
+
+    Raises:
+        ValueError: If the window is unknown or the dates are invalid
+    """
+    today = today or date.today()
+    end_date = datetime.strptime(end, "%Y-%m-%d").date() if end else today
+
+    if window == 'custom':
+        if not start:
+            raise ValueError("A custom window needs a start date")
+        start_date = datetime.strptime(start, "%Y-%m-%d").date()
+    elif window == 'month':
+        start_date = end_date.replace(day=1)
+    elif window == 'ytd':
+        start_date = end_date.replace(month=1, day=1)
+    elif window in ('7d', '30d', '90d'):
+        start_date = end_date - timedelta(days=int(window[:-1]))
+    else:
+        raise ValueError(f"Unknown window: {window}")
+
+    if start_date > end_date:
+        raise ValueError("Window start must not be after its end")
+    return start_date, end_date
+
+
+class LeaderboardQueryEngine:
+    """Vectorized leaderboard queries over the DataService listener history."""
+
+    def __init__(self, data_service):
+        self.data_service = data_service
+        self._source_data = None
+        self._followed_signature = None
+        self._columns = None
+        self._artists = None
+
+    def _followed_file_signature(self) -> Optional[tuple]:
+        try:
+            return self.data_service.storage.collection_signature('followed_artists')
+        except Exception:
+            return None
+
+    def _ensure_built(self):
+        """Refresh the column arrays and artist metadata when the listener data or followed artists change."""
+        dataset = self.data_service._get_dataset()
+        followed_signature = self._followed_file_signature()
+        if self._columns is not None and dataset is self._source_data and followed_signature == self._followed_signature:
+            return
+
+        # Both dataset kinds keep their columns sorted by (artist, day); with the shared
+        # snapshot the row arrays are views onto the memory-mapped file
+        columns = dataset.columns()
+        artist_ids = columns["artist_ids"]
+        names = columns["names"]
+
+        followed = {}
+        for artist in self.data_service.load_followed_artists():
+            artist_id = artist.get("artist_id") or self.data_service.get_artist_id_from_url(artist.get("url", ""))
+            if artist_id:
+                followed[artist_id] = artist
+
+        artists = pd.DataFrame({
+            "artist_id": artist_ids,
+            "artist": names,
+            "source": [followed.get(artist_id, {}).get("source") for artist_id in artist_ids],
+            # date_added is stored as either YYYY-MM-DD or YYYY-MM-DD HH:MM:SS
+            "date_added": [(followed.get(artist_id, {}).get("date_added") or "")[:10] or None for artist_id in artist_ids]
+        })
+
+        self._columns = columns
+        self._artists = artists
+        self._source_data = dataset
+        self._followed_signature = followed_signature
+        logger.info(f"Built leaderboard query columns: {len(columns['artist'])} rows, {len(artists)} artists")
+
+    def query(self, window: str = '30d', start: Optional[str] = None, end: Optional[str] = None,
+              tier: str = 'all', source: Optional[Union[str, Sequence[str]]] = None,
+              added_from: Optional[str] = None, added_to: Optional[str] = None,
+              sort: str = 'percent_change', order: str = 'desc',
+              page: int = 1, per_page: int = 25) -> Dict[str, Any]:
+        """
+        Run a leaderboard query.
+
+        Each artist's change is measured from its first to its last data point inside
+        the window; artists with fewer than two points are left out, as are artists that
+        start at zero or stay under 50 listeners (same rules as the materialized leaderboards).
+
+        Args:
+            window: One of WINDOWS ('custom' uses start/end)
+            start: Custom window start (YYYY-MM-DD)
+            end: Window end (YYYY-MM-DD), defaults to today
+            tier: 'all' or a key of TIER_RANGES
+            source: Followed-artist source (or list of sources) to include
+            added_from: Only artists whose date_added is on or after this date
+            added_to: Only artists whose date_added is on or before this date
+            sort: One of SORT_KEYS; velocity is listeners gained per day
+            order: 'desc' (biggest gains first) or 'asc' (biggest losses first)
+            page: 1-based page number
+            per_page: Rows per page (capped at MAX_PER_PAGE)
+
+        Returns:
+            Dictionary with the page of results and pagination metadata
+
+        Raises:
+            ValueError: If a parameter is invalid
+        """
+        if sort not in SORT_KEYS:
+            raise ValueError(f"Unknown sort key: {sort}")
+        if tier != 'all' and tier not in TIER_RANGES:
+            raise ValueError(f"Unknown tier: {tier}")
+        if order not in ('asc', 'desc'):
+            raise ValueError(f"Unknown order: {order}")
+        start_date, end_date = resolve_window(window, start, end)
+        page = max(1, int(page))
+        per_page = min(max(1, int(per_page)), MAX_PER_PAGE)
+
+        self._ensure_built()
+        columns = self._columns
+
+        # Rows inside the window with a listener count, still sorted by (artist, day)
+        in_window = (columns["day"] >= np.datetime64(start_date)) & (columns["day"] <= np.datetime64(end_date))
+        in_window &= columns["listeners"] >= 0
+        artist = columns["artist"][in_window]
+        day = columns["day"][in_window]
+        listeners = columns["listeners"][in_window]
+
+        response = {
+            'results': [], 'total': 0, 'page': page, 'per_page': per_page, 'pages': 0,
+            'start_date': start_date.isoformat(), 'end_date': end_date.isoformat(),
+            'sort': sort, 'order': order, 'tier': tier
+        }
+        if len(artist) == 0:
+            return response
+
+        # First and last row of every artist run
+        boundaries = np.flatnonzero(np.diff(artist)) + 1
+        firsts = np.concatenate(([0], boundaries))
+        lasts = np.concatenate((boundaries - 1, [len(artist) - 1]))
+
+        codes = artist[firsts]
+        start_listeners = listeners[firsts]
+        end_listeners = listeners[lasts]
+        elapsed_days = (day[lasts] - day[firsts]).astype(np.int64)
+
+        keep = (lasts > firsts) & (start_listeners > 0) & ~((start_listeners < 50) & (end_listeners < 50))
+
+        if tier != 'all':
+            low, high = TIER_RANGES[tier]
+            keep &= (start_listeners >= low) & (end_listeners >= low)
+            if high is not None:
+                keep &= (start_listeners <= high) & (end_listeners <= high)
+
+        artists = self._artists
+        if source:
+            sources = [source] if isinstance(source, str) else list(source)
+            keep &= artists["source"].isin(sources).to_numpy()[codes]
+        if added_from or added_to:
+            date_added = artists["date_added"].to_numpy(dtype=object)[codes]
+            has_date = np.array([value is not None for value in date_added], dtype=bool)
+            cohort = has_date.copy()
+            if added_from:
+                cohort[has_date] &= date_added[has_date] >= added_from
+            if added_to:
+                cohort[has_date] &= date_added[has_date] <= added_to
+            keep &= cohort
+
+        codes = codes[keep]
+        start_listeners = start_listeners[keep]
+        end_listeners = end_listeners[keep]
+        elapsed_days = elapsed_days[keep]
+
+        change = end_listeners - start_listeners
+        metrics = {
+            'change': change.astype(np.float64),
+            'percent_change': change / start_listeners * 100,
+            'velocity': change / np.maximum(elapsed_days, 1)
+        }
+
+        sort_values = metrics[sort] if order == 'asc' else -metrics[sort]
+        ordering = np.argsort(sort_values, kind='stable')
+        total = len(ordering)
+        page_rows = ordering[(page - 1) * per_page: page * per_page]
+
+        artist_ids = artists["artist_id"].to_numpy(dtype=object)
+        names = artists["artist"].to_numpy(dtype=object)
+        sources = artists["source"].to_numpy(dtype=object)
+        added = artists["date_added"].to_numpy(dtype=object)
+        urls = columns["urls"]
+
+        results = []
+        for rank, i in enumerate(page_rows, start=(page - 1) * per_page + 1):
+            code = codes[i]
+            results.append({
+                'rank': rank,
+                'artist': names[code],
+                'artist_id': artist_ids[code],
+                'slug': self.data_service.slugify(names[code]),
+                'start': int(start_listeners[i]),
+                'end': int(end_listeners[i]),
+                'change': int(change[i]),
+                'percent_change': float(metrics['percent_change'][i]),
+                'velocity': float(metrics['velocity'][i]),
+                'days': int(elapsed_days[i]),
+                'source': sources[code],
+                'date_added': added[code],
+                'artist_url': urls[code]
+            })
+
+        response.update({'results': results, 'total': total, 'pages': -(-total // per_page)})
+        return response
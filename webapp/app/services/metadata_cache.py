@@ -0,0 +1,199 @@
+"""
+Persistent, bounded cache for Spotify artist metadata.
+
+Artist images, artist info and top tracks are stored in a small SQLite database (WAL
+mode) next to the data files, so every gunicorn worker reads the same entries and a
+restarted container keeps them. Entries expire after a TTL; failed lookups are cached
+as negative entries with a much shorter TTL so they are retried soon. Expired entries
+are kept for a grace period so they can still be served while the Spotify API is
+unavailable. Once the cache holds more than max_entries, the least recently used
+entries are evicted.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import itertools
+import logging
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS metadata_cache (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    negative INTEGER NOT NULL DEFAULT 0,
+    expires_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+);
+CREATE INDEX IF NOT EXISTS idx_metadata_cache_accessed ON metadata_cache (accessed_at);
+"""
+
+DEFAULT_TTL = 7 * 24 * 3600  # 1 week
+DEFAULT_NEGATIVE_TTL = 10 * 60  # 10 minutes
+DEFAULT_MAX_ENTRIES = 50000
+STALE_GRACE = 30 * 24 * 3600  # Expired entries are dropped after 30 days
+
+# Reads only refresh an entry's LRU timestamp once per interval, to keep reads from writing
+TOUCH_INTERVAL = 300
+# Eviction runs every EVICT_EVERY writes rather than on each one
+EVICT_EVERY = 100
+
+# SQLite needs at least one parameter slot per key in an IN (...) query
+_MAX_KEYS_PER_QUERY = 500
+
+_memory_ids = itertools.count()
+
+MISS = object()  # Returned by get() when there is no fresh entry
+
+
+class MetadataCache:
+    """SQLite-backed LRU/TTL cache shared by every process that opens the same file."""
+
+    def __init__(self, path: Optional[str] = None, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 ttl: float = DEFAULT_TTL, negative_ttl: float = DEFAULT_NEGATIVE_TTL):
+        """
+        Args:
+            path: Database file; None keeps the cache in memory for this process only
+            max_entries: Size cap across all namespaces
+            ttl: Seconds a successful lookup stays fresh
+            negative_ttl: Seconds a failed lookup is remembered
+        """
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._uri = f"file:{os.path.abspath(path)}"
+        else:
+            self._uri = f"file:metadata-cache-{next(_memory_ids)}?mode=memory&cache=shared"
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._local = threading.local()  # One connection per request thread
+        self._writes = 0
+        # An in-memory database lives only as long as one of its connections is open
+        self._keepalive = self._conn()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self._uri, uri=True, timeout=10, isolation_level=None, check_same_thread=False)
+            if self.path:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def get(self, namespace: str, key: str, include_expired: bool = False) -> Any:
+        """
+        Return a fresh cached value, or MISS.
+
+        Args:
+            namespace: Kind of entry ('image', 'info', 'top_tracks', ...)
+            key: Entry key
+            include_expired: Also return expired entries (for serving stale data)
+
+        Returns:
+            The cached value (including cached negative results), or MISS
+        """
+        return self.get_many(namespace, [key], include_expired).get(key, MISS)
+
+    def get_many(self, namespace: str, keys: Iterable[str], include_expired: bool = False) -> Dict[str, Any]:
+        """
+        Return the fresh cached values for several keys in one query.
+
+        Returns:
+            Dictionary of key -> value for the keys that have a fresh (or, with
+            include_expired, any) entry
+        """
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return {}
+
+        now = time.time()
+        found = {}
+        stale_touch = []
+        try:
+            conn = self._conn()
+            for start in range(0, len(keys), _MAX_KEYS_PER_QUERY):
+                chunk = keys[start:start + _MAX_KEYS_PER_QUERY]
+                rows = conn.execute(
+                    f"SELECT key, value, expires_at, accessed_at FROM metadata_cache "
+                    f"WHERE namespace = ? AND key IN ({','.join('?' * len(chunk))})",
+                    [namespace, *chunk])
+                for key, value, expires_at, accessed_at in rows:
+                    if expires_at <= now and not include_expired:
+                        continue
+                    found[key] = json.loads(value)
+                    if now - accessed_at > TOUCH_INTERVAL:
+                        stale_touch.append(key)
+
+            if stale_touch:
+                conn.executemany("UPDATE metadata_cache SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                                 [(now, namespace, key) for key in stale_touch])
+        except sqlite3.Error as e:
+            logger.warning(f"Metadata cache read failed: {e}")
+        return found
+
+    def set(self, namespace: str, key: str, value: Any, negative: bool = False):
+        """
+        Store a value.
+
+        Args:
+            namespace: Kind of entry
+            key: Entry key
+            value: JSON-serializable value
+            negative: Whether this records a failed lookup (uses the short negative TTL)
+        """
+        self.set_many(namespace, {key: value}, negative)
+
+    def set_many(self, namespace: str, values: Dict[str, Any], negative: bool = False):
+        """Store several values in one transaction."""
+        if not values:
+            return
+        now = time.time()
+        expires_at = now + (self.negative_ttl if negative else self.ttl)
+        rows = [(namespace, key, json.dumps(value), int(negative), expires_at, now)
+                for key, value in values.items()]
+        try:
+            conn = self._conn()
+            conn.executemany(
+                "INSERT OR REPLACE INTO metadata_cache (namespace, key, value, negative, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)", rows)
+            self._writes += len(rows)
+            if self._writes >= EVICT_EVERY:
+                self._writes = 0
+                self.evict()
+        except sqlite3.Error as e:
+            logger.warning(f"Metadata cache write failed: {e}")
+
+    def evict(self) -> int:
+        """
+        Drop entries expired for longer than STALE_GRACE, then the least recently used
+        ones beyond max_entries.
+
+        Returns:
+            Number of entries removed
+        """
+        conn = self._conn()
+        removed = conn.execute("DELETE FROM metadata_cache WHERE expires_at <= ?",
+                               (time.time() - STALE_GRACE,)).rowcount
+        count = conn.execute("SELECT COUNT(*) FROM metadata_cache").fetchone()[0]
+        if count > self.max_entries:
+            removed += conn.execute(
+                "DELETE FROM metadata_cache WHERE rowid IN "
+                "(SELECT rowid FROM metadata_cache ORDER BY accessed_at LIMIT ?)",
+                (count - self.max_entries,)).rowcount
+        if removed:
+            logger.info(f"Evicted {removed} metadata cache entries")
+        return removed
+
+    def stats(self) -> Tuple[int, int]:
+        """Return (entries, negative entries)."""
+        row = self._conn().execute("SELECT COUNT(*), COALESCE(SUM(negative), 0) FROM metadata_cache").fetchone()
+        return row[0], row[1]
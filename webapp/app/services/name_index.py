@@ -0,0 +1,141 @@
+"""
+Artist name index for autocomplete.
+
+Built once per data version over the distinct artist names (not the per-day history
+rows), so lookups cost the same however many days have been scraped:
+
+- a prefix trie over each normalized name and each of its word suffixes ("swift" finds
+  "Taylor Swift"), stored compactly as one sorted key array searched with bisect;
+- a trigram index (trigram -> name IDs) for substring matches and, for longer queries,
+  misspellings.
+
+Results are ranked: exact name, name prefix, word prefix, substring, then fuzzy
+matches; ties go to the heavier name (e.g. more monthly listeners), then alphabetically.
+"""
+
+import bisect
+import threading
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+from .search_cache import normalize_query
+
+EXACT, PREFIX, WORD_PREFIX, SUBSTRING, FUZZY = range(5)
+
+SHORT_QUERY_LENGTH = 2  # Results for queries this short are memoized (their key ranges are large)
+FUZZY_MIN_LENGTH = 4  # Shorter queries have too few trigrams to match misspellings reliably
+FUZZY_MIN_SHARE = 0.6  # Share of the query's trigrams a fuzzy match must contain
+
+
+def trigrams(text: str) -> List[str]:
+    """Return the distinct trigrams of a normalized string."""
+    return list(dict.fromkeys(text[i:i + 3] for i in range(len(text) - 2)))
+
+
+class NameIndex:
+    """Immutable prefix trie + trigram index over a set of names."""
+
+    def __init__(self, names: Dict[str, float]):
+        """
+        Args:
+            names: Name -> ranking weight (higher ranks first among equally good matches)
+        """
+        # Name IDs follow ranking order, so sorting matches by (tier, ID) ranks them
+        ordered = sorted(((name, normalize_query(name)) for name in names if name),
+                         key=lambda item: (-(names[item[0]] or 0), item[1], item[0]))
+        self.names = [name for name, _ in ordered]
+        self._normalized = [normalized for _, normalized in ordered]
+
+        keys = []
+        trigram_ids: Dict[str, List[int]] = {}
+        for name_id, normalized in enumerate(self._normalized):
+            keys.append((normalized, name_id, 0))
+            for position in range(1, len(normalized)):
+                if normalized[position - 1] == " ":
+                    keys.append((normalized[position:], name_id, position))
+            for gram in trigrams(normalized):
+                trigram_ids.setdefault(gram, []).append(name_id)
+        keys.sort()
+        self._keys = [key for key, _, _ in keys]
+        self._key_ids = array('i', (name_id for _, name_id, _ in keys))
+        self._key_is_word = array('b', (position > 0 for _, _, position in keys))
+        self._trigrams = {gram: array('i', ids) for gram, ids in trigram_ids.items()}
+
+        self._short_results: Dict[Tuple[str, int], List[str]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def _prefix_matches(self, query: str, tiers: Dict[int, int]):
+        start = bisect.bisect_left(self._keys, query)
+        end = bisect.bisect_left(self._keys, query + "\uffff", start)
+        for position in range(start, end):
+            name_id = self._key_ids[position]
+            if self._key_is_word[position]:
+                tier = WORD_PREFIX
+            elif self._normalized[name_id] == query:
+                tier = EXACT
+            else:
+                tier = PREFIX
+            if tier < tiers.get(name_id, FUZZY + 1):
+                tiers[name_id] = tier
+
+    def _substring_matches(self, query: str, tiers: Dict[int, int]):
+        grams = trigrams(query)
+        if grams:
+            postings = sorted((self._trigrams.get(gram, ()) for gram in grams), key=len)
+            candidates = postings[0]
+        else:
+            # One- and two-character queries have no trigram to narrow the candidates
+            candidates = range(len(self._normalized))
+        for name_id in candidates:
+            if name_id not in tiers and query in self._normalized[name_id]:
+                tiers[name_id] = SUBSTRING
+
+    def _fuzzy_matches(self, query: str, tiers: Dict[int, int]) -> Dict[int, int]:
+        grams = trigrams(query)
+        shared: Dict[int, int] = {}
+        for gram in grams:
+            for name_id in self._trigrams.get(gram, ()):
+                shared[name_id] = shared.get(name_id, 0) + 1
+        needed = max(2, int(len(grams) * FUZZY_MIN_SHARE + 0.999))
+        return {name_id: count for name_id, count in shared.items() if count >= needed and name_id not in tiers}
+
+    def search(self, query: str, limit: Optional[int] = 10) -> List[str]:
+        """
+        Return the best matching names for a query.
+
+        Args:
+            query: Search text (case and whitespace are ignored)
+            limit: Maximum number of names (None for all)
+
+        Returns:
+            List of names, best match first
+        """
+        query = normalize_query(query)
+        if not query:
+            return []
+
+        short = len(query) <= SHORT_QUERY_LENGTH
+        if short:
+            with self._lock:
+                cached = self._short_results.get((query, limit))
+            if cached is not None:
+                return list(cached)
+
+        tiers: Dict[int, int] = {}
+        self._prefix_matches(query, tiers)
+        if limit is None or len(tiers) < limit:
+            self._substring_matches(query, tiers)
+        ranked = sorted(tiers, key=lambda name_id: (tiers[name_id], name_id))
+
+        if len(query) >= FUZZY_MIN_LENGTH and (limit is None or len(ranked) < limit):
+            fuzzy = self._fuzzy_matches(query, tiers)
+            ranked.extend(sorted(fuzzy, key=lambda name_id: (-fuzzy[name_id], name_id)))
+
+        results = [self.names[name_id] for name_id in ranked[:limit]]
+        if short:
+            with self._lock:
+                self._short_results[(query, limit)] = results
+        return list(results)
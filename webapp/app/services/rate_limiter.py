@@ -0,0 +1,201 @@
+"""
+Rate-limit budget and circuit breaker for Spotify API calls.
+
+A token bucket caps how many API calls all gunicorn workers make per second, and a
+circuit breaker stops calling the API for a while after repeated failures (429s, 5xx
+responses, timeouts) or an explicit Retry-After. Both keep their state in small JSON
+files updated under an exclusive file lock, so every worker spends the same budget and
+sees the same breaker. Without a state path (or without fcntl, e.g. on Windows) the
+state is kept per process.
+
+Callers check the guard before each call and fail fast with ApiUnavailable instead of
+blocking on retries, so routes can render cached or placeholder data.
+"""
+
+import json
+import os
+import threading
+import time
+import logging
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+# Sharing the state between workers needs file locking, which is only available on POSIX
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class ApiUnavailable(Exception):
+    """Raised instead of calling the API while the budget is spent or the breaker is open."""
+
+
+class SharedState:
+    """JSON state dictionary updated atomically by every process that opens the same file."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path if path and fcntl is not None else None
+        self._lock = threading.Lock()
+        self._local_state: Dict[str, Any] = {}
+        if self.path:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+
+    @contextmanager
+    def update(self) -> Iterator[Dict[str, Any]]:
+        """Yield the state for a read-modify-write; changes are saved when the block exits."""
+        with self._lock:
+            if not self.path:
+                yield self._local_state
+                return
+
+            with open(self.path, 'a+') as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    f.seek(0)
+                    try:
+                        state = json.loads(f.read() or '{}')
+                    except ValueError:
+                        state = {}
+                    before = dict(state)
+                    yield state
+                    if state != before:
+                        f.seek(0)
+                        f.truncate()
+                        f.write(json.dumps(state))
+                        f.flush()
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class TokenBucket:
+    """Token bucket refilled at `rate` tokens per second, holding at most `capacity` tokens."""
+
+    def __init__(self, rate: float, capacity: float, state_path: Optional[str] = None,
+                 clock: Callable[[], float] = time.time):
+        self.rate = rate
+        self.capacity = capacity
+        self._state = SharedState(state_path)
+        self._clock = clock
+
+    def try_acquire(self, tokens: float = 1) -> bool:
+        """
+        Take tokens from the bucket without waiting.
+
+        Returns:
+            True if the tokens were available
+        """
+        now = self._clock()
+        with self._state.update() as state:
+            available = state.get('tokens', self.capacity)
+            elapsed = max(0.0, now - state.get('updated', now))
+            available = min(self.capacity, available + elapsed * self.rate)
+            acquired = available >= tokens
+            if acquired:
+                available -= tokens
+            state['tokens'] = available
+            state['updated'] = now
+        return acquired
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker: opens after `failure_threshold` consecutive failures (or when the API
+    asks us to back off) and lets a single trial call through after `reset_timeout` seconds.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30, state_path: Optional[str] = None,
+                 clock: Callable[[], float] = time.time):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = SharedState(state_path)
+        self._clock = clock
+
+    def allow(self) -> bool:
+        """
+        Check whether a call may go ahead.
+
+        While open, calls are refused until the open period ends; then one caller gets a
+        trial call (half-open) and the rest keep being refused until it reports back.
+        """
+        now = self._clock()
+        with self._state.update() as state:
+            open_until = state.get('open_until', 0)
+            if not open_until:
+                return True
+            if now < open_until:
+                return False
+            # Half-open: let one trial call through and hold the others off for a moment
+            state['open_until'] = now + self.reset_timeout
+            return True
+
+    def is_open(self) -> bool:
+        """Check whether calls are currently being refused (doesn't start a trial call)."""
+        with self._state.update() as state:
+            return self._clock() < state.get('open_until', 0)
+
+    def record_success(self):
+        """Record a successful call, closing the breaker."""
+        with self._state.update() as state:
+            if state.get('failures') or state.get('open_until'):
+                if state.get('open_until'):
+                    logger.info("Spotify API circuit closed")
+                state['failures'] = 0
+                state['open_until'] = 0
+
+    def record_failure(self, retry_after: Optional[float] = None):
+        """
+        Record a failed call.
+
+        Args:
+            retry_after: Seconds the API asked us to wait; opens the breaker for at least that long
+        """
+        now = self._clock()
+        with self._state.update() as state:
+            failures = state.get('failures', 0) + 1
+            state['failures'] = failures
+            open_for = None
+            if retry_after:
+                open_for = max(retry_after, self.reset_timeout if failures >= self.failure_threshold else 0)
+            elif failures >= self.failure_threshold:
+                open_for = self.reset_timeout
+            if open_for and now + open_for > state.get('open_until', 0):
+                state['open_until'] = now + open_for
+                logger.warning(f"Spotify API circuit open for {open_for:.0f}s after {failures} failures")
+
+
+class ApiGuard:
+    """Rate-limit budget plus circuit breaker in front of every API call."""
+
+    def __init__(self, rate: float = 10, burst: float = 20, failure_threshold: int = 5, reset_timeout: float = 30,
+                 state_dir: Optional[str] = None):
+        """
+        Args:
+            rate: Calls per second across all workers
+            burst: Calls that may be made at once after an idle period
+            failure_threshold: Consecutive failures that open the breaker
+            reset_timeout: Seconds the breaker stays open
+            state_dir: Directory for the shared state files (None keeps the state per process)
+        """
+        self.bucket = TokenBucket(rate, burst,
+                                  os.path.join(state_dir, 'spotify-api-budget.json') if state_dir else None)
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout,
+                                      os.path.join(state_dir, 'spotify-api-breaker.json') if state_dir else None)
+
+    def acquire(self):
+        """
+        Reserve one API call.
+
+        Raises:
+            ApiUnavailable: If the breaker is open or the budget is spent
+        """
+        if not self.breaker.allow():
+            raise ApiUnavailable("Spotify API circuit is open")
+        if not self.bucket.try_acquire():
+            raise ApiUnavailable("Spotify API rate budget exhausted")
+
+    def degraded(self) -> bool:
+        """Check whether calls are currently being refused by the breaker."""
+        return self.breaker.is_open()
@@ -0,0 +1,171 @@
+"""
+Indexed in-memory registry for the followed artists, suggestions and blacklist.
+
+Each collection is parsed once per change in storage (detected through the storage's
+collection signature: file mtime and size, or the SQLite write counter) and indexed by
+artist ID and lowercased name, so membership checks are O(1) dictionary lookups.
+Saves write through to storage and update the cached copy in place.
+"""
+
+import threading
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from .dataset import artist_id_from_url
+
+logger = logging.getLogger(__name__)
+
+
+def entry_keys(collection: str, item: Any) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Return the (artist ID, lowercased name) an entry is indexed under.
+
+    Args:
+        collection: 'followed_artists', 'suggestions' or 'blacklist'
+        item: Stored entry (a dict, or a bare name in legacy blacklists)
+
+    Returns:
+        Tuple of (artist_id or None, lowercased name or None)
+    """
+    if isinstance(item, str):
+        # Legacy blacklist format - just the artist name
+        return None, item.lower()
+    if not isinstance(item, dict):
+        return None, None
+
+    if collection == 'followed_artists':
+        # Older entries only carry the artist URL
+        artist_id = item.get("artist_id") or artist_id_from_url(item.get("url", ""))
+        name = item.get("artist_name")
+    elif collection == 'suggestions':
+        artist_id = item.get("spotify_id")
+        name = item.get("artist_name")
+    else:
+        artist_id = item.get("spotify_id")
+        name = item.get("name")
+
+    return artist_id or None, name.lower() if name else None
+
+
+class _Entry:
+    """Parsed collection with its indexes and the storage signature it was read at."""
+
+    __slots__ = ('signature', 'items', 'by_id', 'by_name')
+
+    def __init__(self, collection: str, items: List[Any], signature: Any):
+        self.signature = signature
+        self.items = items
+        self.by_id = {}
+        self.by_name = {}
+        for position, item in enumerate(items):
+            artist_id, name = entry_keys(collection, item)
+            if artist_id:
+                self.by_id.setdefault(artist_id, position)
+            if name:
+                self.by_name.setdefault(name, position)
+
+
+class CollectionRegistry:
+    """Cached, indexed view of the followed artists, suggestions and blacklist collections."""
+
+    def __init__(self, storage):
+        self.storage = storage
+        self._entries: Dict[str, _Entry] = {}
+        self._lock = threading.Lock()
+
+    def _signature(self, collection: str) -> Any:
+        try:
+            return self.storage.collection_signature(collection)
+        except Exception as e:
+            logger.error(f"Error reading {collection} signature: {e}")
+            return None
+
+    def _get(self, collection: str) -> _Entry:
+        """Return the cached entry, re-reading the collection if it changed in storage."""
+        signature = self._signature(collection)
+        entry = self._entries.get(collection)
+        if entry is not None and signature is not None and entry.signature == signature:
+            return entry
+
+        with self._lock:
+            entry = self._entries.get(collection)
+            if entry is not None and signature is not None and entry.signature == signature:
+                return entry
+            entry = _Entry(collection, self.storage.load_collection(collection), signature)
+            self._entries[collection] = entry
+            logger.info(f"Loaded {len(entry.items)} {collection} entries")
+            return entry
+
+    def load(self, collection: str) -> List[Any]:
+        """
+        Return a collection's entries.
+
+        Callers get their own copies of the list and its entries, so they can edit them
+        and pass them to save() without touching the cached copy.
+
+        Args:
+            collection: Collection name
+
+        Returns:
+            List of entries
+        """
+        return [item.copy() if isinstance(item, dict) else item for item in self._get(collection).items]
+
+    def save(self, collection: str, items: List[Any]):
+        """
+        Write a collection through to storage and update the cache.
+
+        Args:
+            collection: Collection name
+            items: Entries to store
+
+        Raises:
+            Exception: Whatever the storage backend raises; the cache is left untouched
+        """
+        items = [item.copy() if isinstance(item, dict) else item for item in items]
+        with self._lock:
+            self.storage.save_collection(collection, items)
+            self._entries[collection] = _Entry(collection, items, self._signature(collection))
+
+    def find(self, collection: str, name: Optional[str] = None, artist_id: Optional[str] = None) -> Optional[Any]:
+        """
+        Find an entry by artist ID or (case-insensitive) name.
+
+        Args:
+            collection: Collection name
+            name: Artist name
+            artist_id: Spotify artist ID
+
+        Returns:
+            Copy of the matching entry, or None
+        """
+        entry = self._get(collection)
+        position = entry.by_id.get(artist_id) if artist_id else None
+        if position is None and name:
+            position = entry.by_name.get(name.lower())
+        if position is None:
+            return None
+        item = entry.items[position]
+        return item.copy() if isinstance(item, dict) else item
+
+    def contains(self, collection: str, name: Optional[str] = None, artist_id: Optional[str] = None) -> bool:
+        """
+        Check whether a collection has an entry with the artist ID or (case-insensitive) name.
+
+        Args:
+            collection: Collection name
+            name: Artist name
+            artist_id: Spotify artist ID
+
+        Returns:
+            True if either key matches
+        """
+        entry = self._get(collection)
+        return bool((artist_id and artist_id in entry.by_id) or (name and name.lower() in entry.by_name))
+
+    def keys(self, collection: str) -> Tuple[List[str], List[str]]:
+        """
+        Return the indexed (lowercased names, artist IDs) of a collection.
+        """
+        entry = self._get(collection)
+        return list(entry.by_name), list(entry.by_id)
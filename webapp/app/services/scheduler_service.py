@@ -1,25 +1,198 @@
 """
 Scheduler service for automated daily scraping.
+
+Every gunicorn worker starts the scheduler, but only one of them - the leader - runs
+the scheduled jobs. Leadership is an exclusive fcntl lock on a lock file: the kernel
+releases it when the leader process dies, and the other workers retry every
+LEADER_CHECK_INTERVAL, so one of them takes over within that time. The schedule itself
+(and when each job last ran) lives in a small state file shared by every worker, so a
+schedule change made through any worker reaches the leader.
 """
 
+import json
+import os
 import schedule
-import time
 import threading
 import logging
-from datetime import datetime
-from typing import Optional
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from .atomic_file import atomic_write_json
+from .job_service import PRIORITY_SCHEDULED
 
 logger = logging.getLogger(__name__)
 
+LEADER_CHECK_INTERVAL = 15  # Seconds between leadership attempts and schedule checks
+MISSED_RUN_GRACE = timedelta(minutes=15)  # A new leader runs jobs its predecessor missed this recently
+
 class SchedulerService:
     """Service for scheduling automated scraping jobs."""
     
-    def __init__(self, job_service):
+    def __init__(self, job_service, metadata_refresher: Optional[Callable[[], None]] = None,
+                 metadata_refresh_time: str = "04:00", lock_path: Optional[str] = None,
+                 state_path: Optional[str] = None):
+        """
+        Args:
+            job_service: JobService the daily scrape is queued on
+            metadata_refresher: Nightly artist metadata refresh (optional)
+            metadata_refresh_time: HH:MM of the metadata refresh
+            lock_path: Leader lock file shared by every worker; None (or no fcntl) makes this
+                process the leader
+            state_path: Shared schedule state file; None keeps the schedule in this process
+        """
         self.job_service = job_service
         self.scheduler_thread: Optional[threading.Thread] = None
         self.is_running = False
         self.schedule_time = "02:00"  # Default to 2 AM
+        # Nightly bulk refresh of artist metadata (images, info, top tracks), after the scrape
+        self.metadata_refresher = metadata_refresher
+        self.metadata_refresh_time = metadata_refresh_time
+        self.metadata_thread: Optional[threading.Thread] = None
+        
+        self.lock_path = lock_path if lock_path and fcntl is not None else None
+        self.state_path = state_path
+        self.is_leader = False
+        self._leader_file = None
+        self._state_signature = None
+        self._stop_event = threading.Event()
+        # The schedule library's job registry isn't thread-safe: every use of it holds this lock
+        self._schedule_lock = threading.RLock()
+    
+    # Shared state
+    
+    def _state_file_signature(self) -> Optional[tuple]:
+        try:
+            stat = os.stat(self.state_path)
+            return (stat.st_mtime_ns, stat.st_size)
+        except (OSError, TypeError):
+            return None
+    
+    def _load_state(self) -> Dict[str, Any]:
+        """Read the shared schedule state ({} if there is none)."""
+        if not self.state_path:
+            return {}
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.error(f"Error reading scheduler state: {e}")
+            return {}
+    
+    def _update_state(self, **changes):
+        """Merge changes into the shared schedule state (read-modify-write under a lock)."""
+        if not self.state_path:
+            return
+        
+        os.makedirs(os.path.dirname(os.path.abspath(self.state_path)), exist_ok=True)
+        lock_file = open(self.state_path + '.lock', 'a') if fcntl is not None else None
+        try:
+            if lock_file is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            state = self._load_state()
+            for key, value in changes.items():
+                if isinstance(value, dict) and isinstance(state.get(key), dict):
+                    state[key] = {**state[key], **value}
+                else:
+                    state[key] = value
+            atomic_write_json(self.state_path, state)
+            self._state_signature = self._state_file_signature()
+        except Exception as e:
+            logger.error(f"Error saving scheduler state: {e}")
+        finally:
+            if lock_file is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+                lock_file.close()
+    
+    def _sync_schedule(self, force: bool = False):
+        """Pick up a schedule time changed through another worker."""
+        signature = self._state_file_signature()
+        if signature is None or (signature == self._state_signature and not force):
+            return
+        self._state_signature = signature
+        
+        schedule_time = self._load_state().get('schedule_time')
+        if schedule_time and schedule_time != self.schedule_time:
+            logger.info(f"Daily scraping schedule changed to {schedule_time}")
+            self.schedule_time = schedule_time
+            self._schedule_jobs()
+    
+    def _record_run(self, name: str):
+        """Remember when a scheduled job last ran, for a future leader's catch-up."""
+        self._update_state(last_runs={name: datetime.now().isoformat()})
+    
+    # Leadership
+    
+    def _try_become_leader(self) -> bool:
+        """Take the leader lock if no other worker holds it."""
+        if self.lock_path is None:
+            return True
+        
+        lock_file = open(self.lock_path, 'a+')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
         
+        # Record who leads, for the status page
+        lock_file.seek(0)
+        lock_file.truncate()
+        lock_file.write(str(os.getpid()))
+        lock_file.flush()
+        self._leader_file = lock_file
+        return True
+    
+    def _release_leadership(self):
+        if self._leader_file is not None:
+            fcntl.flock(self._leader_file, fcntl.LOCK_UN)
+            self._leader_file.close()
+            self._leader_file = None
+        self.is_leader = False
+    
+    def get_leader_pid(self) -> Optional[int]:
+        """Return the process ID of the scheduler leader, if known."""
+        if self.lock_path is None:
+            return os.getpid() if self.is_leader else None
+        try:
+            with open(self.lock_path, 'r') as f:
+                return int(f.read().strip() or 0) or None
+        except (OSError, ValueError):
+            return None
+    
+    def _scheduled_jobs(self):
+        """Return (name, HH:MM, function) of every daily job."""
+        jobs = [('daily_scrape', self.schedule_time, self._run_daily_scrape)]
+        if self.metadata_refresher:
+            jobs.append(('metadata_refresh', self.metadata_refresh_time, self._run_metadata_refresh))
+        return jobs
+    
+    def _run_missed_jobs(self):
+        """Run jobs that came due shortly before this worker took over and haven't run today."""
+        now = datetime.now()
+        last_runs = self._load_state().get('last_runs', {})
+        for name, time_str, run in self._scheduled_jobs():
+            due = datetime.combine(now.date(), datetime.strptime(time_str, '%H:%M').time())
+            last_run = last_runs.get(name)
+            if timedelta(0) <= now - due <= MISSED_RUN_GRACE and (not last_run or last_run < due.isoformat()):
+                logger.warning(f"Running {name} missed during the scheduler leader change")
+                run()
+    
+    # Scheduling
+    
+    def _schedule_jobs(self):
+        """(Re)register the daily jobs."""
+        with self._schedule_lock:
+            schedule.clear()
+            for _, time_str, run in self._scheduled_jobs():
+                schedule.every().day.at(time_str).do(run)
+    
     def set_schedule_time(self, time_str: str):
         """
         Set the daily schedule time.
@@ -34,9 +207,10 @@ class SchedulerService:
             logger.info(f"Daily scraping scheduled for {time_str}")
             
             # Clear existing schedule and set new one
-            schedule.clear()
-            schedule.every().day.at(self.schedule_time).do(self._run_daily_scrape)
-            
+            self._schedule_jobs()
+            # Share it with the leader (which may be another worker)
+            self._update_state(schedule_time=time_str)
+        
         except ValueError:
             logger.error(f"Invalid time format: {time_str}. Use HH:MM format.")
             raise
@@ -45,32 +219,52 @@ class SchedulerService:
         """Execute the daily scraping job."""
         try:
             logger.info("Starting automated daily scraping...")
+            self._record_run('daily_scrape')
             
             # Create a full scraping job (not today-only)
             job_id = self.job_service.create_scraping_job(
                 headless=True,  # Run in headless mode for automation
-                today_only=False  # Full scrape
+                today_only=False,  # Full scrape
+                priority=PRIORITY_SCHEDULED  # Manual scrapes waiting in the queue go first
             )
             
             if self.job_service.start_scraping_job(job_id):
-                logger.info(f"Daily scraping job started successfully. Job ID: {job_id}")
+                logger.info(f"Daily scraping job queued successfully. Job ID: {job_id}")
             else:
                 logger.error("Failed to start daily scraping job")
-                
+        
         except Exception as e:
             logger.error(f"Error during automated daily scraping: {e}")
     
+    def _run_metadata_refresh(self):
+        """Start the nightly artist metadata refresh in its own thread (it can take a while)."""
+        if self.metadata_thread and self.metadata_thread.is_alive():
+            logger.warning("Artist metadata refresh is still running; skipping this run")
+            return
+        self._record_run('metadata_refresh')
+        
+        def run():
+            try:
+                logger.info("Starting nightly artist metadata refresh...")
+                self.metadata_refresher()
+            except Exception as e:
+                logger.error(f"Error during artist metadata refresh: {e}")
+        
+        self.metadata_thread = threading.Thread(target=run, daemon=True)
+        self.metadata_thread.start()
+    
     def start_scheduler(self):
-        """Start the scheduler in a background thread."""
+        """Start the scheduler in a background thread (in every worker; only the leader runs jobs)."""
         if self.is_running:
             logger.warning("Scheduler is already running")
             return
         
-        # Set up the default schedule
-        schedule.clear()
-        schedule.every().day.at(self.schedule_time).do(self._run_daily_scrape)
+        # Set up the schedule (followers keep it too, for the next run time on the status page)
+        self._sync_schedule(force=True)
+        self._schedule_jobs()
         
         self.is_running = True
+        self._stop_event.clear()
         self.scheduler_thread = threading.Thread(target=self._scheduler_loop, daemon=True)
         self.scheduler_thread.start()
         
@@ -79,35 +273,65 @@ class SchedulerService:
     def stop_scheduler(self):
         """Stop the scheduler."""
         self.is_running = False
-        schedule.clear()
+        self._stop_event.set()
+        with self._schedule_lock:
+            schedule.clear()
         
         if self.scheduler_thread and self.scheduler_thread.is_alive():
             self.scheduler_thread.join(timeout=5)
+        self._release_leadership()
         
         logger.info("Scheduler stopped")
     
     def _scheduler_loop(self):
-        """Main scheduler loop."""
+        """Main scheduler loop: contend for leadership, and run due jobs while leading."""
         while self.is_running:
             try:
-                schedule.run_pending()
-                time.sleep(60)  # Check every minute
+                if not self.is_leader and self._try_become_leader():
+                    self.is_leader = True
+                    logger.info(f"Worker {os.getpid()} is now the scheduler leader")
+                    # Start from the shared schedule, and pick up a run the previous leader missed
+                    self._sync_schedule(force=True)
+                    self._schedule_jobs()
+                    self._run_missed_jobs()
+                
+                self._sync_schedule()
+                if self.is_leader:
+                    with self._schedule_lock:
+                        schedule.run_pending()
             except Exception as e:
                 logger.error(f"Error in scheduler loop: {e}")
-                time.sleep(60)
+            self._stop_event.wait(LEADER_CHECK_INTERVAL)
     
     def get_next_run_time(self):
-        """Get the next scheduled run time."""
-        jobs = schedule.get_jobs()
-        if jobs:
-            return jobs[0].next_run
+        """Get the next scheduled run time of the daily scrape."""
+        with self._schedule_lock:
+            jobs = schedule.get_jobs()
+            if jobs:
+                return jobs[0].next_run
         return None
     
     def get_status(self):
-        """Get scheduler status."""
+        """
+        Get scheduler status.
+        
+        Read-only, for request threads: the schedule time comes from the shared state (it may
+        have just been changed through another worker) and the job registry is left to the
+        scheduler thread.
+        """
+        schedule_time = self._load_state().get('schedule_time') or self.schedule_time
+        next_run = None
+        if self.is_running:
+            now = datetime.now()
+            next_run = datetime.combine(now.date(), datetime.strptime(schedule_time, '%H:%M').time())
+            if next_run <= now:
+                next_run += timedelta(days=1)
         return {
             'running': self.is_running,
-            'schedule_time': self.schedule_time,
-            'next_run': self.get_next_run_time().isoformat() if self.get_next_run_time() else None,
-            'jobs_count': len(schedule.get_jobs())
+            'schedule_time': schedule_time,
+            'next_run': next_run.isoformat() if next_run else None,
+            'metadata_refresh_time': self.metadata_refresh_time if self.metadata_refresher else None,
+            'jobs_count': len(self._scheduled_jobs()) if self.is_running else 0,
+            'leader': self.is_leader,
+            'leader_pid': self.get_leader_pid()
         }
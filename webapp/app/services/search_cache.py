@@ -0,0 +1,106 @@
+"""
+LRU/TTL cache for Spotify artist search (the autocomplete endpoint).
+
+Autocomplete sends a query per keystroke, so most queries extend one that was just
+searched. Entries are keyed by the normalized query (case-folded, whitespace collapsed)
+and the result limit. A miss can still be answered from a cached shorter prefix by
+filtering its results, when that prefix's results were complete (fewer than the limit)
+or the filtered results still fill enough of the list.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+DEFAULT_MAX_ENTRIES = 1000
+DEFAULT_TTL = 3600  # 1 hour
+MIN_PREFIX_LENGTH = 2  # Autocomplete only searches from two characters
+PREFIX_MIN_RESULTS = 5  # Filtered prefix results are only used if at least this many remain
+
+
+def normalize_query(query: str) -> str:
+    """Case-fold a query and collapse its whitespace."""
+    return " ".join((query or "").casefold().split())
+
+
+class SearchCache:
+    """Thread-safe, per-process LRU cache of search results with a TTL and prefix reuse."""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, ttl: float = DEFAULT_TTL,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[Tuple[str, int], Tuple[float, List[Dict[str, Any]]]]' = OrderedDict()
+        self.hits = 0
+        self.prefix_hits = 0
+        self.misses = 0
+
+    def _fresh(self, key: Tuple[str, int], now: float) -> Optional[Tuple[float, List[Dict[str, Any]]]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= now:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _store(self, key: Tuple[str, int], expires_at: float, results: List[Dict[str, Any]]):
+        self._entries[key] = (expires_at, results)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, query: str, limit: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        Return cached results for a query, from its own entry or a cached shorter prefix.
+
+        Args:
+            query: Search query (normalized here)
+            limit: Result limit the results were fetched with
+
+        Returns:
+            List of artist dictionaries, or None on a miss
+        """
+        query = normalize_query(query)
+        now = self._clock()
+        with self._lock:
+            entry = self._fresh((query, limit), now)
+            if entry is not None:
+                self.hits += 1
+                return list(entry[1])
+
+            for length in range(len(query) - 1, MIN_PREFIX_LENGTH - 1, -1):
+                entry = self._fresh((query[:length], limit), now)
+                if entry is None:
+                    continue
+                expires_at, results = entry
+                filtered = [artist for artist in results if query in normalize_query(artist.get("name", ""))]
+                if len(results) < limit or len(filtered) >= min(PREFIX_MIN_RESULTS, limit):
+                    # Remember the derived results until the prefix entry expires
+                    self._store((query, limit), expires_at, filtered)
+                    self.prefix_hits += 1
+                    return list(filtered)
+                break
+
+            self.misses += 1
+            return None
+
+    def set(self, query: str, limit: int, results: List[Dict[str, Any]]):
+        """Cache the results of a query."""
+        with self._lock:
+            self._store((normalize_query(query), limit), self._clock() + self.ttl, list(results))
+
+    def clear(self):
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Return entry and hit/miss counts."""
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits,
+                    'prefix_hits': self.prefix_hits, 'misses': self.misses}
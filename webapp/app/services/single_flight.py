@@ -0,0 +1,70 @@
+"""
+Single-flight coalescing of identical concurrent calls.
+
+When several request threads ask for the same thing at the same moment (the same
+artist's image on a busy leaderboard, the same search query), only the first thread
+makes the call; the others wait for it and share its result or exception.
+"""
+
+import threading
+from typing import Any, Callable, Dict, Hashable
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time; concurrent callers with the same key share it."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """
+        Run fn() unless a call for key is already in flight, in which case wait for that one.
+
+        Args:
+            key: Identifies identical calls
+            fn: The call to make
+
+        Returns:
+            fn's result (shared by every caller that joined the flight)
+
+        Raises:
+            Exception: Whatever fn raised, re-raised in every caller that joined the flight
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def in_flight(self) -> int:
+        """Return the number of calls currently in flight."""
+        with self._lock:
+            return len(self._calls)
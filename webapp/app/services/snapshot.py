@@ -0,0 +1,275 @@
+"""
+Binary listener snapshot shared by all gunicorn workers.
+
+The listener history is written once per data version to a compact binary file of
+column arrays sorted by (artist, day): artist codes, day numbers, listener counts, and
+name and URL indexes, plus a small JSON header with the per-artist ids, names and URLs
+and any extra stored fields of the (few) rows that have them. Each
+worker memory-maps the file read-only, so the operating system keeps a single copy of
+the data in the page cache no matter how many workers there are, and a refresh is an
+atomic file swap instead of a re-parse in every process.
+
+File layout:
+    8 bytes   magic (SMLSNAP1)
+    8 bytes   header length (little-endian uint64)
+    header    UTF-8 JSON
+    padding   to an 8-byte boundary
+    arrays    artist int32, day int64 (datetime64[D]), listeners int64, name int32, url int32 (-1: none)
+"""
+
+import json
+import mmap
+import os
+import struct
+import tempfile
+import logging
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from .dataset import ListenerRecord, column_series, day_string, normalize_date, day_number, slugify
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'SMLSNAP1'
+FORMAT_VERSION = 2
+
+ARRAY_DTYPES = (
+    ('artist', np.int32),
+    ('day', np.dtype('datetime64[D]')),
+    ('listeners', np.int64),
+    ('name', np.int32),
+    ('url', np.int32)
+)
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+def write_snapshot(dataset, path: str, source_signature: Any) -> int:
+    """
+    Write a dataset to a snapshot file, replacing any existing one atomically.
+
+    Args:
+        dataset: ListDataset to serialize
+        path: Snapshot file path
+        source_signature: Storage change token the dataset was read at
+
+    Returns:
+        Number of rows written
+    """
+    artist_codes = []
+    days = []
+    listeners = []
+    row_names = []
+    row_urls = []
+    row_extra = {}
+    artist_ids = []
+    names = []
+    urls = []
+    offsets = [0]
+    name_table = {}
+    url_table = {}
+
+    for code, (artist_id, rows) in enumerate(dataset.grouped_rows()):
+        artist_ids.append(artist_id)
+        names.append(rows[-1].get("artist_name", ""))
+        urls.append(rows[-1].get("artist_url") or rows[-1].get("url"))
+        for row in rows:
+            day = day_number(row.get("date"))
+            if day is None:
+                continue
+            artist_codes.append(code)
+            days.append(day)
+            value = row.get("monthly_listeners")
+            listeners.append(-1 if value is None else value)
+            row_names.append(name_table.setdefault(row.get("artist_name", ""), len(name_table)))
+            url = row.get("url")
+            row_urls.append(-1 if url is None else url_table.setdefault(url, len(url_table)))
+            extra = [[key, value] for key, value in row.items() if key not in ListenerRecord.FIELDS]
+            if extra:
+                row_extra[str(len(artist_codes) - 1)] = extra
+        offsets.append(len(artist_codes))
+
+    arrays = {
+        'artist': np.asarray(artist_codes, dtype=np.int32),
+        'day': np.asarray(days, dtype=np.int64).astype('datetime64[D]'),
+        'listeners': np.asarray(listeners, dtype=np.int64),
+        'name': np.asarray(row_names, dtype=np.int32),
+        'url': np.asarray(row_urls, dtype=np.int32)
+    }
+
+    layout = {}
+    position = 0
+    for name, _ in ARRAY_DTYPES:
+        layout[name] = [position, len(arrays[name])]
+        position = _align(position + arrays[name].nbytes)
+
+    header = json.dumps({
+        'format': FORMAT_VERSION,
+        'source_signature': source_signature,
+        'rows': len(artist_codes),
+        'artist_ids': artist_ids,
+        'names': names,
+        'urls': urls,
+        'offsets': offsets,
+        'row_names': list(name_table),
+        'row_urls': list(url_table),
+        'row_extra': row_extra,
+        'arrays': layout
+    }, ensure_ascii=False).encode('utf-8')
+    data_start = _align(16 + len(header))
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix='.snapshot-', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(MAGIC)
+            f.write(struct.pack('<Q', len(header)))
+            f.write(header)
+            for name, _ in ARRAY_DTYPES:
+                f.seek(data_start + layout[name][0])
+                f.write(arrays[name].tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    return len(artist_codes)
+
+
+def read_signature(path: str) -> Optional[Any]:
+    """
+    Return the source signature stored in a snapshot file, or None if it is missing or invalid.
+    """
+    try:
+        with open(path, 'rb') as f:
+            if f.read(8) != MAGIC:
+                return None
+            header_len, = struct.unpack('<Q', f.read(8))
+            header = json.loads(f.read(header_len))
+            # Files in an older format are rebuilt as if they were out of date
+            return header.get('source_signature') if header.get('format') == FORMAT_VERSION else None
+    except (OSError, ValueError, struct.error):
+        return None
+
+
+class Snapshot:
+    """Read-only, memory-mapped listener dataset with the same interface as ListDataset."""
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:8] != MAGIC:
+            raise ValueError(f"Not a listener snapshot: {path}")
+        header_len, = struct.unpack_from('<Q', self._mmap, 8)
+        header = json.loads(bytes(self._mmap[16:16 + header_len]))
+        if header.get('format') != FORMAT_VERSION:
+            raise ValueError(f"Unsupported snapshot format: {header.get('format')}")
+        data_start = _align(16 + header_len)
+
+        self.path = path
+        self.source_signature = header['source_signature']
+        self._artist_ids = header['artist_ids']
+        self._names = header['names']
+        self._urls = header['urls']
+        self._offsets = header['offsets']
+        self._row_names = header['row_names']
+        self._row_urls = header['row_urls']
+        self._row_extra = {int(index): tuple(map(tuple, extra)) for index, extra in header['row_extra'].items()}
+        self._arrays = {}
+        for name, dtype in ARRAY_DTYPES:
+            offset, count = header['arrays'][name]
+            if count == 0:
+                # An empty dataset ends at the header, so there is nothing to map
+                self._arrays[name] = np.empty(0, dtype=dtype)
+                continue
+            # Zero-copy views onto the shared mapping
+            self._arrays[name] = np.frombuffer(self._mmap, dtype=dtype, count=count, offset=data_start + offset)
+
+        self._codes = {artist_id: code for code, artist_id in enumerate(self._artist_ids)}
+        self._artist_ids_by_slug = {}
+        for artist_id, name in zip(self._artist_ids, self._names):
+            self._artist_ids_by_slug.setdefault(slugify(name or "artist"), []).append(artist_id)
+        self._columns = None
+
+    def __len__(self) -> int:
+        return len(self._arrays['artist'])
+
+    def _row(self, index: int) -> ListenerRecord:
+        code = int(self._arrays['artist'][index])
+        listeners = int(self._arrays['listeners'][index])
+        url = int(self._arrays['url'][index])
+        return ListenerRecord(
+            self._row_urls[url] if url >= 0 else None,
+            self._row_names[self._arrays['name'][index]],
+            listeners if listeners >= 0 else None,
+            str(self._arrays['day'][index]),
+            self._artist_ids[code],
+            self._row_extra.get(index, ())
+        )
+
+    def _rows(self, start: int, end: int) -> List[ListenerRecord]:
+        return [self._row(i) for i in range(start, end)]
+
+    def records(self) -> List[ListenerRecord]:
+        """Materialize every row as a dictionary (expensive; prefer the lookups)."""
+        return self._rows(0, len(self))
+
+    def grouped_rows(self) -> Iterable[tuple]:
+        """Yield (artist_id, rows oldest first) for every artist."""
+        for code, artist_id in enumerate(self._artist_ids):
+            yield artist_id, self._rows(self._offsets[code], self._offsets[code + 1])
+
+    def artist_history(self, artist_id: str) -> List[ListenerRecord]:
+        """Return an artist's rows, oldest first."""
+        code = self._codes.get(artist_id)
+        if code is None:
+            return []
+        return self._rows(self._offsets[code], self._offsets[code + 1])
+
+    def latest(self, artist_id: str) -> Optional[ListenerRecord]:
+        """Return an artist's most recent row, or None."""
+        code = self._codes.get(artist_id)
+        if code is None or self._offsets[code + 1] == self._offsets[code]:
+            return None
+        return self._row(self._offsets[code + 1] - 1)
+
+    def artist_ids_by_slug(self, slug: str) -> List[str]:
+        """Return the artist IDs whose current name slugifies to slug."""
+        return list(self._artist_ids_by_slug.get(slug, []))
+
+    def entries_for_date(self, date_str: str) -> List[ListenerRecord]:
+        """Return every row recorded on a date."""
+        day = day_number(normalize_date(date_str))
+        if day is None:
+            return []
+        matches = np.flatnonzero(self._arrays['day'] == np.datetime64(day_string(day)))
+        return [self._row(i) for i in matches]
+
+    def artist_names(self) -> set:
+        """Return every distinct artist name in the history."""
+        return {name for name in self._row_names if name}
+
+    def series(self, artist_id: str) -> Dict[str, np.ndarray]:
+        """Return an artist's history as slices of the shared column arrays (see ListDataset.series)."""
+        return column_series(self.columns(), artist_id)
+
+    def columns(self) -> Dict[str, Any]:
+        """Return the column arrays (see ListDataset.columns); the row arrays are shared mappings."""
+        if self._columns is None:
+            self._columns = {
+                'artist': self._arrays['artist'],
+                'day': self._arrays['day'],
+                'listeners': self._arrays['listeners'],
+                'artist_ids': self._artist_ids,
+                'names': self._names,
+                'urls': self._urls,
+                'offsets': self._offsets,
+                'codes': self._codes
+            }
+        return self._columns
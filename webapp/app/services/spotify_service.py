@@ -6,30 +6,72 @@ import spotipy
 from spotipy.oauth2 import SpotifyOAuth, SpotifyClientCredentials
 import requests
 from flask import session
+import time
 import logging
+from datetime import datetime
+
+from .artist_metadata import ArtistMetadataStore
+from .http_session import create_session, DEFAULT_TIMEOUT
+from .metadata_cache import MetadataCache, MISS
+from .rate_limiter import ApiGuard, ApiUnavailable
+from .search_cache import SearchCache, normalize_query
+from .single_flight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_ARTIST_IMAGE = "/static/default-artist.png"
+ARTISTS_BATCH_SIZE = 50  # Maximum IDs per /v1/artists?ids= request
+BULK_MAX_WAIT = 60  # Seconds a bulk refresh waits for rate budget before giving up
+
+
+def _retry_after(headers):
+    """Return the Retry-After header value in seconds, or None."""
+    try:
+        return float((headers or {}).get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+
 class SpotifyService:
     """Service class for Spotify API interactions."""
     
-    def __init__(self, client_id, client_secret, redirect_uri, scope):
+    def __init__(self, client_id, client_secret, redirect_uri, scope, cache=None, http_session=None,
+                 timeout=DEFAULT_TIMEOUT, guard=None, metadata_store=None, search_cache=None):
         self.client_id = client_id
         self.client_secret = client_secret
         self.redirect_uri = redirect_uri
         self.scope = scope
-        self._image_cache = {}
+        # Artist images ('image'), info ('info') and top tracks ('top_tracks'); pass a
+        # file-backed MetadataCache to share entries across workers and restarts
+        self.cache = cache or MetadataCache()
+        # Pooled keep-alive session with bounded retries, shared by raw requests and spotipy
+        self.http_session = http_session or create_session()
+        self.timeout = timeout  # (connect, read) seconds for every API call
+        # Rate-limit budget and circuit breaker in front of the artist lookups
+        self.guard = guard or ApiGuard()
+        # Concurrent identical lookups (same artist, query or top-tracks key) share one call
+        self._flights = SingleFlight()
+        # Metadata refreshed nightly for every followed artist; read before the cache and the API
+        self.metadata_store = metadata_store if metadata_store is not None else ArtistMetadataStore()
+        # Autocomplete search results by normalized query, reused for longer queries
+        self.search_cache = search_cache if search_cache is not None else SearchCache()
         self._public_client = None
     
+    def _client(self, **kwargs):
+        """Create a spotipy client that uses the shared session and timeouts."""
+        return spotipy.Spotify(requests_session=self.http_session, requests_timeout=self.timeout, **kwargs)
+    
     def get_public_client(self):
         """Get a public Spotify client using client credentials flow."""
         if not self._public_client:
             try:
                 client_credentials_manager = SpotifyClientCredentials(
                     client_id=self.client_id,
-                    client_secret=self.client_secret
+                    client_secret=self.client_secret,
+                    requests_session=self.http_session,
+                    requests_timeout=self.timeout
                 )
-                self._public_client = spotipy.Spotify(client_credentials_manager=client_credentials_manager)
+                self._public_client = self._client(client_credentials_manager=client_credentials_manager)
             except Exception as e:
                 logger.error(f"Failed to create public Spotify client: {e}")
                 return None
@@ -44,6 +86,8 @@ class SpotifyService:
             redirect_uri=self.redirect_uri,
             scope=self.scope,
             cache_path=None,  # Use session storage instead
+            requests_session=self.http_session,
+            requests_timeout=self.timeout,
             show_dialog=show_dialog
         )
     
@@ -74,7 +118,7 @@ class SpotifyService:
                 session.pop('spotify_token', None)
                 return None
         
-        return spotipy.Spotify(auth=token_info['access_token'])
+        return self._client(auth=token_info['access_token'])
     
     def get_auth_url(self, force_login=False):
         """Get Spotify OAuth authorization URL."""
@@ -127,7 +171,7 @@ class SpotifyService:
         
         # Test the token by making a simple API call
         try:
-            sp = spotipy.Spotify(auth=token_info['access_token'])
+            sp = self._client(auth=token_info['access_token'])
             user = sp.current_user()
             
             # Debug logging to see which account we're actually authenticated as
@@ -148,6 +192,98 @@ class SpotifyService:
             session.pop('spotify_token', None)
             return {"authenticated": False}
     
+    def _call(self, fn, *args, **kwargs):
+        """
+        Make one Spotify API call through the rate-limit budget and circuit breaker.
+        
+        Raises:
+            ApiUnavailable: If the call was refused (nothing was sent)
+            Exception: Whatever the call raised; 429s, 5xx responses and network errors
+                also count as breaker failures (as do 429/5xx responses returned by raw requests)
+        """
+        self.guard.acquire()
+        try:
+            result = fn(*args, **kwargs)
+        except spotipy.SpotifyException as e:
+            if e.http_status == 429 or (e.http_status or 0) >= 500:
+                self.guard.breaker.record_failure(_retry_after(getattr(e, 'headers', None)))
+            else:
+                self.guard.breaker.record_success()
+            raise
+        except (requests.RequestException, OSError):
+            self.guard.breaker.record_failure()
+            raise
+        
+        status = result.status_code if isinstance(result, requests.Response) else None
+        if status is not None and (status == 429 or status >= 500):
+            self.guard.breaker.record_failure(_retry_after(result.headers))
+        else:
+            self.guard.breaker.record_success()
+        return result
+    
+    def _request(self, description, call):
+        """
+        Run call(client) with the public client, falling back to the authenticated client.
+        
+        Args:
+            description: What is being fetched, for log messages
+            call: Callable taking a spotipy client and returning the API response
+        
+        Returns:
+            The API response, or None if both clients failed
+        
+        Raises:
+            ApiUnavailable: If the API is degraded (rate budget spent or circuit open)
+        """
+        # Try public client first (works without session context)
+        sp_public = self.get_public_client()
+        if sp_public:
+            try:
+                return self._call(call, sp_public)
+            except ApiUnavailable:
+                raise
+            except Exception as e:
+                logger.debug(f"Public client failed for {description}: {e}")
+        
+        # Fallback to authenticated client if public client fails
+        try:
+            sp = self.get_authenticated_client()
+        except RuntimeError:
+            # No session context, skip authenticated client
+            sp = None
+        if sp:
+            try:
+                return self._call(call, sp)
+            except ApiUnavailable:
+                raise
+            except Exception as e:
+                logger.debug(f"Authenticated client failed for {description}: {e}")
+        
+        return None
+    
+    def _fetch_artist(self, artist_id):
+        """Fetch one artist object, sharing the call with concurrent lookups of the same artist."""
+        return self._flights.do(
+            ('artist', artist_id),
+            lambda: self._request(f"artist {artist_id}", lambda sp: sp.artist(artist_id)))
+    
+    def _cached_fallback(self, namespace, key, placeholder):
+        """Return an expired cache entry if there is one, else the placeholder (used while degraded)."""
+        stale = self.cache.get(namespace, key, include_expired=True)
+        return placeholder if stale is MISS else stale
+    
+    def _remember_failure(self, namespace, key, placeholder):
+        """
+        Cache a failed lookup briefly (to avoid repeated API calls) and return the placeholder.
+        An expired entry is served instead and left in place, so a transient failure never
+        replaces real data with the placeholder.
+        """
+        stale = self.cache.get(namespace, key, include_expired=True)
+        if stale is not MISS:
+            return stale
+        self.cache.set(namespace, key, placeholder, negative=True)
+        return placeholder
+    
     def fetch_artist_image(self, artist_id, bearer_token=None):
         """
         Fetch artist image from Spotify API with caching.
@@ -161,11 +297,16 @@ class SpotifyService:
         """
         if not artist_id:
             logger.warning("No artist_id provided for image fetch")
-            return "/static/default-artist.png"
+            return DEFAULT_ARTIST_IMAGE
+        
+        # Check the bulk metadata store, then the cache
+        stored = self.metadata_store.get(artist_id)
+        if stored and stored.get("info"):
+            return stored["info"].get("image") or DEFAULT_ARTIST_IMAGE
         
-        # Check cache first
-        if artist_id in self._image_cache:
-            return self._image_cache[artist_id]
+        cached = self.cache.get('image', artist_id)
+        if cached is not MISS:
+            return cached
         
         try:
             artist_data = None
@@ -173,83 +314,163 @@ class SpotifyService:
             # Try using provided token first
             if bearer_token:
                 headers = {"Authorization": f"Bearer {bearer_token}"}
-                resp = requests.get(f"https://api.spotify.com/v1/artists/{artist_id}", headers=headers)
+                resp = self._call(self.http_session.get, f"https://api.spotify.com/v1/artists/{artist_id}",
+                                  headers=headers, timeout=self.timeout)
                 if resp.status_code == 200:
                     artist_data = resp.json()
             
-            # Try public client credentials first (works without session)
             if not artist_data:
-                sp_public = self.get_public_client()
-                if sp_public:
-                    try:
-                        artist_data = sp_public.artist(artist_id)
-                    except Exception as e:
-                        logger.debug(f"Public client failed for {artist_id}: {e}")
+                artist_data = self._fetch_artist(artist_id)
             
-            # Fallback to authenticated client
-            if not artist_data:
-                try:
-                    sp = self.get_authenticated_client()
-                    if sp:
-                        try:
-                            artist_data = sp.artist(artist_id)
-                        except Exception as e:
-                            logger.debug(f"Authenticated client failed for {artist_id}: {e}")
-                except RuntimeError:
-                    # No session context, skip authenticated client
-                    pass
-            
-            # Extract image URL if we have artist data
-            if artist_data and artist_data.get("images"):
-                image_url = artist_data["images"][0]["url"]
-                # Cache the result
-                self._image_cache[artist_id] = image_url
-                return image_url
+            # Cache the artist (info and image) if we have artist data
+            if artist_data:
+                return self._cache_artist(artist_id, artist_data)["image"] or DEFAULT_ARTIST_IMAGE
             else:
-                logger.debug(f"No images found for artist {artist_id}")
-                # Cache the default result to avoid repeated API calls
-                self._image_cache[artist_id] = "/static/default-artist.png"
-                return "/static/default-artist.png"
+                logger.debug(f"No artist data found for {artist_id}")
+                return self._remember_failure('image', artist_id, DEFAULT_ARTIST_IMAGE)
         
+        except ApiUnavailable as e:
+            logger.debug(f"Serving cached image for {artist_id}: {e}")
+            return self._cached_fallback('image', artist_id, DEFAULT_ARTIST_IMAGE)
         except Exception as e:
             logger.error(f"Error fetching artist image for {artist_id}: {e}")
-            # Cache the default result to avoid repeated API calls  
-            self._image_cache[artist_id] = "/static/default-artist.png"
-            return "/static/default-artist.png"
+            return self._remember_failure('image', artist_id, DEFAULT_ARTIST_IMAGE)
+    
+    def _format_artist_info(self, artist_data):
+        """Convert a Spotify artist object to the artist info dictionary."""
+        return {
+            "name": artist_data["name"],
+            "image": artist_data["images"][0]["url"] if artist_data.get("images") else "",
+            "genres": artist_data.get("genres", []),
+            "popularity": artist_data.get("popularity", 0),
+            "followers": artist_data.get("followers", {}).get("total", 0),
+            "url": artist_data["external_urls"]["spotify"]
+        }
+    
+    def _cache_artist(self, artist_id, artist_data):
+        """Fill the info and image caches from a Spotify artist object."""
+        info = self._format_artist_info(artist_data)
+        self.cache.set('info', artist_id, info)
+        self.cache.set('image', artist_id, info["image"] or DEFAULT_ARTIST_IMAGE)
+        return info
+    
+    def fetch_artists(self, artist_ids):
+        """
+        Fetch info and images for many artists, ARTISTS_BATCH_SIZE IDs per request.
+        
+        Artists in the metadata store or the cache are not requested again; the results fill the caches
+        read by fetch_artist_image and get_artist_info. While the API is degraded,
+        expired cache entries are returned instead.
+        
+        Args:
+            artist_ids: Iterable of Spotify artist IDs
+        
+        Returns:
+            dict: Artist ID -> artist info (see get_artist_info) for every artist found
+        """
+        artist_ids = list(dict.fromkeys(artist_id for artist_id in artist_ids if artist_id))
+        found = {artist_id: entry["info"] for artist_id, entry in self.metadata_store.get_many(artist_ids).items()
+                 if entry.get("info")}
+        found.update(self.cache.get_many('info', [artist_id for artist_id in artist_ids if artist_id not in found]))
+        missing = [artist_id for artist_id in artist_ids if artist_id not in found]
+        
+        for start in range(0, len(missing), ARTISTS_BATCH_SIZE):
+            batch = missing[start:start + ARTISTS_BATCH_SIZE]
+            try:
+                response = self._flights.do(
+                    ('artists', tuple(batch)),
+                    lambda: self._request(f"{len(batch)} artists", lambda sp: sp.artists(batch)))
+            except ApiUnavailable as e:
+                logger.debug(f"Serving cached info for {len(missing) - start} artists: {e}")
+                found.update(self.cache.get_many('info', missing[start:], include_expired=True))
+                break
+            if response is None:
+                logger.error(f"Could not fetch artists batch of {len(batch)}")
+                found.update(self.cache.get_many('info', batch, include_expired=True))
+                continue
+            
+            for artist_id, artist_data in zip(batch, response.get("artists", [])):
+                try:
+                    if artist_data:
+                        found[artist_id] = self._cache_artist(artist_id, artist_data)
+                    else:
+                        # Unknown ID - remember it briefly to avoid repeated API calls
+                        found[artist_id] = self._remember_failure('info', artist_id, {})
+                        self._remember_failure('image', artist_id, DEFAULT_ARTIST_IMAGE)
+                except Exception as e:
+                    logger.error(f"Error processing artist data for {artist_id}: {e}")
+        
+        # Negative entries are cached as empty dicts
+        return {artist_id: found[artist_id] for artist_id in artist_ids if found.get(artist_id)}
+    
+    def fetch_artist_images(self, artist_ids):
+        """
+        Fetch image URLs for many artists with batched requests.
+        
+        Args:
+            artist_ids: Iterable of Spotify artist IDs
+        
+        Returns:
+            dict: Artist ID -> image URL (default image path if not found)
+        """
+        artist_ids = [artist_id for artist_id in artist_ids if artist_id]
+        images = {artist_id: entry["info"].get("image") or DEFAULT_ARTIST_IMAGE
+                  for artist_id, entry in self.metadata_store.get_many(artist_ids).items() if entry.get("info")}
+        images.update(self.cache.get_many('image', [artist_id for artist_id in artist_ids if artist_id not in images]))
+        missing = [artist_id for artist_id in artist_ids if artist_id not in images]
+        if missing:
+            infos = self.fetch_artists(missing)
+            images.update(self.cache.get_many('image', missing))
+            # Expired info served while degraded still carries the image URL
+            for artist_id, info in infos.items():
+                if artist_id not in images and info.get("image"):
+                    images[artist_id] = info["image"]
+        return {artist_id: images.get(artist_id, DEFAULT_ARTIST_IMAGE) for artist_id in artist_ids}
+    
+    def get_known_artists(self, artist_ids):
+        """
+        Get artist info from the metadata store and cache only (never calls Spotify).
+        
+        Args:
+            artist_ids: Iterable of Spotify artist IDs
+        
+        Returns:
+            dict: Artist ID -> artist info for the artists already known
+        """
+        artist_ids = [artist_id for artist_id in artist_ids if artist_id]
+        known = {artist_id: entry["info"] for artist_id, entry in self.metadata_store.get_many(artist_ids).items()
+                 if entry.get("info")}
+        cached = self.cache.get_many('info', [artist_id for artist_id in artist_ids if artist_id not in known])
+        known.update((artist_id, info) for artist_id, info in cached.items() if info)
+        return known
     
     def search_artists(self, query, limit=10):
         """
         Search for artists on Spotify.
         
+        Results are cached by normalized query; a longer query is answered from a cached
+        shorter one when possible (see SearchCache).
+        
         Args:
             query: Search query string
             limit: Maximum number of results
         
         Returns:
-            list: List of artist dictionaries
+            list: List of artist dictionaries (empty while the API is degraded)
         """
-        results = None
-        
-        # Try public client first (works without session context)
-        sp_public = self.get_public_client()
-        if sp_public:
-            try:
-                results = sp_public.search(q=query, type='artist', limit=limit)
-            except Exception as e:
-                logger.debug(f"Public client failed for artist search '{query}': {e}")
+        query = normalize_query(query)
+        cached = self.search_cache.get(query, limit)
+        if cached is not None:
+            return cached
         
-        # Fallback to authenticated client if public client fails
-        if not results:
-            try:
-                sp = self.get_authenticated_client()
-                if sp:
-                    try:
-                        results = sp.search(q=query, type='artist', limit=limit)
-                    except Exception as e:
-                        logger.debug(f"Authenticated client failed for artist search '{query}': {e}")
-            except RuntimeError:
-                # No session context, skip authenticated client
-                pass
+        try:
+            results = self._flights.do(
+                ('search', query, limit),
+                lambda: self._request(f"artist search '{query}'",
+                                      lambda sp: sp.search(q=query, type='artist', limit=limit)))
+        except ApiUnavailable as e:
+            logger.warning(f"Skipping artist search for '{query}': {e}")
+            return []
         
         if not results:
             logger.error(f"Could not search artists for query: {query}")
@@ -266,6 +487,7 @@ class SpotifyService:
                     "followers": artist.get("followers", {}).get("total", 0)
                 })
             
+            self.search_cache.set(query, limit, artists)
             return artists
         
         except Exception as e:
@@ -282,42 +504,26 @@ class SpotifyService:
         Returns:
             dict: Artist information or empty dict
         """
-        artist_data = None
+        stored = self.metadata_store.get(artist_id)
+        if stored and stored.get("info"):
+            return stored["info"]
         
-        # Try public client first (works without session context)
-        sp_public = self.get_public_client()
-        if sp_public:
-            try:
-                artist_data = sp_public.artist(artist_id)
-            except Exception as e:
-                logger.debug(f"Public client failed for artist info {artist_id}: {e}")
+        cached = self.cache.get('info', artist_id)
+        if cached is not MISS:
+            return cached
         
-        # Fallback to authenticated client if public client fails
-        if not artist_data:
-            try:
-                sp = self.get_authenticated_client()
-                if sp:
-                    try:
-                        artist_data = sp.artist(artist_id)
-                    except Exception as e:
-                        logger.debug(f"Authenticated client failed for artist info {artist_id}: {e}")
-            except RuntimeError:
-                # No session context, skip authenticated client
-                pass
+        try:
+            artist_data = self._fetch_artist(artist_id)
+        except ApiUnavailable as e:
+            logger.debug(f"Serving cached info for {artist_id}: {e}")
+            return self._cached_fallback('info', artist_id, {})
         
         if not artist_data:
             logger.error(f"Could not get artist info for {artist_id}")
-            return {}
+            return self._remember_failure('info', artist_id, {})
         
         try:
-            return {
-                "name": artist_data["name"],
-                "image": artist_data["images"][0]["url"] if artist_data.get("images") else "",
-                "genres": artist_data.get("genres", []),
-                "popularity": artist_data.get("popularity", 0),
-                "followers": artist_data.get("followers", {}).get("total", 0),
-                "url": artist_data["external_urls"]["spotify"]
-            }
+            return self._cache_artist(artist_id, artist_data)
         
         except Exception as e:
             logger.error(f"Error processing artist info for {artist_id}: {e}")
@@ -334,48 +540,194 @@ class SpotifyService:
         Returns:
             list: List of track dictionaries
         """
-        results = None
+        stored = self.get_stored_top_tracks(artist_id, market)
+        if stored is not None:
+            return stored
         
-        # Try public client first (works without session context)
-        sp_public = self.get_public_client()
-        if sp_public:
-            try:
-                results = sp_public.artist_top_tracks(artist_id, country=market)
-            except Exception as e:
-                logger.debug(f"Public client failed for top tracks {artist_id}: {e}")
+        cache_key = f"{artist_id}:{market}"
+        cached = self.cache.get('top_tracks', cache_key)
+        if cached is not MISS:
+            return cached
         
-        # Fallback to authenticated client if public client fails
-        if not results:
-            try:
-                sp = self.get_authenticated_client()
-                if sp:
-                    try:
-                        results = sp.artist_top_tracks(artist_id, country=market)
-                    except Exception as e:
-                        logger.debug(f"Authenticated client failed for top tracks {artist_id}: {e}")
-            except RuntimeError:
-                # No session context, skip authenticated client
-                pass
+        try:
+            results = self._flights.do(
+                ('top_tracks', artist_id, market),
+                lambda: self._request(f"top tracks {artist_id}",
+                                      lambda sp: sp.artist_top_tracks(artist_id, country=market)))
+        except ApiUnavailable as e:
+            logger.debug(f"Serving cached top tracks for {artist_id}: {e}")
+            return self._cached_fallback('top_tracks', cache_key, [])
         
         if not results:
             logger.error(f"Could not get top tracks for {artist_id}")
-            return []
+            return self._remember_failure('top_tracks', cache_key, [])
         
         try:
-            tracks = []
-            for track in results.get("tracks", []):
-                tracks.append({
-                    "name": track["name"],
-                    "url": track["external_urls"]["spotify"],
-                    "album_image": track["album"]["images"][0]["url"] if track["album"]["images"] else ""
-                })
-            
+            tracks = self._format_tracks(results)
+            self.cache.set('top_tracks', cache_key, tracks)
             return tracks
         
         except Exception as e:
             logger.error(f"Error processing top tracks for {artist_id}: {e}")
             return []
     
+    def _format_tracks(self, results):
+        """Convert a top tracks response to the track dictionaries."""
+        tracks = []
+        for track in results.get("tracks", []):
+            tracks.append({
+                "name": track["name"],
+                "url": track["external_urls"]["spotify"],
+                "album_image": track["album"]["images"][0]["url"] if track["album"]["images"] else ""
+            })
+        return tracks
+    
+    def get_stored_top_tracks(self, artist_id, market=None):
+        """
+        Get top tracks from the bulk metadata store only (never calls Spotify).
+        
+        Args:
+            artist_id: Spotify artist ID
+            market: Market code (defaults to the store's market)
+        
+        Returns:
+            list: Stored tracks, or None if the artist hasn't been refreshed for this market
+        """
+        if market and market != self.metadata_store.market:
+            return None
+        stored = self.metadata_store.get(artist_id)
+        if not stored or stored.get("top_tracks") is None:
+            return None
+        return stored["top_tracks"]
+    
+    def _bulk_request(self, description, call):
+        """
+        Like _request, but waits up to BULK_MAX_WAIT seconds for rate budget instead of
+        failing fast (background jobs can afford to wait; request threads can't).
+        
+        Raises:
+            ApiUnavailable: If the breaker is open or no budget freed up in time
+        """
+        deadline = time.monotonic() + BULK_MAX_WAIT
+        while True:
+            try:
+                return self._request(description, call)
+            except ApiUnavailable:
+                if self.guard.degraded() or time.monotonic() >= deadline:
+                    raise
+                time.sleep(1.0 / max(self.guard.bucket.rate, 1))
+    
+    def _bulk_artists(self, artist_ids):
+        """
+        Fetch artists ARTISTS_BATCH_SIZE per request for a background job, bypassing the caches.
+        
+        Yields:
+            (artist_id, artist info or None if it couldn't be fetched); fetched artists also fill the cache
+        
+        Raises:
+            ApiUnavailable: If the API stays unavailable (see _bulk_request)
+        """
+        for start in range(0, len(artist_ids), ARTISTS_BATCH_SIZE):
+            batch = artist_ids[start:start + ARTISTS_BATCH_SIZE]
+            response = self._bulk_request(f"{len(batch)} artists", lambda sp: sp.artists(batch))
+            if response is None:
+                logger.error(f"Could not fetch artists batch of {len(batch)}")
+                for artist_id in batch:
+                    yield artist_id, None
+                continue
+            
+            artists = response.get("artists", [])
+            for position, artist_id in enumerate(batch):
+                artist_data = artists[position] if position < len(artists) else None
+                info = None
+                if artist_data:
+                    try:
+                        info = self._cache_artist(artist_id, artist_data)
+                    except Exception as e:
+                        logger.error(f"Error processing artist data for {artist_id}: {e}")
+                yield artist_id, info
+    
+    def collect_artist_stats(self, artist_ids):
+        """
+        Fetch today's followers and popularity for many artists (the daily stats collection).
+        
+        Costs one /v1/artists request per ARTISTS_BATCH_SIZE artists, paced by the shared
+        rate budget; stops early if the API becomes unavailable.
+        
+        Args:
+            artist_ids: Iterable of Spotify artist IDs
+        
+        Returns:
+            dict: Artist ID -> {'followers': int, 'popularity': int} for every artist fetched
+        """
+        artist_ids = list(dict.fromkeys(artist_id for artist_id in artist_ids if artist_id))
+        stats = {}
+        try:
+            for artist_id, info in self._bulk_artists(artist_ids):
+                if info:
+                    stats[artist_id] = {"followers": info["followers"], "popularity": info["popularity"]}
+        except ApiUnavailable as e:
+            logger.warning(f"Artist stats collection stopped after {len(stats)} artists: {e}")
+        
+        logger.info(f"Collected followers and popularity for {len(stats)} of {len(artist_ids)} artists")
+        return stats
+    
+    def refresh_artist_metadata(self, artist_ids, include_top_tracks=True):
+        """
+        Refresh the bulk metadata store for many artists (the nightly metadata job).
+        
+        Artist objects are fetched ARTISTS_BATCH_SIZE per request; top tracks have no
+        batch endpoint and cost one request per artist. The rate budget is shared with
+        the web workers, so the refresh paces itself and stops early (keeping what it
+        fetched) if the API becomes unavailable. Fetched artists also fill the cache.
+        
+        Args:
+            artist_ids: Iterable of Spotify artist IDs
+            include_top_tracks: Whether to fetch top tracks for the store's market
+        
+        Returns:
+            dict: Counts of 'requested', 'refreshed' and 'failed' artists
+        """
+        artist_ids = list(dict.fromkeys(artist_id for artist_id in artist_ids if artist_id))
+        market = self.metadata_store.market
+        entries = {}
+        failed = 0
+        
+        try:
+            for artist_id, info in self._bulk_artists(artist_ids):
+                if not info:
+                    failed += 1
+                    continue
+                
+                # Keep the previous top tracks unless new ones are fetched
+                previous = self.metadata_store.get(artist_id) or {}
+                entries[artist_id] = {
+                    "info": info,
+                    "top_tracks": previous.get("top_tracks"),
+                    "refreshed_at": datetime.now().isoformat()
+                }
+                if include_top_tracks:
+                    results = self._bulk_request(f"top tracks {artist_id}",
+                                                 lambda sp: sp.artist_top_tracks(artist_id, country=market))
+                    try:
+                        tracks = self._format_tracks(results) if results else None
+                    except Exception as e:
+                        logger.error(f"Error processing top tracks for {artist_id}: {e}")
+                        tracks = None
+                    if tracks is not None:
+                        self.cache.set('top_tracks', f"{artist_id}:{market}", tracks)
+                        entries[artist_id]["top_tracks"] = tracks
+        
+        except ApiUnavailable as e:
+            logger.warning(f"Artist metadata refresh stopped after {len(entries)} artists: {e}")
+        
+        finally:
+            if entries:
+                self.metadata_store.update(entries)
+        
+        logger.info(f"Refreshed metadata for {len(entries)} of {len(artist_ids)} artists ({failed} failed)")
+        return {"requested": len(artist_ids), "refreshed": len(entries), "failed": failed}
+    
     def follow_artist(self, artist_id):
         """
         Follow an artist on Spotify.
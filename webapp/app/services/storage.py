@@ -0,0 +1,178 @@
+"""
+Storage backends for DataService.
+
+JsonStorage keeps the listener history in the append-only JSONL master file, the daily
+follower/popularity figures in a JSONL file next to it, and the followed artists,
+suggestions and blacklist in their JSON files. SqliteStorage keeps
+everything in one SQLite database (see sqlite_store), so the gunicorn workers and the
+scraper subprocesses can read and write concurrently without whole-file rewrites.
+The backend is chosen with the STORAGE_BACKEND setting.
+"""
+
+import json
+import os
+import threading
+import logging
+from typing import Any, Dict, List, Optional
+
+from datastore import listener_store, sqlite_store
+
+from .atomic_file import atomic_write_json
+
+logger = logging.getLogger(__name__)
+
+
+
+def _file_signature(path: str) -> Optional[List[int]]:
+    try:
+        stat = os.stat(path)
+        return [stat.st_mtime_ns, stat.st_size]
+    except OSError:
+        return None
+
+
+class JsonStorage:
+    """Storage backed by the JSONL master file and plain JSON list files."""
+
+    name = 'json'
+
+    def __init__(self, data_path: str, followed_artists_path: str, suggestions_file: str, blacklist_file: str,
+                 stats_path: Optional[str] = None):
+        self.data_path = data_path
+        self.stats_path = stats_path or os.path.join(os.path.dirname(data_path), listener_store.STATS_FILENAME)
+        self.collection_paths = {
+            'followed_artists': followed_artists_path,
+            'suggestions': suggestions_file,
+            'blacklist': blacklist_file
+        }
+
+    def exists(self) -> bool:
+        """Check whether any listener history exists (the legacy JSON array counts until migrated)."""
+        return os.path.exists(self.data_path) or os.path.exists(listener_store.legacy_path_for(self.data_path))
+
+    def modified_time(self) -> float:
+        """Return the last modification time of the listener history."""
+        return os.path.getmtime(self.data_path)
+
+    def signature(self) -> Optional[List[int]]:
+        """Return a token that changes whenever the listener history changes."""
+        return _file_signature(self.data_path)
+
+    def read_listeners(self, stats: Optional[Dict[str, int]] = None) -> List[Dict[str, Any]]:
+        """Read the whole listener history."""
+        return listener_store.read_records(self.data_path, stats)
+
+    def artist_stats_signature(self) -> Optional[List[int]]:
+        """Return a token that changes whenever the follower/popularity history changes."""
+        return _file_signature(self.stats_path)
+
+    def read_artist_stats(self) -> List[Dict[str, Any]]:
+        """Read the follower/popularity history, keeping the last record per (artist_id, date)."""
+        return listener_store.dedupe_records(listener_store.read_records(self.stats_path, legacy=False))
+
+    def append_artist_stats(self, records: List[Dict[str, Any]]) -> int:
+        """
+        Append follower/popularity records without reading the file back.
+
+        Duplicates only come from recording a day again, which read_artist_stats() already
+        resolves, so the file is compacted on the master file's interval alone.
+        """
+        written = listener_store.append_records(records, self.stats_path, legacy=False)
+        if listener_store.needs_compaction(self.stats_path, {}):
+            lines_before, records_after = listener_store.compact(self.stats_path, legacy=False)
+            logger.info(f"Compacted {self.stats_path}: {lines_before} lines -> {records_after} records")
+        return written
+
+    def collection_signature(self, collection: str) -> Optional[List[int]]:
+        """Return a token that changes whenever a collection changes."""
+        return _file_signature(self.collection_paths[collection])
+
+    def load_collection(self, collection: str) -> List[Any]:
+        """Load a followed artists, suggestions or blacklist list."""
+        path = self.collection_paths[collection]
+        if not os.path.exists(path):
+            return []
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def save_collection(self, collection: str, items: List[Any]):
+        """Replace a followed artists, suggestions or blacklist list (temp file + rename)."""
+        atomic_write_json(self.collection_paths[collection], items, indent=2)
+
+
+class SqliteStorage:
+    """Storage backed by a single SQLite database in WAL mode."""
+
+    name = 'sqlite'
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._local = threading.local()  # One connection per request thread
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite_store.connect(self.db_path)
+            self._local.conn = conn
+        return conn
+
+    def exists(self) -> bool:
+        """Check whether the database exists."""
+        return os.path.exists(self.db_path)
+
+    def modified_time(self) -> float:
+        """Return the last write time, including writes still in the WAL file."""
+        times = [os.path.getmtime(path) for path in (self.db_path, self.db_path + '-wal') if os.path.exists(path)]
+        return max(times) if times else 0.0
+
+    def signature(self) -> Optional[List[int]]:
+        """Return the listener write counter, which changes with every committed write."""
+        return [sqlite_store.get_version(self._conn(), 'listeners')]
+
+    def read_listeners(self, stats: Optional[Dict[str, int]] = None) -> List[Dict[str, Any]]:
+        """Read the whole listener history."""
+        records = list(sqlite_store.iter_listeners(self._conn()))
+        if stats is not None:
+            stats.update({'lines': len(records), 'bad_lines': 0})
+        return records
+
+    def artist_stats_signature(self) -> Optional[List[int]]:
+        """Return the follower/popularity write counter."""
+        return [sqlite_store.get_version(self._conn(), 'artist_stats')]
+
+    def read_artist_stats(self) -> List[Dict[str, Any]]:
+        """Read the follower/popularity history."""
+        return list(sqlite_store.iter_artist_stats(self._conn()))
+
+    def append_artist_stats(self, records: List[Dict[str, Any]]) -> int:
+        """Store follower/popularity records, replacing same-day rows."""
+        return sqlite_store.upsert_artist_stats(self._conn(), records)
+
+    def collection_signature(self, collection: str) -> Optional[List[int]]:
+        """Return the write counter of a collection."""
+        return [sqlite_store.get_version(self._conn(), collection)]
+
+    def load_collection(self, collection: str) -> List[Any]:
+        """Load a followed artists, suggestions or blacklist list."""
+        return sqlite_store.load_collection(self._conn(), collection)
+
+    def save_collection(self, collection: str, items: List[Any]):
+        """Replace a followed artists, suggestions or blacklist list in one transaction."""
+        sqlite_store.save_collection(self._conn(), collection, items)
+
+
+def create_storage(config) -> Any:
+    """
+    Create the storage backend selected by config.STORAGE_BACKEND.
+
+    Args:
+        config: Config class
+
+    Returns:
+        JsonStorage or SqliteStorage instance
+    """
+    if config.STORAGE_BACKEND == 'sqlite':
+        logger.info(f"Using SQLite storage at {config.SQLITE_PATH}")
+        return SqliteStorage(config.SQLITE_PATH)
+    return JsonStorage(config.DATA_PATH, config.FOLLOWED_ARTISTS_PATH, config.SUGGESTIONS_FILE, config.BLACKLIST_FILE,
+                       stats_path=config.ARTIST_STATS_PATH)